@@ -50,7 +50,6 @@ setup(
         'License :: OSI Approved :: Apache Software License',
         'Programming Language :: Python',
         'Programming Language :: Python :: 3',
-        'Programming Language :: Python :: 3.4',
         'Programming Language :: Python :: 3.5',
         'Topic :: Security',
         'Topic :: Software Development :: Libraries :: Application Frameworks',
@@ -64,5 +63,10 @@ setup(
     packages=find_packages('.', exclude=['ez_setup', 'test*']),
     install_requires=install_requires,
     zip_safe=False,
+    entry_points={
+        'console_scripts': [
+            'yosai-calibrate-hash = yosai.core.authc.calibration:main',
+        ],
+    },
     cmdclass={'clean': CleanCommand}
 )
@@ -0,0 +1,96 @@
+"""
+Compares the memory footprint and ``implies`` throughput of the frozen,
+``__slots__``-based ``DefaultPermission`` against the mutable, dict-backed
+permission that Yosai used previously.
+
+Run directly:  ``python test/benchmarks/permission_benchmark.py``
+"""
+import gc
+import timeit
+import tracemalloc
+
+from yosai.core import DefaultPermission
+
+
+class LegacyPermission:
+    """
+    the previous representation:  a __dict__ per instance, mutable set parts
+    and an implies that rebuilds its part lists on every call
+    """
+    WILDCARD_TOKEN = '*'
+
+    def __init__(self, parts):
+        self.case_sensitive = False
+        self.parts = {'domain': set([parts.get('domain', '*')]),
+                      'action': set(parts.get('action', '*')),
+                      'target': set(parts.get('target', '*'))}
+
+    def implies(self, permission):
+        myparts = [token for token in
+                   [self.parts.get('domain'),
+                    self.parts.get('action'),
+                    self.parts.get('target')] if token]
+
+        otherparts = [token for token in
+                      [permission.parts.get('domain'),
+                       permission.parts.get('action'),
+                       permission.parts.get('target')] if token]
+
+        index = 0
+
+        for other_part in otherparts:
+            if (len(myparts) - 1 < index):
+                return True
+            else:
+                part = myparts[index]
+                if ((self.WILDCARD_TOKEN not in part) and
+                   not (other_part <= part)):
+                    return False
+                index += 1
+
+        for i in range(index, len(myparts)):
+            if (self.WILDCARD_TOKEN not in myparts[i]):
+                return False
+
+        return True
+
+
+def sample_parts(count):
+    return [{'domain': 'domain{0}'.format(i % 50),
+             'action': ['read', 'write'] if i % 3 else ['*'],
+             'target': ['target{0}'.format(i)]}
+            for i in range(count)]
+
+
+def measure_memory(factory, parts_list):
+    gc.collect()
+    tracemalloc.start()
+    permissions = [factory(parts) for parts in parts_list]
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return current, permissions
+
+
+def measure_implies(grants, required, repeat=5):
+    def scan():
+        for permission in required:
+            for grant in grants:
+                if grant.implies(permission):
+                    break
+
+    return min(timeit.repeat(scan, number=1, repeat=repeat))
+
+
+def main(count=10000, grants=200, checks=200):
+    parts_list = sample_parts(count)
+
+    print('{0:<20}{1:>16}{2:>16}'.format('', 'bytes/instance', 'implies (s)'))
+    for name, factory in (('legacy', LegacyPermission),
+                          ('frozen', lambda parts: DefaultPermission(parts=parts))):
+        memory, permissions = measure_memory(factory, parts_list)
+        elapsed = measure_implies(permissions[:grants], permissions[-checks:])
+        print('{0:<20}{1:>16.1f}{2:>16.4f}'.format(name, memory / count, elapsed))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,73 @@
+"""
+Compares evaluating a subjects x permissions matrix one check at a time,
+through a ``PermissionIndex`` per subject, against a batch evaluation through
+a ``PermissionMatrix``.  Subjects are granted permissions drawn from a small
+number of roles, as is typical, so that many grants are shared.
+
+Run directly:  ``python test/benchmarks/permission_matrix_benchmark.py``
+"""
+import random
+import timeit
+
+from yosai.core import (
+    DefaultPermission,
+    PermissionIndex,
+    PermissionMatrix,
+)
+
+
+def sample_roles(count, grants_per_role):
+    return [[DefaultPermission(parts={
+                'domain': 'domain{0}'.format((role + i) % 20),
+                'action': ['read', 'write'] if i % 3 else ['*'],
+                'target': ['target{0}'.format(i)] if i % 4 else ['*']})
+             for i in range(grants_per_role)]
+            for role in range(count)]
+
+
+def sample_subjects(roles, count, roles_per_subject, seed=0):
+    rand = random.Random(seed)
+    return [[grant for role in rand.sample(roles, roles_per_subject)
+             for grant in role]
+            for _ in range(count)]
+
+
+def sample_required(count):
+    return ['domain{0}:{1}:target{2}'.format(i % 20, ('read', 'write', 'delete')[i % 3], i)
+            for i in range(count)]
+
+
+def scalar(subjects, required):
+    required = [DefaultPermission(wildcard_string=perm) for perm in required]
+    rows = []
+    for grants in subjects:
+        index = PermissionIndex(grants)
+        rows.append([index.implies(permission) for permission in required])
+    return rows
+
+
+def batch(subjects, required):
+    matrix = PermissionMatrix(required)
+    for grants in subjects:
+        matrix.rows.append(matrix.encode(grants))
+    return matrix
+
+
+def main(subjects=2000, permissions=100, roles=25, repeat=3):
+    subjects = sample_subjects(sample_roles(roles, 40), subjects, 3)
+    required = sample_required(permissions)
+
+    scalar_rows = scalar(subjects, required)
+    matrix = batch(subjects, required)
+    assert all([is_permitted for _, is_permitted in matrix.results(row)] == expected
+               for row, expected in enumerate(scalar_rows))
+
+    print('{0:<20}{1:>16}'.format('', 'seconds'))
+    for name, evaluate in (('scalar', scalar), ('matrix', batch)):
+        elapsed = min(timeit.repeat(lambda: evaluate(subjects, required),
+                                    number=1, repeat=repeat))
+        print('{0:<20}{1:>16.4f}'.format(name, elapsed))
+
+
+if __name__ == '__main__':
+    main()
@@ -1,7 +1,11 @@
+import asyncio
 import pytest
+from passlib.context import CryptContext
 from passlib.totp import MalformedTokenError
 from unittest import mock
 import collections
+import concurrent.futures
+import time
 
 from yosai.core import (
     AccountException,
@@ -10,15 +14,23 @@ from yosai.core import (
     ConsumedTOTPToken,
     DefaultAuthenticator,
     AuthenticationAttempt,
+    AuthenticationThrottle,
+    AuthenticationThrottledException,
+    FailedAttemptTracker,
     IncorrectCredentialsException,
     InvalidAuthenticationSequenceException,
     LockedAccountException,
+    PasswordVerificationExecutor,
     SimpleIdentifierCollection,
     UsernamePasswordToken,
     TOTPToken,
+    VerificationSaturatedException,
+    calibrate,
+    calibrate_scheme,
     create_totp_factory,
     event_bus,
 )
+from yosai.core.authc import calibration
 
 from passlib.totp import TOTP
 
@@ -64,6 +76,29 @@ def test_da_init_realms(da_itr, da_rccl, da_il, default_authenticator):
     assert da.realms == (faux_authc_realm,)
 
 
+def test_da_apply_verification_executor(default_authenticator, monkeypatch):
+    da = default_authenticator
+    executor = PasswordVerificationExecutor()
+    verifier = mock.Mock(verification_executor=None)
+    realm = mock.Mock(token_resolver={UsernamePasswordToken: verifier})
+    monkeypatch.setattr(da, 'verification_executor', executor)
+    monkeypatch.setattr(da, 'token_realm_resolver', {UsernamePasswordToken: [realm]})
+
+    da.apply_verification_executor()
+
+    assert verifier.verification_executor is executor
+
+
+def test_da_shutdown(default_authenticator, monkeypatch):
+    da = default_authenticator
+    executor = mock.create_autospec(PasswordVerificationExecutor)
+    monkeypatch.setattr(da, 'verification_executor', executor)
+
+    da.shutdown(wait=False)
+
+    executor.shutdown.assert_called_once_with(wait=False)
+
+
 def test_da_init_locking(monkeypatch, default_authenticator):
     da = default_authenticator
 
@@ -252,6 +287,54 @@ def test_da_authenticate_account_catches_incorrectexc(
     da_daa.assert_called_once_with(mock_token)
 
 
+@mock.patch.object(DefaultAuthenticator, 'notify_event')
+def test_da_authenticate_account_async_succeeds(
+        da_ne, default_authenticator, sample_acct_info, monkeypatch):
+    """
+    unit tested:  authenticate_account_async
+
+    test case:
+    a realm supporting authenticate_account_async is awaited
+    """
+    da = default_authenticator
+    monkeypatch.delitem(sample_acct_info['authc_info'], 'totp_key')
+    faux_authc_realm = mock.create_autospec(AccountStoreRealm)
+
+    async def authenticate_account_async(authc_token):
+        return sample_acct_info
+
+    faux_authc_realm.authenticate_account_async.side_effect = authenticate_account_async
+    monkeypatch.setattr(da, 'token_realm_resolver',
+                        {UsernamePasswordToken: (faux_authc_realm,)})
+    monkeypatch.setattr(da, 'realms', (faux_authc_realm,))
+    token = UsernamePasswordToken(username='thedude', password='letsgobowling')
+
+    loop = asyncio.get_event_loop()
+    result = loop.run_until_complete(da.authenticate_account_async(None, token))
+
+    assert result is sample_acct_info['account_id']
+    faux_authc_realm.authenticate_account_async.assert_called_once_with(token)
+    faux_authc_realm.authenticate_account.assert_not_called()
+    da_ne.assert_called_once_with(result.primary_identifier, 'AUTHENTICATION.SUCCEEDED')
+
+
+@mock.patch.object(DefaultAuthenticator, 'validate_locked')
+@mock.patch.object(DefaultAuthenticator, 'notify_event')
+@mock.patch.object(DefaultAuthenticator, 'do_authenticate_account_async')
+def test_da_authenticate_account_async_catches_incorrectexc(
+        da_daaa, da_ne, da_vl, default_authenticator):
+    da = default_authenticator
+    da_daaa.side_effect = IncorrectCredentialsException([1, 2])
+    token = UsernamePasswordToken(username='thedude', password='letsgobowling')
+
+    loop = asyncio.get_event_loop()
+    with pytest.raises(IncorrectCredentialsException):
+        loop.run_until_complete(da.authenticate_account_async(None, token))
+
+    da_ne.assert_called_once_with('thedude', 'AUTHENTICATION.FAILED')
+    da_vl.assert_called_once_with(token, [1, 2])
+
+
 @mock.patch.object(DefaultAuthenticator, 'validate_locked')
 @mock.patch.object(DefaultAuthenticator, 'authenticate_single_realm_account')
 def test_da_do_authc_acct_sra_succeeds(
@@ -443,6 +526,216 @@ def test_validate_locked(da_ne, default_authenticator, monkeypatch):
     mock_realm.lock_account.assert_called_once_with('user123')
     da_ne.assert_called_once_with('user123', 'AUTHENTICATION.ACCOUNT_LOCKED')
 
+@mock.patch.object(DefaultAuthenticator, 'notify_event')
+def test_validate_locked_tracked(da_ne, default_authenticator, monkeypatch):
+    da = default_authenticator
+    token = UsernamePasswordToken(username='user123', password='secret')
+    mock_realm = mock.create_autospec(AccountStoreRealm)
+    monkeypatch.setattr(da, 'locking_limit', 3)
+    monkeypatch.setattr(da, 'locking_realm', mock_realm)
+
+    da.validate_locked(token, [])
+    for _ in range(4):
+        da.failed_attempt_tracker.record('user123', 'password')
+
+    with pytest.raises(LockedAccountException):
+        da.validate_locked(token, [])
+
+    mock_realm.lock_account.assert_called_once_with('user123')
+
+
+def test_da_apply_failed_attempt_tracker(default_authenticator, monkeypatch):
+    da = default_authenticator
+    realm = mock.Mock(failed_attempt_tracker=None)
+    monkeypatch.setattr(da, 'realms', (realm,))
+
+    da.apply_failed_attempt_tracker()
+
+    assert realm.failed_attempt_tracker is da.failed_attempt_tracker
+
+
+@mock.patch.object(DefaultAuthenticator, 'do_authenticate_account')
+def test_da_authenticate_account_throttled(da_daa, default_authenticator, monkeypatch):
+    """
+    unit tested:  authenticate_account
+
+    test case:
+    a throttled attempt is rejected before any realm is consulted
+    """
+    da = default_authenticator
+    monkeypatch.setattr(da, 'throttle', AuthenticationThrottle(
+        identifier_rate={'capacity': 1, 'refill_per_second': 0}))
+    token = UsernamePasswordToken(username='user123', password='secret')
+    da_daa.side_effect = IncorrectCredentialsException([])
+    monkeypatch.setattr(da, 'notify_event', mock.Mock())
+
+    with pytest.raises(IncorrectCredentialsException):
+        da.authenticate_account(None, token)
+    with pytest.raises(AuthenticationThrottledException):
+        da.authenticate_account(None, token)
+
+    assert da_daa.call_count == 1
+
+
+def test_da_apply_cache_handler(default_authenticator, monkeypatch):
+    da = default_authenticator
+    monkeypatch.setattr(da, 'throttle', AuthenticationThrottle(shared=True))
+
+    da.apply_cache_handler('cache_handler')
+
+    assert (da.throttle.cache_handler == 'cache_handler' and
+            da.failed_attempt_tracker.cache_handler == 'cache_handler')
+
+
+# -----------------------------------------------------------------------------
+# AuthenticationThrottle Tests
+# -----------------------------------------------------------------------------
+
+def test_throttle_token_buckets():
+    timer = FakeTimer()
+    throttle = AuthenticationThrottle(
+        identifier_rate={'capacity': 2, 'refill_per_second': 0.5},
+        host_rate={'capacity': 3, 'refill_per_second': 1}, timer=timer)
+
+    def attempt(username, host):
+        throttle.acquire(UsernamePasswordToken(username=username, password='secret',
+                                               host=host))
+
+    attempt('thedude', '10.0.0.1')
+    attempt('thedude', '10.0.0.1')
+    with pytest.raises(AuthenticationThrottledException) as exc:
+        attempt('thedude', '10.0.0.2')  # the identifier's bucket is empty
+    assert exc.value.retry_after == pytest.approx(2)
+
+    attempt('walter', '10.0.0.1')
+    with pytest.raises(AuthenticationThrottledException):
+        attempt('donny', '10.0.0.1')  # the host's bucket is empty
+
+    timer.now = 2  # each bucket refills
+    attempt('thedude', '10.0.0.2')
+    attempt('donny', '10.0.0.1')
+
+
+def test_throttle_rejected_attempt_is_not_charged():
+    throttle = AuthenticationThrottle(
+        identifier_rate={'capacity': 1, 'refill_per_second': 0},
+        host_rate={'capacity': 1, 'refill_per_second': 0}, timer=FakeTimer())
+
+    throttle.acquire(UsernamePasswordToken(username='walter', password='x', host='h1'))
+    with pytest.raises(AuthenticationThrottledException):
+        throttle.acquire(UsernamePasswordToken(username='thedude', password='x',
+                                               host='h1'))
+
+    # thedude's bucket was not charged by the rejected attempt:
+    throttle.acquire(UsernamePasswordToken(username='thedude', password='x', host='h2'))
+
+
+def test_throttle_bounded():
+    throttle = AuthenticationThrottle(
+        identifier_rate={'capacity': 5, 'refill_per_second': 1}, max_keys=2)
+    for username in ('thedude', 'walter', 'donny'):
+        throttle.acquire(UsernamePasswordToken(username=username, password='x'))
+
+    assert len(throttle) == 2
+
+
+def test_throttle_shared():
+    cache = {}
+    mock_cache_handler = mock.Mock()
+    mock_cache_handler.get.side_effect = lambda domain, identifier: cache.get(
+        (domain, identifier))
+    mock_cache_handler.set.side_effect = lambda domain, identifier, value: \
+        cache.__setitem__((domain, identifier), value)
+
+    def shared_throttle():
+        throttle = AuthenticationThrottle(
+            identifier_rate={'capacity': 1, 'refill_per_second': 0},
+            shared=True, timer=FakeTimer())
+        throttle.cache_handler = mock_cache_handler
+        return throttle
+
+    token = UsernamePasswordToken(username='thedude', password='x')
+    shared_throttle().acquire(token)
+
+    with pytest.raises(AuthenticationThrottledException):
+        shared_throttle().acquire(token)  # another process sees the bucket
+    assert list(cache) == [('authentication:throttle', 'identifier:thedude')]
+
+
+# -----------------------------------------------------------------------------
+# FailedAttemptTracker Tests
+# -----------------------------------------------------------------------------
+
+class FakeTimer:
+    now = 0
+
+    def __call__(self):
+        return self.now
+
+
+def test_fat_sliding_window():
+    timer = FakeTimer()
+    tracker = FailedAttemptTracker(window=60, buckets=6, timer=timer)
+
+    assert [tracker.record('thedude', 'password') for _ in range(3)] == [1, 2, 3]
+    timer.now = 30
+    tracker.record('thedude', 'password')
+    assert (tracker.count('thedude', 'password') == 4 and
+            tracker.count('thedude', 'totp_key') == 0 and
+            tracker.count('walter', 'password') == 0)
+
+    timer.now = 65  # the first three attempts fell out of the window
+    assert tracker.count('thedude', 'password') == 1
+    timer.now = 1000
+    assert tracker.record('thedude', 'password') == 1
+
+
+def test_fat_bounded():
+    tracker = FailedAttemptTracker(max_accounts=2)
+    for identifier in ('thedude', 'walter', 'thedude', 'donny'):
+        tracker.record(identifier, 'password')
+
+    assert (len(tracker) == 2 and tracker.count('walter', 'password') == 0 and
+            tracker.count('thedude', 'password') == 2)
+
+    tracker.reset('thedude')
+    assert tracker.count('thedude', 'password') == 0
+
+
+def test_fat_shared():
+    cache = {}
+    mock_cache_handler = mock.Mock()
+    mock_cache_handler.get.side_effect = lambda domain, identifier: cache.get(
+        (domain, identifier))
+    mock_cache_handler.set.side_effect = lambda domain, identifier, value: \
+        cache.__setitem__((domain, identifier), value)
+    mock_cache_handler.delete.side_effect = lambda domain, identifier: \
+        cache.pop((domain, identifier), None)
+    timer = FakeTimer()
+
+    def shared_tracker():
+        tracker = FailedAttemptTracker(window=60, buckets=6, shared=True, timer=timer)
+        tracker.cache_handler = mock_cache_handler
+        return tracker
+
+    # each process counts the attempts served by the others:
+    counts = [shared_tracker().record('thedude', 'password') for _ in range(3)]
+    assert (counts == [1, 2, 3] and shared_tracker().count('thedude', 'password') == 3 and
+            list(cache) == [('authentication:failed_attempts', 'thedude')])
+
+    timer.now = 65
+    assert shared_tracker().count('thedude', 'password') == 0
+
+    shared_tracker().record('thedude', 'password')
+    shared_tracker().reset('thedude')  # such as upon unlock_account, anywhere
+    assert not cache and shared_tracker().count('thedude', 'password') == 0
+
+
+def test_fat_default_timer():
+    assert (FailedAttemptTracker().timer is time.monotonic and
+            FailedAttemptTracker(shared=True).timer is time.time)
+
+
 # -----------------------------------------------------------------------------
 # AuthenticationSettings Tests
 # -----------------------------------------------------------------------------
@@ -510,6 +803,142 @@ def test_verify_credentials_noresult_raises_incorrect(
         pv.verify_credentials(username_password_token, 'authc_info')
 
 
+def test_verify_userpass_credentials_verification_executor(
+        passlib_verifier, username_password_token, monkeypatch):
+    pv = passlib_verifier
+    monkeypatch.setattr(pv, 'get_stored_credentials', lambda x, y: 'stored')
+    mock_executor = mock.Mock()
+    mock_executor.verify.return_value = False
+    monkeypatch.setattr(pv, 'verification_executor', mock_executor)
+
+    with pytest.raises(IncorrectCredentialsException):
+        pv.verify_credentials(username_password_token, {'password': {}})
+
+    mock_executor.verify.assert_called_once_with(
+        pv.password_cc, username_password_token.credentials, 'stored')
+
+
+# -----------------------------------------------------------------------------
+# PasswordVerificationExecutor Tests
+# -----------------------------------------------------------------------------
+
+def test_pve_verify():
+    context = CryptContext(schemes=['sha256_crypt'], sha256_crypt__default_rounds=1000)
+    stored = context.hash('letsgobowling')
+    executor = PasswordVerificationExecutor(max_workers=1)
+
+    try:
+        assert (executor.verify(context, b'letsgobowling', stored) is True and
+                executor.verify(context, b'nihilist', stored) is False)
+    finally:
+        executor.shutdown()
+
+
+def test_pve_verify_saturated_fails_fast(monkeypatch):
+    executor = PasswordVerificationExecutor(max_pending=1, timeout=0.01)
+    pending = concurrent.futures.Future()
+    pending.set_running_or_notify_cancel()  # a running verification is not cancelled
+    mock_pool = mock.Mock()
+    mock_pool.submit.return_value = pending
+    monkeypatch.setattr(executor, '_pool', mock_pool)
+    context = CryptContext(schemes=['sha256_crypt'])
+
+    with pytest.raises(VerificationSaturatedException):  # times out
+        executor.verify(context, b'letsgobowling', 'stored')
+    with pytest.raises(VerificationSaturatedException) as exc:  # saturated
+        executor.verify(context, b'letsgobowling', 'stored')
+
+    assert exc.value.retry_after == 0.01 and mock_pool.submit.call_count == 1
+
+    pending.set_result(True)  # releases the slot
+    mock_pool.submit.return_value = concurrent.futures.Future()
+    mock_pool.submit.return_value.set_result(True)
+    assert executor.verify(context, b'letsgobowling', 'stored') is True
+
+
+def test_create_password_crypt_context_target_latency(
+        passlib_verifier, patched_authc_settings, monkeypatch):
+    monkeypatch.setattr(patched_authc_settings, 'preferred_algorithm', 'sha256_crypt')
+    monkeypatch.setattr(patched_authc_settings, 'preferred_algorithm_settings',
+                        {'min_rounds': 1000, 'max_rounds': 1000000})
+    monkeypatch.setattr(patched_authc_settings, 'preferred_algorithm_context', {})
+    monkeypatch.setattr(patched_authc_settings, 'target_verify_ms', 100)
+    mock_calibrate = mock.Mock(return_value=calibration.Calibration(
+        'sha256_crypt', {'default_rounds': 5000}, 0.1))
+    monkeypatch.setattr('yosai.core.authc.credential.calibrate_scheme', mock_calibrate)
+
+    context = passlib_verifier.create_password_crypt_context(patched_authc_settings)
+
+    mock_calibrate.assert_called_once_with('sha256_crypt', 0.1, min_rounds=1000,
+                                           max_rounds=1000000)
+    assert context.to_dict()['sha256_crypt__default_rounds'] == 5000
+
+
+# -----------------------------------------------------------------------------
+# Calibration Tests
+# -----------------------------------------------------------------------------
+
+def fake_measure_verify(seconds_per_round, memory_seconds_per_kib=0):
+    def measure_verify(handler, samples=3):
+        seconds = handler.default_rounds * seconds_per_round
+        if handler.rounds_cost == 'log2':
+            seconds = 2 ** handler.default_rounds * seconds_per_round
+        return seconds + getattr(handler, 'memory_cost', 0) * memory_seconds_per_kib
+    return measure_verify
+
+
+@pytest.mark.parametrize('scheme, settings, expected',
+                         [('sha256_crypt', {}, 100000),
+                          ('sha256_crypt', {'max_rounds': 50000}, 50000),
+                          ('pbkdf2_sha256', {'default_rounds': 1000}, 100000)])
+def test_calibrate_scheme_linear(monkeypatch, scheme, settings, expected):
+    monkeypatch.setattr(calibration, 'measure_verify', fake_measure_verify(1e-6))
+
+    result = calibrate_scheme(scheme, 0.1, **settings)
+
+    assert result.settings == {'default_rounds': expected}
+
+
+def test_calibrate_scheme_logarithmic(monkeypatch):
+    monkeypatch.setattr(calibration, 'measure_verify', fake_measure_verify(1e-4))
+
+    result = calibrate_scheme('bcrypt_sha256', 0.1)
+
+    assert result.settings == {'default_rounds': 10}  # 2 ** 10 * 1e-4 ~ 0.1
+
+
+def test_calibrate_scheme_argon2_memory(monkeypatch):
+    # even one round over the default memory_cost takes far longer than 0.1s:
+    monkeypatch.setattr(calibration, 'measure_verify', fake_measure_verify(0.01, 1e-5))
+
+    result = calibrate_scheme('argon2', 0.1)
+
+    assert (result.settings['default_rounds'] == 1 and
+            result.settings['memory_cost'] < 65536 and
+            result.seconds == pytest.approx(0.1, rel=0.1))
+
+
+def test_calibrate_scheme_without_rounds_raises():
+    with pytest.raises(ValueError):
+        calibrate_scheme('md5_crypt')
+
+
+def test_calibrate(monkeypatch):
+    monkeypatch.setattr(calibration, 'measure_verify', fake_measure_verify(1e-6))
+
+    result = calibrate({'sha256_crypt': {'salt_size': 16}}, 0.05)
+
+    assert result == {'sha256_crypt': {'salt_size': 16, 'default_rounds': 50000}}
+
+
+def test_calibration_main(monkeypatch, capsys):
+    monkeypatch.setattr(calibration, 'measure_verify', fake_measure_verify(1e-6))
+
+    calibration.main(['--target-ms', '20', 'sha256_crypt'])
+
+    assert 'default_rounds: 20000' in capsys.readouterr().out
+
+
 @mock.patch.object(TOTP, 'using')
 def test_create_totp_factory(totp_using, passlib_verifier):
     totp_using.return_value = 'factory'
@@ -1,11 +1,20 @@
+import asyncio
 import pytest
 import collections
+import concurrent.futures
 import itertools
+import threading
+import time
 from unittest import mock
 
 from yosai.core import (
+    ALL_TARGETS,
+    AccountStoreRealm,
+    DecisionCache,
     DefaultPermission,
     ModularRealmAuthorizer,
+    RoleHierarchy,
+    SimpleIdentifierCollection,
     UnauthorizedException,
     event_bus,
     realm_abcs,
@@ -15,6 +24,255 @@ from yosai.core import (
 # ModularRealmAuthorizer Tests
 # -----------------------------------------------------------------------------
 
+
+def test_mra_init_decision_cache():
+    settings = mock.Mock(AUTHZ_CONFIG={'decision_cache': {
+        'enabled': True, 'maxsize': 10, 'ttl': 5, 'eviction_policy': 'fifo'}})
+
+    mra = ModularRealmAuthorizer(settings)
+
+    assert ((mra.decision_cache.maxsize, mra.decision_cache.ttl,
+             mra.decision_cache.eviction_policy) == (10, 5, 'fifo') and
+            ModularRealmAuthorizer().decision_cache is None and
+            ModularRealmAuthorizer(mock.Mock(AUTHZ_CONFIG=None)).decision_cache is None)
+
+
+def test_mra_init_parallel_realms():
+    settings = mock.Mock(AUTHZ_CONFIG={'parallel_realms': {
+        'enabled': True, 'max_workers': 3, 'timeout': 2}})
+
+    mra = ModularRealmAuthorizer(settings)
+
+    assert (mra.realm_executor._max_workers == 3 and mra.realm_timeout == 2 and
+            ModularRealmAuthorizer(mock.Mock(AUTHZ_CONFIG=None)).realm_executor is None)
+
+
+def test_mra_shutdown():
+    settings = mock.Mock(AUTHZ_CONFIG={'parallel_realms': {
+        'enabled': True, 'max_workers': 3, 'timeout': 2}})
+    mra = ModularRealmAuthorizer(settings)
+    executor = mra.realm_executor
+
+    mra.shutdown()
+    mra.shutdown()  # idempotent
+
+    assert mra.realm_executor is None
+    with pytest.raises(RuntimeError):
+        executor.submit(print)
+
+
+@pytest.fixture(scope='function')
+def parallel_authorizer(modular_realm_authorizer_patched):
+    mra = modular_realm_authorizer_patched
+    mra.realm_executor = concurrent.futures.ThreadPoolExecutor(max_workers=3)
+    mra.realm_timeout = 5
+    yield mra
+    mra.shutdown(wait=False)
+
+
+def realm_granting(granted, delay=0, started=None):
+    def is_permitted(identifiers, permission_s):
+        if started is not None:
+            started.append(threading.current_thread().name)
+        time.sleep(delay)
+        for permission in permission_s:
+            yield (permission, permission in granted)
+    return is_permitted
+
+
+def test_mra_is_permitted_parallel_realms(parallel_authorizer, monkeypatch):
+    """
+    unit tested:  is_permitted
+
+    test case:
+    with a realm executor, realms are consulted concurrently and their results
+    merged
+    """
+    mra = parallel_authorizer
+    started = []
+    for realm, granted in zip(mra.realms, ({'d:a1'}, {'d:a2'}, set())):
+        monkeypatch.setattr(realm, 'is_permitted',
+                            realm_granting(granted, 0.2, started))
+
+    begin = time.monotonic()
+    results = mra.is_permitted('identifiers', ['d:a1', 'd:a2', 'd:a3'], False)
+    elapsed = time.monotonic() - begin
+
+    assert (results == {('d:a1', True), ('d:a2', True), ('d:a3', False)} and
+            len(set(started)) == 3 and elapsed < 0.5)
+
+
+def test_mra_is_permitted_collective_parallel_any(parallel_authorizer, monkeypatch):
+    """
+    unit tested:  is_permitted_collective
+
+    test case:
+    with any, the first grant decides without waiting for slower realms
+    """
+    mra = parallel_authorizer
+    monkeypatch.setattr(mra.realms[0], 'is_permitted', realm_granting(set(), 1))
+    monkeypatch.setattr(mra.realms[1], 'is_permitted', realm_granting({'d:a1'}))
+    monkeypatch.setattr(mra.realms[2], 'is_permitted', realm_granting(set(), 1))
+    monkeypatch.setattr(mra, 'notify_event', mock.Mock())
+
+    begin = time.monotonic()
+    assert mra.is_permitted_collective('identifiers', ['d:a1', 'd:a2'], any)
+    assert time.monotonic() - begin < 0.5
+
+
+@pytest.mark.parametrize('granted_s, expected',
+                         [(({'d:a1'}, {'d:a2'}, set()), True),
+                          (({'d:a1'}, set(), set()), False)])
+def test_mra_is_permitted_collective_parallel_all(
+        parallel_authorizer, monkeypatch, granted_s, expected):
+    mra = parallel_authorizer
+    for realm, granted in zip(mra.realms, granted_s):
+        monkeypatch.setattr(realm, 'is_permitted', realm_granting(granted))
+    monkeypatch.setattr(mra, 'notify_event', mock.Mock())
+
+    assert mra.is_permitted_collective('identifiers', ['d:a1', 'd:a2'], all) is expected
+
+
+def test_mra_is_permitted_parallel_realm_timeout(parallel_authorizer, monkeypatch):
+    """
+    unit tested:  is_permitted
+
+    test case:
+    a realm that does not respond within the timeout grants nothing
+    """
+    mra = parallel_authorizer
+    mra.realm_timeout = 0.2
+    monkeypatch.setattr(mra.realms[0], 'is_permitted', realm_granting({'d:a1'}, 1))
+    monkeypatch.setattr(mra.realms[1], 'is_permitted', realm_granting({'d:a2'}))
+    monkeypatch.setattr(mra.realms[2], 'is_permitted', realm_granting(set()))
+
+    begin = time.monotonic()
+    results = mra.is_permitted('identifiers', ['d:a1', 'd:a2'], False)
+
+    assert (results == {('d:a1', False), ('d:a2', True)} and
+            time.monotonic() - begin < 0.5)
+
+
+def async_realm_granting(granted, delay=0):
+    async def is_permitted_async(identifiers, permission_s):
+        await asyncio.sleep(delay)
+        return [(permission, permission in granted) for permission in permission_s]
+    return is_permitted_async
+
+
+def test_mra_is_permitted_async(modular_realm_authorizer_patched, monkeypatch):
+    """
+    unit tested:  is_permitted_async
+
+    test case:
+    async realms are awaited concurrently, a realm without the async protocol
+    is consulted in an executor, and the results are merged
+    """
+    mra = modular_realm_authorizer_patched
+    monkeypatch.setattr(mra.realms[0], 'is_permitted_async',
+                        async_realm_granting({'d:a1'}, 0.2), raising=False)
+    monkeypatch.setattr(mra.realms[1], 'is_permitted_async',
+                        async_realm_granting(set(), 0.2), raising=False)
+    monkeypatch.setattr(mra.realms[2], 'is_permitted', realm_granting({'d:a2'}))
+    monkeypatch.setattr(mra, 'notify_event', mock.Mock())
+
+    loop = asyncio.get_event_loop()
+    begin = time.monotonic()
+    results = loop.run_until_complete(mra.is_permitted_async('identifiers',
+                                                             ['d:a1', 'd:a2', 'd:a3']))
+
+    assert (results == {('d:a1', True), ('d:a2', True), ('d:a3', False)} and
+            time.monotonic() - begin < 0.35)
+    mra.notify_event.assert_called_once_with(
+        'identifiers', mock.ANY, 'AUTHORIZATION.RESULTS')
+
+
+@pytest.mark.parametrize('logical_operator, granted_s, expected',
+                         [(any, ({'d:a1'}, set(), set()), True),
+                          (all, ({'d:a1'}, {'d:a2'}, set()), True),
+                          (all, ({'d:a1'}, set(), set()), False)])
+def test_mra_is_permitted_collective_async(
+        modular_realm_authorizer_patched, monkeypatch, logical_operator,
+        granted_s, expected):
+    """
+    unit tested:  is_permitted_collective_async
+
+    test case:
+    the outcome is decided by the realms that have completed, without waiting
+    for a slow realm once it is decided
+    """
+    mra = modular_realm_authorizer_patched
+    for realm, granted, delay in zip(mra.realms, granted_s, (0, 0, 5 if expected else 0)):
+        monkeypatch.setattr(realm, 'is_permitted_async',
+                            async_realm_granting(granted, delay), raising=False)
+    monkeypatch.setattr(mra, 'notify_event', mock.Mock())
+
+    loop = asyncio.get_event_loop()
+    begin = time.monotonic()
+    result = loop.run_until_complete(mra.is_permitted_collective_async(
+        'identifiers', ['d:a1', 'd:a2'], logical_operator))
+
+    assert result is expected and time.monotonic() - begin < 1
+
+
+def test_mra_check_role_async_raises(modular_realm_authorizer_patched, monkeypatch):
+    mra = modular_realm_authorizer_patched
+
+    async def has_role_async(identifiers, role_s):
+        return [(role, False) for role in role_s]
+
+    for realm in mra.realms:
+        monkeypatch.setattr(realm, 'has_role_async', has_role_async, raising=False)
+    monkeypatch.setattr(mra, 'notify_event', mock.Mock())
+    loop = asyncio.get_event_loop()
+
+    with pytest.raises(UnauthorizedException):
+        loop.run_until_complete(mra.check_role_async('identifiers', ['role1'], all))
+    mra.notify_event.assert_called_once_with(
+        'identifiers', ['role1'], 'AUTHORIZATION.DENIED', all)
+
+
+@mock.patch.object(ModularRealmAuthorizer, 'register_cache_clear_listener')
+def test_mra_init_realms_applies_decision_cache(mock_rccl):
+    mra = ModularRealmAuthorizer()
+    mra.decision_cache = DecisionCache()
+    realm = mock.create_autospec(AccountStoreRealm, instance=True)
+    realm.decision_cache = None
+
+    mra.init_realms((realm,))
+
+    assert realm.decision_cache is mra.decision_cache
+
+
+@mock.patch.object(ModularRealmAuthorizer, 'register_cache_clear_listener')
+def test_mra_init_realms_applies_role_hierarchy(mock_rccl):
+    mra = ModularRealmAuthorizer(mock.Mock(AUTHZ_CONFIG={
+        'role_hierarchy': {'admin': ['editor'], 'editor': 'viewer'}}))
+    realm = mock.create_autospec(AccountStoreRealm, instance=True)
+    realm.role_hierarchy = None
+
+    mra.init_realms((realm,))
+
+    assert (realm.role_hierarchy is mra.role_hierarchy and
+            mra.role_hierarchy.implied_roles('admin') == {'admin', 'editor', 'viewer'} and
+            ModularRealmAuthorizer(mock.Mock(AUTHZ_CONFIG=None)).role_hierarchy is None)
+    realm.load_role_hierarchy.assert_called_once_with()
+
+
+@mock.patch.object(ModularRealmAuthorizer, 'register_cache_clear_listener')
+def test_mra_init_realms_applies_negative_cache(mock_rccl):
+    settings = mock.Mock(AUTHZ_CONFIG={'negative_cache_ttl': 5,
+                                       'negative_cache_shared': True})
+    mra = ModularRealmAuthorizer(settings)
+    realm = mock.create_autospec(AccountStoreRealm, instance=True)
+    realm.negative_cache_ttl = None
+
+    mra.init_realms((realm,))
+
+    assert (realm.negative_cache_ttl == 5 and realm.negative_cache_shared is True and
+            ModularRealmAuthorizer(mock.Mock(AUTHZ_CONFIG=None)).negative_cache_ttl == 30)
+
+
 @mock.patch.object(ModularRealmAuthorizer, 'register_cache_clear_listener')
 def test_mra_init_realms(mock_rccl, modular_realm_authorizer_patched):
     mra = modular_realm_authorizer_patched
@@ -26,6 +284,45 @@ def test_mra_init_realms(mock_rccl, modular_realm_authorizer_patched):
     mock_rccl.assert_called_once_with()
 
 
+@pytest.fixture(scope='function')
+def routed_authorizer(monkeypatch):
+    mra = ModularRealmAuthorizer()
+    monkeypatch.setattr(mra, 'register_cache_clear_listener', mock.Mock())
+    realms = []
+    for name in ('realm1', 'realm2'):
+        realm = mock.create_autospec(AccountStoreRealm, instance=True)
+        realm.name = name
+        realm.is_permitted.return_value = iter([('domain1:action1', True)])
+        realms.append(realm)
+    mra.init_realms(realms)
+    return mra
+
+
+def test_mra_routes_to_source_realms(routed_authorizer):
+    """
+    unit tested:  realms_for, _is_permitted
+
+    test case:
+    only the realms that the identifiers originate from are consulted
+    """
+    mra = routed_authorizer
+    identifiers = SimpleIdentifierCollection(source_name='realm2', identifier='thedude')
+
+    results = list(mra._is_permitted(identifiers, ['domain1:action1']))
+
+    assert results == [('domain1:action1', True)]
+    assert (not mra.realm_map['realm1'].is_permitted.called and
+            mra.realm_map['realm2'].is_permitted.called)
+
+
+def test_mra_routes_to_all_realms_for_unknown_sources(routed_authorizer):
+    mra = routed_authorizer
+    identifiers = SimpleIdentifierCollection(source_name='other', identifier='thedude')
+
+    assert mra.realms_for(identifiers) == mra.realms
+    assert mra.realms_for('identifiers') == mra.realms
+
+
 def test_mra_assert_realms_configured_success(modular_realm_authorizer_patched):
     """
     unit tested:  assert_realms_configured
@@ -175,6 +472,95 @@ def test_mra_is_permitted_fails(modular_realm_authorizer_patched, monkeypatch):
         assert set(results) == set([('permission1', False), ('permission2', False)])
 
 
+def test_mra_filter_permitted(modular_realm_authorizer_patched, monkeypatch):
+    """
+    unit tested:  filter_permitted
+
+    test case:
+    each realm is asked only about targets not yet permitted, realms that do
+    not support filtering are asked through is_permitted, and the permitted
+    targets are returned in the order given
+    """
+    mra = modular_realm_authorizer_patched
+    filtered = []
+
+    def filter_permitted(identifiers, domain, action, targets):
+        filtered.append(list(targets))
+        return [target for target in targets if target in (3, 1)]
+
+    def is_permitted(identifiers, permission_s):
+        filtered.append(list(permission_s))
+        for permission in permission_s:
+            yield (permission, permission == 'blogpost:edit:4')
+
+    monkeypatch.setattr(mra.realms[0], 'filter_permitted', filter_permitted,
+                        raising=False)
+    monkeypatch.setattr(mra.realms[1], 'is_permitted', is_permitted)
+    monkeypatch.setattr(mra, 'realms', mra.realms[:2])
+    monkeypatch.setattr(mra, 'notify_event', mock.Mock())
+
+    results = mra.filter_permitted('identifiers', 'blogpost', 'edit', [1, 2, 3, 4])
+
+    assert (results == [1, 3, 4] and
+            filtered == [[1, 2, 3, 4], ['blogpost:edit:2', 'blogpost:edit:4']])
+    mra.notify_event.assert_called_once_with(
+        'identifiers', [('blogpost:edit:1', True), ('blogpost:edit:2', False),
+                        ('blogpost:edit:3', True), ('blogpost:edit:4', True)],
+        'AUTHORIZATION.RESULTS')
+
+
+def test_mra_is_permitted_matrix(modular_realm_authorizer_patched, monkeypatch):
+    """
+    unit tested:  is_permitted_matrix
+
+    test case:
+    realms supporting it encode a subject's grants into the matrix, other
+    realms are asked through is_permitted, and a row is added per subject
+    """
+    mra = modular_realm_authorizer_patched
+
+    def permitted_mask(identifiers, matrix):
+        return matrix.encode([DefaultPermission(wildcard_string=identifiers)])
+
+    def is_permitted(identifiers, permission_s):
+        for permission in permission_s:
+            yield (permission, permission == 'domain2:action1')
+
+    monkeypatch.setattr(mra.realms[0], 'permitted_mask', permitted_mask,
+                        raising=False)
+    monkeypatch.setattr(mra.realms[1], 'is_permitted', is_permitted)
+    monkeypatch.setattr(mra, 'realms', mra.realms[:2])
+
+    matrix = mra.is_permitted_matrix(['domain1:*', 'domain3:action1'],
+                                     ['domain1:action1', 'domain2:action1',
+                                      'domain3:action1'])
+
+    assert (matrix.granted(0) == ['domain1:action1', 'domain2:action1'] and
+            matrix.granted(1) == ['domain2:action1', 'domain3:action1'])
+
+
+@pytest.mark.parametrize('realm_targets, expected',
+                         [(({'1', '2'}, None, {'2', '3'}), frozenset(['1', '2', '3'])),
+                          (({'1'}, ALL_TARGETS, {'2'}), ALL_TARGETS)])
+def test_mra_permitted_targets(
+        modular_realm_authorizer_patched, monkeypatch, realm_targets, expected):
+    """
+    unit tested:  permitted_targets
+
+    test case:
+    the targets of every realm supporting the query are unioned, unless a realm
+    grants all targets
+    """
+    mra = modular_realm_authorizer_patched
+
+    for realm, targets in zip(mra.realms, realm_targets):
+        if targets is not None:
+            monkeypatch.setattr(realm, 'permitted_targets',
+                                mock.Mock(return_value=targets), raising=False)
+
+    assert mra.permitted_targets('identifiers', 'blogpost', 'edit') == expected
+
+
 @pytest.mark.parametrize('mock_results, logical_operator, expected',
                          [({('permission1', True), ('permission2', True)}, all, True),
                           ({('permission1', True), ('permission2', False)}, all, False),
@@ -192,30 +578,108 @@ def test_mra_is_permitted_collective(
     a collection of permissions receives a single Boolean
     """
     mra = modular_realm_authorizer_patched
-    monkeypatch.setattr(mra, 'is_permitted', lambda x,y,log_results: mock_results)
+    for realm in mra.realms:
+        monkeypatch.setattr(realm, 'is_permitted', lambda x, y: iter(mock_results))
     with mock.patch.object(mra, 'assert_realms_configured') as mra_arc:
         mra_arc.return_value = None
         with mock.patch.object(mra, 'notify_event') as mra_ne:
             mra_ne.return_value = None
 
             results = mra.is_permitted_collective({'identifiers'},
-                                                  ['perm1', 'perm2'],
+                                                  ['permission1', 'permission2'],
                                                   logical_operator)
             mra_arc.assert_called_once_with()
             assert results == expected
             if expected is True:
                 mra_ne.assert_called_once_with({'identifiers'},
-                                               ['perm1', 'perm2'],
+                                               ['permission1', 'permission2'],
                                                'AUTHORIZATION.GRANTED',
                                                logical_operator)
 
             else:
                 mra_ne.assert_called_once_with({'identifiers'},
-                                               ['perm1', 'perm2'],
+                                               ['permission1', 'permission2'],
                                                'AUTHORIZATION.DENIED',
                                                logical_operator)
 
 
+def test_mra_is_permitted_collective_any_short_circuits(
+        modular_realm_authorizer_patched, monkeypatch):
+    """
+    unit tested:  is_permitted_collective
+
+    test case:
+    with any, evaluation stops at the first grant and no other realm is consulted
+    """
+    mra = modular_realm_authorizer_patched
+    consumed = []
+
+    def is_permitted(identifiers, permission_s):
+        for permission in permission_s:
+            consumed.append(permission)
+            yield (permission, permission == 'domain1:action1')
+
+    monkeypatch.setattr(mra.realms[0], 'is_permitted', is_permitted)
+    monkeypatch.setattr(mra.realms[1], 'is_permitted', mock.Mock())
+    monkeypatch.setattr(mra, 'notify_event', mock.Mock())
+
+    assert mra.is_permitted_collective(
+        'identifiers', ['domain1:action1', 'domain1:action2'], any)
+    assert consumed == ['domain1:action1'] and not mra.realms[1].is_permitted.called
+
+
+def test_mra_is_permitted_collective_all_narrows_and_fails_fast(
+        modular_realm_authorizer_patched, monkeypatch):
+    """
+    unit tested:  is_permitted_collective
+
+    test case:
+    with all, realms are only asked about permissions not yet granted and
+    evaluation stops at the first permission that the last realm denies
+    """
+    mra = modular_realm_authorizer_patched
+    requested = []
+
+    def realm_granting(granted):
+        def is_permitted(identifiers, permission_s):
+            requested.append(list(permission_s))
+            for permission in permission_s:
+                yield (permission, permission in granted)
+        return is_permitted
+
+    monkeypatch.setattr(mra.realms[0], 'is_permitted', realm_granting({'d:a1'}))
+    monkeypatch.setattr(mra.realms[1], 'is_permitted', realm_granting({'d:a2'}))
+    monkeypatch.setattr(mra.realms[2], 'is_permitted', realm_granting(set()))
+    monkeypatch.setattr(mra, 'notify_event', mock.Mock())
+
+    assert not mra.is_permitted_collective('identifiers',
+                                           ['d:a1', 'd:a2', 'd:a3', 'd:a4'], all)
+    assert requested == [['d:a1', 'd:a2', 'd:a3', 'd:a4'],
+                         ['d:a2', 'd:a3', 'd:a4'],
+                         ['d:a3', 'd:a4']]
+    mra.notify_event.assert_called_once_with(
+        'identifiers', ['d:a1', 'd:a2', 'd:a3', 'd:a4'], 'AUTHORIZATION.DENIED', all)
+
+
+def test_mra_is_permitted_collective_other_operator(
+        modular_realm_authorizer_patched, monkeypatch):
+    """
+    unit tested:  is_permitted_collective
+
+    test case:
+    an operator other than any or all is applied to the complete results
+    """
+    mra = modular_realm_authorizer_patched
+    monkeypatch.setattr(mra, 'is_permitted', mock.Mock(
+        return_value={('permission1', True), ('permission2', False)}))
+    monkeypatch.setattr(mra, 'notify_event', mock.Mock())
+
+    def exactly_one(results):
+        return sum(results) == 1
+
+    assert mra.is_permitted_collective('identifiers', ['permission1', 'permission2'],
+                                       exactly_one)
+
 
 def test_mra_check_permission_collection_raises(
         modular_realm_authorizer_patched, monkeypatch):
@@ -371,6 +835,24 @@ def test_mra_has_role_collective(
             assert result == expected and arc.called
 
 
+def test_mra_has_role_collective_all_narrows(
+        modular_realm_authorizer_patched, monkeypatch):
+    mra = modular_realm_authorizer_patched
+    requested = []
+
+    def has_role(identifiers, role_s):
+        requested.append(role_s)
+        for role in role_s:
+            yield (role, role == 'role1')
+
+    for realm in mra.realms:
+        monkeypatch.setattr(realm, 'has_role', has_role)
+    monkeypatch.setattr(mra, 'notify_event', mock.Mock())
+
+    assert not mra.has_role_collective('identifiers', ['role1', 'role2'], all)
+    assert requested == [['role1', 'role2'], ['role2'], ['role2']]
+
+
 def test_mra_check_role_raises(
         modular_realm_authorizer_patched, monkeypatch):
     """
@@ -482,3 +964,139 @@ def test_mra_notify_event_raises(
     with pytest.raises(AttributeError):
         mra.notify_results('identifiers', 'result')
 
+
+# -----------------------------------------------------------------------------
+# DecisionCache Tests
+# -----------------------------------------------------------------------------
+
+class FakeTimer:
+    now = 0
+
+    def __call__(self):
+        return self.now
+
+
+def test_decision_cache_get_set():
+    cache = DecisionCache()
+    cache.set_many('realm', 'thedude', 'permission', {'domain1:action1': True})
+
+    assert (cache.get_many('realm', 'thedude', 'permission',
+                           ['domain1:action1', 'domain1:action2']) ==
+            {'domain1:action1': True})
+    assert cache.get_many('realm', 'thedude', 'role', ['domain1:action1']) == {}
+    assert (cache.hits, cache.misses) == (1, 2)
+
+
+def test_decision_cache_expires():
+    timer = FakeTimer()
+    cache = DecisionCache(ttl=10, timer=timer)
+    cache.set_many('realm', 'thedude', 'role', {'role1': True})
+
+    timer.now = 9
+    assert cache.get_many('realm', 'thedude', 'role', ['role1']) == {'role1': True}
+    timer.now = 10
+    assert cache.get_many('realm', 'thedude', 'role', ['role1']) == {}
+    assert len(cache) == 0
+
+
+@pytest.mark.parametrize('eviction_policy, expected',
+                         [('lru', {'role1', 'role3'}), ('fifo', {'role2', 'role3'})])
+def test_decision_cache_eviction_policy(eviction_policy, expected):
+    cache = DecisionCache(maxsize=2, eviction_policy=eviction_policy)
+    cache.set_many('realm', 'thedude', 'role', {'role1': True})
+    cache.set_many('realm', 'thedude', 'role', {'role2': True})
+    cache.get_many('realm', 'thedude', 'role', ['role1'])
+    cache.set_many('realm', 'thedude', 'role', {'role3': True})
+
+    found = cache.get_many('realm', 'thedude', 'role', ['role1', 'role2', 'role3'])
+    assert set(found) == expected
+
+
+def test_decision_cache_invalidate():
+    cache = DecisionCache()
+    cache.set_many('realm', 'thedude', 'role', {'role1': True})
+    cache.set_many('realm', 'walter', 'role', {'role1': True})
+
+    cache.invalidate('realm', 'thedude')
+
+    assert (cache.get_many('realm', 'thedude', 'role', ['role1']) == {} and
+            cache.get_many('realm', 'walter', 'role', ['role1']) == {'role1': True})
+
+
+def test_decision_cache_invalid_policy_raises():
+    with pytest.raises(ValueError):
+        DecisionCache(eviction_policy='random')
+
+
+# -----------------------------------------------------------------------------
+# RoleHierarchy Tests
+# -----------------------------------------------------------------------------
+
+def test_role_hierarchy_closure():
+    hierarchy = RoleHierarchy({'admin': ['editor', 'auditor'], 'editor': 'viewer'})
+
+    assert (hierarchy.implied_roles('admin') == {'admin', 'editor', 'auditor', 'viewer'} and
+            hierarchy.implied_roles('editor') == {'editor', 'viewer'} and
+            hierarchy.implied_roles('guest') == {'guest'})
+    assert hierarchy.expand(['editor', 'guest']) == {'editor', 'viewer', 'guest'}
+
+
+def test_role_hierarchy_add_updates_seniors():
+    hierarchy = RoleHierarchy({'admin': ['editor']})
+    assert hierarchy.expand({'admin'}) == {'admin', 'editor'}
+
+    hierarchy.add('editor', 'viewer')
+
+    assert (hierarchy.implied_roles('admin') == {'admin', 'editor', 'viewer'} and
+            hierarchy.expand({'admin'}) == {'admin', 'editor', 'viewer'})
+
+
+def test_role_hierarchy_remove_recomputes_seniors():
+    hierarchy = RoleHierarchy({'admin': ['editor', 'viewer'], 'editor': ['viewer'],
+                               'owner': ['admin']})
+
+    hierarchy.remove('editor', 'viewer')
+    assert (hierarchy.implied_roles('editor') == {'editor'} and
+            hierarchy.implied_roles('owner') == {'owner', 'admin', 'editor', 'viewer'})
+
+    hierarchy.remove('admin', ['viewer'])
+    assert hierarchy.implied_roles('owner') == {'owner', 'admin', 'editor'}
+    assert hierarchy.implications == {'admin': {'editor'}, 'owner': {'admin'}}
+
+
+def test_role_hierarchy_cycle():
+    hierarchy = RoleHierarchy({'a': 'b', 'b': 'c', 'c': 'a'})
+
+    assert all(hierarchy.implied_roles(role) == {'a', 'b', 'c'} for role in 'abc')
+
+    hierarchy.remove('c', 'a')
+    assert (hierarchy.implied_roles('a') == {'a', 'b', 'c'} and
+            hierarchy.implied_roles('c') == {'c'})
+
+
+def test_role_hierarchy_change_notifies_listeners():
+    hierarchy = RoleHierarchy()
+    listener = mock.Mock()
+    hierarchy.add_listener(listener)
+    hierarchy.add_listener(listener)  # registered once
+
+    hierarchy.add('admin', 'editor')
+    hierarchy.remove('admin', 'viewer')  # not implied, so no change
+    hierarchy.clear()
+
+    assert listener.call_count == 2 and hierarchy.implied_roles('admin') == {'admin'}
+
+
+def test_role_hierarchy_holds_bound_method_listeners_weakly():
+    class Owner:
+        def on_change(self):
+            pass
+
+    hierarchy = RoleHierarchy()
+    owner = Owner()
+    hierarchy.add_listener(owner.on_change)
+    hierarchy.add_listener(owner.on_change)
+    assert hierarchy.listeners == [owner.on_change]
+
+    del owner
+    assert hierarchy.listeners == []
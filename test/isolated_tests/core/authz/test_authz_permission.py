@@ -1,8 +1,16 @@
+import pickle
 import pytest
 from unittest import mock
 
 from yosai.core import (
+    ALL_TARGETS,
+    ActionBits,
+    CompiledPermissions,
     DefaultPermission,
+    PermissionIndex,
+    PermissionInterner,
+    PermissionMatrix,
+    PermissionTemplate,
     WildcardPermission,
 )
 
@@ -18,10 +26,10 @@ def test_wcp_init_with_wildcard_string(monkeypatch):
     test case:
     control flow depending on whether a wildcard_string is passed
     """
-    with mock.patch.object(WildcardPermission, 'setparts') as wp_sp:
+    with mock.patch.object(WildcardPermission, '_setparts') as wp_sp:
         wp_sp.return_value = None
         wcs = WildcardPermission(wildcard_string='DOMAIN:ACTION:INSTANCE')
-        assert wcs.setparts.called
+        assert wcs._setparts.called
 
 def test_wcp_init_without_wildcard_string(monkeypatch):
     """
@@ -30,40 +38,36 @@ def test_wcp_init_without_wildcard_string(monkeypatch):
     test case:
     control flow depending on whether a wildcard_string is passed
     """
-    with mock.patch.object(WildcardPermission, 'setparts') as wp_sp:
+    with mock.patch.object(WildcardPermission, '_setparts') as wp_sp:
         wp_sp.return_value = None
         with pytest.raises(ValueError):
             wcs = WildcardPermission()
 
 
-def test_wcp_setparts_casesensitive(
-        default_wildcard_permission, monkeypatch):
+def test_wcp_setparts_casesensitive():
     """
-    unit tested:  setparts
+    unit tested:  _setparts
 
     test case:
     case_sensitive parts remain as-is
     """
-    wcp = default_wildcard_permission
-    monkeypatch.setattr(wcp, 'case_sensitive', True)
     wildcardstring = "One,Two,Three:Four,Five,Six:Seven,Eight"
-    wcp.setparts(wildcard_string=wildcardstring)
+    wcp = WildcardPermission(wildcard_string=wildcardstring, case_sensitive=True)
     expected_parts = {'domain': set(['One', 'Two', 'Three']),
                       'action': set(['Four', 'Five', 'Six']),
                       'target': set(['Seven', 'Eight'])}
     assert expected_parts == wcp.parts
 
-def test_wcp_setparts(default_wildcard_permission, monkeypatch):
+
+def test_wcp_setparts():
     """
-    unit tested:  setparts
+    unit tested:  _setparts
 
     test case:
     verify normal, successful activity
     """
-    wcp = default_wildcard_permission
-    monkeypatch.setattr(wcp, 'case_sensitive', True)
     wildcardstring = "one,two,three:four,five,six:seven,eight"
-    wcp.setparts(wildcard_string=wildcardstring)
+    wcp = WildcardPermission(wildcard_string=wildcardstring, case_sensitive=True)
     expected_parts = {}
     expected_parts['domain'] = set(['one', 'two', 'three'])
     expected_parts['action'] = set(['four', 'five', 'six'])
@@ -262,6 +266,113 @@ def test_wcp_not_equals_bad_type():
     assert not p1 == p2
 
 
+def test_wcp_hashable():
+    p1 = WildcardPermission('domain1:action1,action2')
+    p2 = WildcardPermission('domain1:action2,action1')
+    p3 = DefaultPermission(parts={'domain': 'domain1',
+                                  'action': ['action1', 'action2']})
+
+    assert hash(p1) == hash(p2) == hash(p3) and len({p1, p2, p3}) == 1
+
+
+def test_wcp_is_frozen():
+    wcp = WildcardPermission('domain1:action1')
+
+    assert not hasattr(wcp, '__dict__')
+    assert isinstance(wcp.parts['action'], frozenset)
+    with pytest.raises(TypeError):
+        wcp.parts['action'] = {'action2'}
+
+
+def test_wcp_parts_set_once():
+    """
+    unit tested:  _freeze
+
+    test case:
+    a constructed permission, which may be shared by the interner, cannot be
+    re-parsed into different parts
+    """
+    wcp = DefaultPermission('domain1:action1')
+    before = hash(wcp)
+
+    with pytest.raises(AttributeError):
+        wcp._setparts('domain2:action2')
+    with pytest.raises(AttributeError):
+        wcp.set_parts_from_dict({'domain': 'domain2', 'action': ['action2']})
+
+    assert wcp == DefaultPermission('domain1:action1') and hash(wcp) == before
+
+
+def test_wcp_setstate_roundtrip():
+    wcp = WildcardPermission('domain1:action1,action2:target1')
+    restored = WildcardPermission.__new__(WildcardPermission)
+    restored.__setstate__(wcp.__getstate__())
+
+    assert (restored == wcp and hash(restored) == hash(wcp) and
+            restored._action_mask == wcp._action_mask)
+
+
+@pytest.mark.parametrize("granted,required,expected",
+                         [('d:read,write,delete:*', 'd:write,delete', True),
+                          ('d:read,write', 'd:write,publish', False),
+                          ('d:*', 'd:read,publish', True),
+                          ('d:read', 'd:*', False),
+                          ('d:*,read', 'd:*', True)])
+def test_wcp_implies_action_mask(granted, required, expected):
+    """
+    unit tested:  implies
+
+    test case:
+    the action level, compared as masks, answers as the subset comparison does
+    """
+    granted = WildcardPermission(granted)
+    required = WildcardPermission(required)
+
+    assert (granted.implies(required) is expected and expected ==
+            ('*' in granted.action or required.action <= granted.action))
+
+
+def test_action_bits_mask():
+    bits = ActionBits()
+
+    assert (bits.mask(['read']) == 1 and bits.mask(['write', 'read']) == 3 and
+            bits.mask(['read', '*']) == -1 and len(bits) == 2)
+
+
+def test_action_bits_maxsize():
+    """
+    unit tested:  mask
+
+    test case:
+    actions beyond maxsize are not assigned a bit, so the table and the masks
+    stay bounded
+    """
+    bits = ActionBits(maxsize=2)
+    bits.mask(['read', 'write'])
+
+    assert (bits.mask(['read', 'delete']) is None and
+            bits.mask(['delete', '*']) == -1 and
+            bits.mask(['write']) == 2 and len(bits) == 2)
+
+
+@pytest.mark.parametrize("granted,required,expected",
+                         [('domain1:read,delete', 'domain1:delete', True),
+                          ('domain1:read', 'domain1:delete', False),
+                          ('domain1:delete', 'domain1:read', False),
+                          ('domain1:*', 'domain1:delete', True),
+                          ('domain1:delete', 'domain1:*', False)])
+def test_wcp_implies_actions_beyond_maxsize(monkeypatch, granted, required, expected):
+    """
+    unit tested:  implies
+
+    test case:
+    an action without a bit is compared as a set
+    """
+    monkeypatch.setattr('yosai.core.authz.authz.action_bits', ActionBits(maxsize=1))
+
+    assert WildcardPermission(granted).implies(WildcardPermission(required)) is expected
+
+
 
 # -----------------------------------------------------------------------------
 # DefaultPermission Tests
@@ -292,6 +403,16 @@ def test_dp_setstate():
     assert dp.parts == expected_parts
 
 
+def test_dp_getstate_roundtrip():
+    dp = DefaultPermission('domain1:action1,action2:target1')
+    state = dp.__getstate__()
+    restored = DefaultPermission.__new__(DefaultPermission)
+    restored.__setstate__(state)
+
+    assert (state['parts']['action'] == ['action1', 'action2'] and
+            restored == dp)
+
+
 @pytest.mark.parametrize(
     "domain,actions,targets,permission",
     [('domain', 'action1,action2,action3', 'target1,target2,target3',
@@ -313,58 +434,300 @@ def test_dp_encode_parts_creates_permission(
     assert encoded_permission == permission
 
 
-def test_set_parts_domain(default_permission):
+# -----------------------------------------------------------------------------
+# PermissionIndex Tests
+# -----------------------------------------------------------------------------
+
+@pytest.fixture(scope='function')
+def granted_permissions():
+    return [DefaultPermission(parts=dict(domain='domain1', action=['action1'])),
+            DefaultPermission(parts=dict(domain='domain2', action=['action1', 'action2'])),
+            DefaultPermission(parts=dict(domain='domain3',
+                                         action=['action1', 'action2', 'action3'],
+                                         target=['target1'])),
+            DefaultPermission(parts=dict(domain='domain4', action=['action1', 'action2'])),
+            DefaultPermission(parts=dict(domain='domain4', action=['action3'],
+                                         target=['target1'])),
+            DefaultPermission(wildcard_string='*:action5')]
+
+
+@pytest.mark.parametrize("required",
+                         ['domain1:action1', 'domain1:action1:target1',
+                          'domain2:action2:target9', 'domain3:action3:target1',
+                          'domain3:action1,action2:target1',
+                          'domain3:action1,action3:target1',
+                          'domain4:action1,action2', 'domain4:action3:target1',
+                          'domain4:action3:target2', 'domain9:action5:target1',
+                          'domain9:action6', 'domain1:*', 'domain3:*:target1'])
+def test_pi_implies_matches_linear_scan(granted_permissions, required):
     """
-    unit tested:  set_parts
+    unit tested:  implies
 
     test case:
-    sets are turned into strings and then passed on to super
+    the index answers exactly as a linear scan over the granted permissions
     """
+    required_permission = DefaultPermission(wildcard_string=required)
+    index = PermissionIndex(granted_permissions)
 
-    ddp = default_permission
-    with mock.patch.object(DefaultPermission, 'encode_parts') as ep:
-        ep.return_value = None
-        with mock.patch.object(WildcardPermission, 'setparts') as wc_sp:
-            wc_sp.return_value = None
-            ddp.set_parts({'domain'}, None, None)
-            ep.assert_called_once_with(domain='domain', action=None, target=None)
+    expected = any(perm.implies(required_permission)
+                   for perm in granted_permissions)
 
+    assert index.implies(required_permission) == expected
 
-def test_set_parts_action(default_permission):
+
+@pytest.mark.parametrize("granted,required,expected",
+                         [(['*'], 'domain1:action1:target1', True),
+                          (['domain1:*'], 'domain1:action1:target1', True),
+                          (['*:action1'], 'domain2:action1', True),
+                          (['domain1:action1:target1', 'domain1:action1:target2'],
+                           'domain1:action1:target1,target2', False),
+                          (['domain1:action1:target1,target2'],
+                           'domain1:action1:target1,target2', True),
+                          (['domain1:action1:target1'], 'domain1:action1', False)])
+def test_pi_implies_wildcards_and_multiple_values(granted, required, expected):
     """
-    unit tested:  set_parts
+    unit tested:  implies
 
     test case:
-    sets are turned into strings and then passed on to super
+    wildcard branches are consulted and a multi-valued requirement must be
+    implied by a single grant
     """
+    index = PermissionIndex(DefaultPermission(wildcard_string=perm)
+                            for perm in granted)
 
-    ddp = default_permission
-    with mock.patch.object(DefaultPermission, 'encode_parts') as ep:
-        ep.return_value = None
-        with mock.patch.object(WildcardPermission, 'setparts') as wc_sp:
-            wc_sp.return_value = None
-            ddp.set_parts(None, {'action1', 'action2'}, None)
-            call = ep.call_args_list[0]
-            assert((call == mock.call(action='action1,action2', domain=None, target=None))
-                   or
-                   (call == mock.call(action='action2,action1', domain=None, target=None)))
+    assert index.implies(DefaultPermission(wildcard_string=required)) is expected
+
+
+def test_pi_implies_nonwildcardpermission():
+    index = PermissionIndex([DefaultPermission(wildcard_string='*')])
+    otherpermission = type('OtherPermission', (object,), {})
+    assert index.implies(otherpermission()) is False
 
 
-def test_set_parts_target(default_permission):
+@pytest.mark.parametrize("granted,expected",
+                         [(['blogpost:edit:1,2', 'blogpost:edit:3'], ['1', 2, '3']),
+                          (['blogpost:*:2', '*:edit:4'], [2, '4']),
+                          (['blogpost:edit:*'], ['1', 2, '3', '4', 'ABC']),
+                          (['blogpost:edit:abc'], ['ABC']),
+                          (['blogpost:view:1', 'comment:edit:1'], [])])
+def test_pi_filter_permitted(granted, expected):
     """
-    unit tested:  set_parts
+    unit tested:  filter_permitted
 
     test case:
-    sets are turned into strings and then passed on to super
+    targets are filtered as if 'blogpost:edit:<target>' were checked for each
     """
+    index = PermissionIndex(DefaultPermission(wildcard_string=perm)
+                            for perm in granted)
+    targets = ['1', 2, '3', '4', 'ABC']
 
-    ddp = default_permission
-    with mock.patch.object(DefaultPermission, 'encode_parts') as ep:
-        ep.return_value = None
-        with mock.patch.object(WildcardPermission, 'setparts') as wc_sp:
-            wc_sp.return_value = None
-            ddp.set_parts(None, None, {'target1', 'target2'})
-            call = ep.call_args_list[0]
-            assert((call == mock.call(action=None, domain=None, target='target1,target2'))
-                   or
-                   (call == mock.call(action=None, domain=None, target='target2,target1')))
+    assert index.filter_permitted('blogpost', 'edit', targets) == expected
+    assert expected == [target for target in targets if index.implies(
+        DefaultPermission(wildcard_string='blogpost:edit:{0}'.format(target)))]
+
+
+@pytest.mark.parametrize("granted,expected",
+                         [(['blogpost:edit:1,2', 'blogpost:*:3', '*:edit:4'],
+                           frozenset(['1', '2', '3', '4'])),
+                          (['blogpost:edit:1', 'blogpost:edit'], ALL_TARGETS),
+                          (['blogpost:view:1', 'comment:edit:1'], frozenset())])
+def test_pi_permitted_targets(granted, expected):
+    index = PermissionIndex(DefaultPermission(wildcard_string=perm)
+                            for perm in granted)
+    assert index.permitted_targets('BlogPost', 'Edit') == expected
+
+
+def test_all_targets_contains_every_target():
+    assert (123 in ALL_TARGETS and 'abc' in ALL_TARGETS and
+            pickle.loads(pickle.dumps(ALL_TARGETS)) is ALL_TARGETS)
+
+
+def test_pi_len(granted_permissions):
+    index = PermissionIndex(granted_permissions)
+    assert len(index) == len(granted_permissions)
+
+
+# -----------------------------------------------------------------------------
+# PermissionMatrix Tests
+# -----------------------------------------------------------------------------
+
+@pytest.fixture(scope='function')
+def required_permissions():
+    return ['domain1:action1', 'domain1:action1:target1', 'domain2:action2:target9',
+            'domain3:action1,action2:target1', 'domain4:action3:target2',
+            'domain9:action5:target1', 'domain9:action6', 'domain1:*',
+            'domain3:*:target1']
+
+
+def test_pm_encode_matches_linear_scan(granted_permissions, required_permissions):
+    """
+    unit tested:  encode
+
+    test case:
+    every column is set exactly as a linear scan over the grants would decide
+    """
+    matrix = PermissionMatrix(required_permissions)
+    matrix.rows.append(matrix.encode(granted_permissions))
+
+    assert matrix.results(0) == [
+        (required, any(grant.implies(DefaultPermission(wildcard_string=required))
+                       for grant in granted_permissions))
+        for required in required_permissions]
+
+
+def test_pm_encode_evaluates_each_grant_once(granted_permissions):
+    matrix = PermissionMatrix(['domain1:action1', 'domain4:action3:target1'])
+
+    with mock.patch.object(matrix, '_implied_mask',
+                           side_effect=matrix._implied_mask) as pm_im:
+        masks = [matrix.encode(granted_permissions) for _ in range(3)]
+
+    assert (masks == [0b11] * 3 and
+            pm_im.call_count == len(set(granted_permissions)))
+
+
+def test_pm_encode_results_and_granted():
+    matrix = PermissionMatrix(['domain1:action1', 'domain1:action2', 'domain2:action1'])
+    matrix.rows.append(matrix.encode_results([('domain1:action1', False),
+                                              ('domain1:action2', True),
+                                              ('domain2:action1', True)]))
+
+    assert (matrix.rows == [0b110] and
+            matrix.granted(0) == ['domain1:action2', 'domain2:action1'])
+
+
+# -----------------------------------------------------------------------------
+# PermissionInterner Tests
+# -----------------------------------------------------------------------------
+
+def test_interner_permission_shares_instances():
+    """
+    unit tested:  permission
+
+    test case:
+    a permission string is parsed once, returning the same instance thereafter
+    """
+    interner = PermissionInterner()
+    with mock.patch.object(WildcardPermission, '_setparts',
+                           side_effect=WildcardPermission._setparts,
+                           autospec=True) as wp_sp:
+        p1 = interner.permission('domain1:action1')
+        p2 = interner.permission('domain1:action1')
+        p3 = interner.permission('domain1:action1', case_sensitive=True)
+
+    assert (p1 is p2 and p3 is not p1 and wp_sp.call_count == 2 and
+            interner.hits == 1 and interner.misses == 2)
+
+
+def test_interner_permission_from_parts():
+    parts = {'domain': 'domain1', 'action': ['action1'], 'target': ['target1']}
+    interner = PermissionInterner()
+    p1 = interner.permission_from_parts(parts)
+    p2 = interner.permission_from_parts(dict(parts))
+
+    assert p1 is p2 and p1 == DefaultPermission(parts=parts)
+
+
+def test_interner_evicts_least_recently_used():
+    interner = PermissionInterner(maxsize=2)
+    p1 = interner.permission('domain1')
+    interner.permission('domain2')
+    interner.permission('domain1')
+    interner.permission('domain3')  # evicts domain2
+
+    assert (interner.permission('domain1') is p1 and interner.currsize == 2 and
+            interner.misses == 3)
+    interner.permission('domain2')
+    assert interner.misses == 4
+
+
+def test_interner_clear():
+    interner = PermissionInterner()
+    interner.permission('domain1')
+    interner.permission('domain1')
+    interner.clear()
+    assert (interner.currsize, interner.hits, interner.misses) == (0, 0, 0)
+
+
+# -----------------------------------------------------------------------------
+# CompiledPermissions Tests
+# -----------------------------------------------------------------------------
+
+def test_compiled_permissions_parses_once():
+    interner = PermissionInterner()
+    compiled = CompiledPermissions(['domain1:action1', 'domain2:action1',
+                                    'domain1:action2'], interner=interner)
+
+    assert (list(compiled) == ['domain1:action1', 'domain2:action1', 'domain1:action2'] and
+            compiled.domains == ('domain1', 'domain2') and
+            interner.misses == 3)
+    assert CompiledPermissions.compile(compiled) is compiled
+
+
+def test_compiled_permissions_accepts_permission_objects():
+    permission = DefaultPermission('domain1:action1')
+    compiled = CompiledPermissions([permission])
+
+    assert list(compiled.items()) == [(permission, permission)]
+
+
+def test_compiled_permissions_malformed_raises():
+    with pytest.raises(ValueError):
+        CompiledPermissions(['domain1:action1', '::'])
+
+
+def test_compiled_permissions_from_items():
+    permission = DefaultPermission('domain1:action1:target1')
+    compiled = CompiledPermissions.from_items(
+        iter([('domain1:action1:target1', permission)]))
+
+    assert (compiled == CompiledPermissions(['domain1:action1:target1']) and
+            compiled.permissions == (permission,) and
+            compiled.domains == ('domain1',))
+
+
+# -----------------------------------------------------------------------------
+# PermissionTemplate Tests
+# -----------------------------------------------------------------------------
+
+class Resource:
+    domainid = 'Domain1'
+    targetid = 12
+
+
+@pytest.mark.parametrize('template, params',
+                         [('{resource.domainid}:action1,action2', {}),
+                          ('domain1:Action1,action2:{resource.targetid}', {}),
+                          ('domain1:{action}:{resource.targetid}', {'action': 'a1,a2'}),
+                          ('domain1', {}),
+                          ('{resource.domainid}:{span}', {'span': 'action1:target1'}),
+                          ('domain1:action1:{padded}', {'padded': 'target1  '}),
+                          ('a:b:c:{resource.targetid}', {})])
+def test_permission_template_bind_matches_parsing(template, params):
+    params = dict(params, resource=Resource())
+    permission_string = template.format(**params)
+
+    result = PermissionTemplate(template).bind(params)
+
+    assert result == (permission_string, DefaultPermission(permission_string))
+
+
+def test_permission_template_parses_static_parts_once():
+    template = PermissionTemplate('domain1:action1:{targetid}')
+
+    with mock.patch.object(WildcardPermission, '_setparts') as wp_sp:
+        string, permission = template.bind({'targetid': 'target1'})
+
+    assert not wp_sp.called
+    assert permission.target == {'target1'} and string == 'domain1:action1:target1'
+
+
+def test_permission_template_malformed_static_part_raises():
+    with pytest.raises(ValueError):
+        PermissionTemplate('domain1:,,:{targetid}')
+
+
+def test_permission_template_malformed_bound_part_raises():
+    template = PermissionTemplate('domain1:action1:{targetid}')
+    with pytest.raises(ValueError):
+        template.bind({'targetid': ','})
@@ -1,7 +1,9 @@
 from unittest import mock
 import threading
 import time
+import pytest
 from yosai.core import (
+    SingleFlight,
     StoppableScheduledExecutor,
 )
 
@@ -20,3 +22,69 @@ def test_sse_runs(stoppable_scheduled_executor):
         time.sleep(1)
         sse.stop()
         assert mock_run.called
+
+
+def run_concurrently(single_flight, key, func, count):
+    results = []
+    errors = []
+
+    def call():
+        try:
+            results.append(single_flight.do(key, func))
+        except Exception as exc:
+            errors.append(exc)
+
+    threads = [threading.Thread(target=call) for _ in range(count)]
+    for thread in threads:
+        thread.start()
+    return threads, results, errors
+
+
+def test_single_flight_shares_result():
+    """
+    unit tested:  do
+
+    test case:
+    concurrent callers of a key wait for one call and share its result, and
+    a later call runs the function again
+    """
+    single_flight = SingleFlight()
+    release = threading.Event()
+    calls = []
+
+    def query():
+        calls.append(1)
+        release.wait(5)
+        return 'result'
+
+    threads, results, errors = run_concurrently(single_flight, 'key', query, 5)
+    while len(calls) < 1:
+        time.sleep(0.01)
+    time.sleep(0.1)
+    release.set()
+    for thread in threads:
+        thread.join()
+
+    assert (results == ['result'] * 5 and not errors and len(calls) == 1 and
+            len(single_flight) == 0 and
+            single_flight.do('key', query) == 'result' and len(calls) == 2)
+
+
+def test_single_flight_shares_exception():
+    single_flight = SingleFlight()
+    release = threading.Event()
+
+    def query():
+        release.wait(5)
+        raise ValueError('no results')
+
+    threads, results, errors = run_concurrently(single_flight, 'key', query, 3)
+    time.sleep(0.1)
+    release.set()
+    for thread in threads:
+        thread.join()
+
+    assert (not results and len(errors) == 3 and
+            all(isinstance(error, ValueError) for error in errors))
+    with pytest.raises(ValueError):
+        single_flight.do('key', query)
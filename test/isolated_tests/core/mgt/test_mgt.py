@@ -1,3 +1,5 @@
+import asyncio
+import threading
 import pytest
 from unittest import mock
 from cryptography.fernet import Fernet
@@ -73,6 +75,17 @@ def test_apply_realms(native_security_manager, monkeypatch):
     mock_authz.init_realms.assert_called_once_with('realms')
 
 
+def test_nsm_shutdown(native_security_manager, monkeypatch):
+    nsm = native_security_manager
+    mock_authc = mock.create_autospec(DefaultAuthenticator)
+    mock_authz = mock.create_autospec(ModularRealmAuthorizer)
+    monkeypatch.setattr(nsm, 'authenticator', mock_authc)
+    monkeypatch.setattr(nsm, 'authorizer', mock_authz)
+    nsm.shutdown(wait=False)
+    mock_authc.shutdown.assert_called_once_with(wait=False)
+    mock_authz.shutdown.assert_called_once_with(wait=False)
+
+
 def test_nsm_is_permitted(native_security_manager):
     """
     unit tested:  is_permitted
@@ -83,7 +96,41 @@ def test_nsm_is_permitted(native_security_manager):
     nsm = native_security_manager
     with mock.patch.object(ModularRealmAuthorizer, 'is_permitted') as mra_ip:
         nsm.is_permitted('identifiers', 'permission_s')
-        mra_ip.assert_called_once_with('identifiers', 'permission_s')
+        mra_ip.assert_called_once_with('identifiers', 'permission_s', log_results=True)
+
+
+def test_nsm_is_permitted_matrix(native_security_manager):
+    nsm = native_security_manager
+    with mock.patch.object(ModularRealmAuthorizer, 'is_permitted_matrix') as mra_ipm:
+        nsm.is_permitted_matrix('identifiers_s', 'permission_s')
+        mra_ipm.assert_called_once_with('identifiers_s', 'permission_s')
+
+
+def test_nsm_filter_permitted(native_security_manager):
+    nsm = native_security_manager
+    with mock.patch.object(ModularRealmAuthorizer, 'filter_permitted') as mra_fp:
+        nsm.filter_permitted('identifiers', 'domain', 'action', 'targets')
+        mra_fp.assert_called_once_with('identifiers', 'domain', 'action', 'targets')
+
+
+def test_nsm_permitted_targets(native_security_manager):
+    nsm = native_security_manager
+    with mock.patch.object(ModularRealmAuthorizer, 'permitted_targets') as mra_pt:
+        nsm.permitted_targets('identifiers', 'domain', 'action')
+        mra_pt.assert_called_once_with('identifiers', 'domain', 'action')
+
+
+def test_nsm_check_permission_async(native_security_manager):
+    nsm = native_security_manager
+
+    async def check_permission_async(identifiers, permission_s, logical_operator):
+        return (identifiers, permission_s, logical_operator)
+
+    with mock.patch.object(ModularRealmAuthorizer, 'check_permission_async',
+                           side_effect=check_permission_async, create=True):
+        loop = asyncio.get_event_loop()
+        assert loop.run_until_complete(nsm.check_permission_async(
+            'identifiers', 'permission_s', all)) == ('identifiers', 'permission_s', all)
 
 
 def test_nsm_is_permitted_collective(native_security_manager):
@@ -122,7 +169,7 @@ def test_nsm_has_role(native_security_manager):
     nsm = native_security_manager
     with mock.patch.object(ModularRealmAuthorizer, 'has_role') as mra_hr:
         nsm.has_role('identifiers', 'permission_s')
-        mra_hr.assert_called_once_with('identifiers', 'permission_s')
+        mra_hr.assert_called_once_with('identifiers', 'permission_s', log_results=True)
 
 
 def test_nsm_has_role_collective(native_security_manager):
@@ -433,6 +480,57 @@ def test_nsm_login_success(native_security_manager, monkeypatch, mock_subject):
             assert result == 'logged_in'
 
 
+def test_nsm_login_async_success(native_security_manager, monkeypatch, mock_subject):
+    nsm = native_security_manager
+    mock_subject.identifiers = 'identifiers'
+    mock_authc = mock.create_autospec(DefaultAuthenticator)
+
+    async def authenticate_account_async(identifiers, authc_token):
+        return 'accountid'
+
+    mock_authc.authenticate_account_async.side_effect = authenticate_account_async
+    monkeypatch.setattr(nsm, 'authenticator', mock_authc)
+    loop = asyncio.get_event_loop()
+
+    with mock.patch.object(NativeSecurityManager, 'create_subject') as nsm_cs:
+        nsm_cs.return_value = 'logged_in'
+        with mock.patch.object(NativeSecurityManager, 'on_successful_login') as nsm_osl:
+            result = loop.run_until_complete(nsm.login_async(mock_subject, 'authc_token'))
+
+            nsm_cs.assert_called_once_with(authc_token='authc_token',
+                                           account_id='accountid',
+                                           existing_subject=mock_subject)
+            nsm_osl.assert_called_once_with('authc_token', 'accountid', 'logged_in')
+            mock_authc.authenticate_account_async.assert_called_once_with(
+                'identifiers', 'authc_token')
+            assert result == 'logged_in'
+
+
+def test_nsm_login_async_raises(native_security_manager, monkeypatch, mock_subject):
+    nsm = native_security_manager
+    mock_authc = mock.create_autospec(DefaultAuthenticator)
+
+    async def authenticate_account_async(identifiers, authc_token):
+        raise AuthenticationException
+
+    mock_authc.authenticate_account_async.side_effect = authenticate_account_async
+    monkeypatch.setattr(nsm, 'authenticator', mock_authc)
+    failed_login_threads = []
+
+    def on_failed_login(authc_token, authc_exc, subject):
+        failed_login_threads.append(threading.current_thread())
+
+    monkeypatch.setattr(nsm, 'on_failed_login', on_failed_login)
+    loop = asyncio.get_event_loop()
+
+    with pytest.raises(AuthenticationException):
+        loop.run_until_complete(nsm.login_async(mock_subject, 'authc_token'))
+
+    # on_failed_login runs in an executor, off the event loop:
+    assert (len(failed_login_threads) == 1 and
+            failed_login_threads[0] is not threading.current_thread())
+
+
 def test_nsm_login_raises_additional(native_security_manager, monkeypatch, mock_subject):
     nsm = native_security_manager
     mock_subject.identifiers = 'identifiers'
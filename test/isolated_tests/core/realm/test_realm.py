@@ -1,12 +1,19 @@
+import asyncio
 import pytest
 import rapidjson
 
 from yosai.core import (
+    AccountException,
     AccountStoreRealm,
+    CompiledPermissions,
     ConsumedTOTPToken,
+    DecisionCache,
     DefaultPermission,
+    FailedAttemptTracker,
     IncorrectCredentialsException,
     PasslibVerifier,
+    PermissionMatrix,
+    RoleHierarchy,
     SimpleIdentifierCollection,
     TOTPToken,
     UsernamePasswordToken,
@@ -79,8 +86,9 @@ def test_asr_clear_cached_authorization_info(
     asr = account_store_realm
     monkeypatch.setattr(asr, 'cache_handler', mock.Mock())
     asr.clear_cached_authorization_info('identifier')
-    asr.cache_handler.delete.assert_called_once_with('authorization:AccountStoreRealm',
-                                                     'identifier')
+    asr.cache_handler.delete.assert_has_calls(
+        [mock.call('authorization:permissions:AccountStoreRealm', 'identifier'),
+         mock.call('authorization:roles:AccountStoreRealm', 'identifier')])
 
 
 def test_lock_account(account_store_realm, monkeypatch):
@@ -215,6 +223,36 @@ def test_asr_acm_raises(mock_ufa, account_store_realm, sample_acct_info,
     mock_ufa.assert_called_once_with(upt, sample_acct_info)
 
 
+@mock.patch.object(AccountStoreRealm, 'update_failed_attempt')
+def test_asr_acm_raises_tracked(mock_ufa, account_store_realm, sample_acct_info,
+                                username_password_token, monkeypatch):
+    """
+    unit tested:  assert_credentials_match
+
+    test case:
+    with a FailedAttemptTracker, failed attempts are counted apart from the
+    cached account, which is not re-written
+    """
+    asr = account_store_realm
+    upt = username_password_token
+    monkeypatch.setattr(upt, 'token_info', {'cred_type': 'password'}, raising=False)
+    monkeypatch.setattr(asr, 'failed_attempt_tracker', FailedAttemptTracker())
+
+    mock_verifier = mock.create_autospec(PasslibVerifier)
+    mock_verifier.verify_credentials.side_effect = IncorrectCredentialsException
+
+    for expected in (1, 2):
+        with pytest.raises(IncorrectCredentialsException) as exc:
+            asr.assert_credentials_match(mock_verifier, upt, sample_acct_info)
+        assert exc.value.failed_attempts == expected
+
+    mock_ufa.assert_not_called()
+
+    monkeypatch.setattr(asr, 'account_store', mock.Mock())
+    asr.unlock_account(upt.identifier)
+    assert asr.failed_attempt_tracker.count(upt.identifier, 'password') == 0
+
+
 def test_asr_acm_consumed_token(account_store_realm, sample_acct_info,
                                 monkeypatch):
     asr = account_store_realm
@@ -272,6 +310,118 @@ def test_asr_get_authz_roles_cannot_locate(
         asr.get_authzd_roles('marty')
 
 
+def test_asr_get_authz_roles_negative_cache(account_store_realm, monkeypatch):
+    """
+    unit tested:  get_authzd_roles
+
+    test case:
+    an empty result is remembered for negative_cache_ttl seconds, until it
+    expires or authorization info is cleared
+    """
+    asr = account_store_realm
+    mock_cache = mock.Mock()
+    mock_cache.get_or_create.side_effect = \
+        lambda domain, identifier, creator_func, creator: creator_func(creator)
+    mock_gar = mock.Mock(return_value=None)
+    monkeypatch.setattr(asr, 'cache_handler', mock_cache)
+    monkeypatch.setattr(asr.account_store, 'get_authz_roles', mock_gar)
+    monkeypatch.setattr(asr, 'negative_cache_ttl', 30)
+
+    results = [asr.get_authzd_roles('guest') for _ in range(3)]
+    queried = [mock_gar.call_count]
+
+    asr._negative_results[('roles', 'guest')] = 0  # expired
+    asr.get_authzd_roles('guest')
+    queried.append(mock_gar.call_count)
+
+    asr.clear_cached_authorization_info('guest')
+    asr.get_authzd_roles('guest')
+    queried.append(mock_gar.call_count)
+
+    assert results == [set()] * 3 and queried == [1, 2, 3]
+
+
+def test_asr_get_authz_permission_blobs_negative_cache(
+        account_store_realm, monkeypatch):
+    asr = account_store_realm
+    mock_cache = mock.Mock()
+    mock_cache.hmget_or_create.side_effect = \
+        lambda domain, identifier, keys, creator_func, creator: creator_func(creator)
+    mock_gap = mock.Mock(return_value={})
+    monkeypatch.setattr(asr, 'cache_handler', mock_cache)
+    monkeypatch.setattr(asr.account_store, 'get_authz_permissions', mock_gap)
+    monkeypatch.setattr(asr, 'negative_cache_ttl', 30)
+    monkeypatch.setattr(asr, 'negative_cache_limit', 1)
+
+    results = [asr.get_authzd_permission_blobs('guest', ['domain1'])
+               for _ in range(2)]
+    asr.get_authzd_permission_blobs('other', ['domain1'])
+
+    assert (results[1] == [None, None] and mock_gap.call_count == 2 and
+            list(asr._negative_results) == [('permissions', 'other')])
+
+
+def test_asr_get_authz_roles_shared_negative_cache(account_store_realm, monkeypatch):
+    """
+    unit tested:  get_authzd_roles
+
+    test case:
+    in shared mode, an empty result is remembered with the cache handler, with
+    its expiration, and is deleted when authorization info is cleared
+    """
+    asr = account_store_realm
+    shared = {}
+    mock_cache = mock.Mock()
+    mock_cache.get_or_create.side_effect = \
+        lambda domain, identifier, creator_func, creator: creator_func(creator)
+    mock_cache.get.side_effect = \
+        lambda domain, identifier: shared.get((domain, identifier))
+    mock_cache.set.side_effect = \
+        lambda domain, identifier, value: shared.update({(domain, identifier): value})
+    mock_cache.delete.side_effect = \
+        lambda domain, identifier: shared.pop((domain, identifier), None)
+    mock_gar = mock.Mock(return_value=None)
+    monkeypatch.setattr(asr, 'cache_handler', mock_cache)
+    monkeypatch.setattr(asr.account_store, 'get_authz_roles', mock_gar)
+    monkeypatch.setattr(asr, 'negative_cache_ttl', 30)
+    monkeypatch.setattr(asr, 'negative_cache_shared', True)
+    domain = asr.negative_cache_domain('roles')
+
+    results = [asr.get_authzd_roles('guest') for _ in range(3)]
+    queried = [mock_gar.call_count]
+
+    shared[(domain, 'guest')] = 0  # expired
+    asr.get_authzd_roles('guest')
+    queried.append(mock_gar.call_count)
+
+    asr.clear_cached_authorization_info('guest')
+    cleared = (domain, 'guest') not in shared
+    asr.get_authzd_roles('guest')
+    queried.append(mock_gar.call_count)
+
+    assert (results == [set()] * 3 and queried == [1, 2, 3] and cleared and
+            not asr._negative_results)
+
+
+def test_asr_get_authz_roles_single_flight(account_store_realm, monkeypatch):
+    """
+    unit tested:  get_authzd_roles
+
+    test case:
+    the account store is queried through the realm's single-flight, keyed by
+    realm, domain and identifier
+    """
+    asr = account_store_realm
+    monkeypatch.setattr(asr, 'cache_handler', None)
+    mock_do = mock.Mock(return_value=['role1'])
+    monkeypatch.setattr(asr._single_flight, 'do', mock_do)
+
+    assert asr.get_authzd_roles('thedude') == {'role1'}
+    mock_do.assert_called_once_with(
+        ('authorization:roles:AccountStoreRealm', 'thedude'),
+        asr.account_store.get_authz_roles, 'thedude')
+
+
 def test_asr_get_authz_permissions_from_cache(
         account_store_realm, monkeypatch, simple_identifier_collection, sample_parts):
     asr = account_store_realm
@@ -309,21 +459,19 @@ def test_asr_get_authz_permissions_cannot_locate(
         asr.get_authzd_permissions('marty', 'domain12')
 
 
-@mock.patch.object(AccountStoreRealm, 'get_authzd_permissions')
-def test_asr_is_permitted_yields(asr_gap, account_store_realm, monkeypatch):
+@mock.patch.object(AccountStoreRealm, 'get_authzd_permission_index')
+def test_asr_is_permitted_yields(asr_gapi, account_store_realm, monkeypatch):
     """
     unit tested:  is_permitted
 
     test case:
-    - gets permissions
+    - gets the permission index
     - yields one permission at a time
     """
-    mock1 = mock.MagicMock()
-    mock1.implies.return_value = False
-    mock2 = mock.MagicMock()
-    mock2.implies.return_value = True
+    mock_index = mock.MagicMock()
+    mock_index.implies.return_value = True
 
-    asr_gap.return_value = [mock1, mock2]
+    asr_gapi.return_value = mock_index
     asr = account_store_realm
     mock_identifiers = mock.create_autospec(SimpleIdentifierCollection)
     mock_identifiers.primary_identifier = 'thedude'
@@ -331,10 +479,107 @@ def test_asr_is_permitted_yields(asr_gap, account_store_realm, monkeypatch):
 
     result = list(asr.is_permitted(mock_identifiers, test_permissions))
 
-    asr_gap.assert_called_once_with('thedude', 'domain1')
+    asr_gapi.assert_called_once_with('thedude', ('domain1',))
     assert result == [('domain1:action1', True)]
 
 
+@mock.patch.object(AccountStoreRealm, 'get_authzd_permission_blobs')
+def test_asr_is_permitted_single_round_trip(
+        asr_gapb, account_store_realm, simple_identifier_collection, sample_parts):
+    """
+    unit tested:  is_permitted
+
+    test case:
+    permissions of several domains are obtained with one request
+    """
+    asr = account_store_realm
+    asr_gapb.return_value = [None, rapidjson.dumps([sample_parts]), None]
+    test_permissions = ['domain1:action1', 'domain2:action1',
+                        'domain1:action2:target1', 'domain1:action3']
+
+    result = list(asr.is_permitted(simple_identifier_collection, test_permissions))
+
+    asr_gapb.assert_called_once_with('identifier', ('domain1', 'domain2'))
+    assert result == [('domain1:action1', False), ('domain2:action1', False),
+                      ('domain1:action2:target1', True), ('domain1:action3', False)]
+
+
+@mock.patch.object(AccountStoreRealm, 'get_authzd_permission_index')
+def test_asr_is_permitted_compiled_permissions(asr_gapi, account_store_realm):
+    """
+    unit tested:  is_permitted
+
+    test case:
+    pre-compiled permissions are used as-is, without parsing them again
+    """
+    asr_gapi.return_value.implies.return_value = False
+    mock_identifiers = mock.create_autospec(SimpleIdentifierCollection)
+    mock_identifiers.primary_identifier = 'thedude'
+    compiled = CompiledPermissions(['domain1:action1'])
+
+    with mock.patch('yosai.core.realm.realm.permission_interner') as mock_interner:
+        result = list(account_store_realm.is_permitted(mock_identifiers, compiled))
+
+    assert not mock_interner.permission.called
+    asr_gapi.return_value.implies.assert_called_once_with(compiled.permissions[0])
+    assert result == [('domain1:action1', False)]
+
+
+def test_asr_is_permitted_decision_cache(account_store_realm, monkeypatch):
+    """
+    unit tested:  is_permitted, clear_cached_authorization_info
+
+    test case:
+    cached decisions skip evaluation until authorization info is cleared
+    """
+    asr = account_store_realm
+    monkeypatch.setattr(asr, 'decision_cache', DecisionCache())
+    monkeypatch.setattr(asr, 'cache_handler', mock.Mock())
+    evaluated = []
+
+    def evaluate_permissions(identifier, permission_s):
+        evaluated.append(list(permission_s))
+        for perm in permission_s:
+            yield (perm, perm == 'domain1:action1')
+
+    monkeypatch.setattr(asr, 'evaluate_permissions', evaluate_permissions)
+    mock_identifiers = mock.create_autospec(SimpleIdentifierCollection)
+    mock_identifiers.primary_identifier = 'thedude'
+
+    list(asr.is_permitted(mock_identifiers, ['domain1:action1']))
+    result = list(asr.is_permitted(mock_identifiers, ['domain1:action1', 'domain1:action2']))
+    asr.clear_cached_authorization_info('thedude')
+    list(asr.is_permitted(mock_identifiers, ['domain1:action1']))
+
+    assert result == [('domain1:action1', True), ('domain1:action2', False)]
+    assert evaluated == [['domain1:action1'], ['domain1:action2'], ['domain1:action1']]
+
+
+def test_asr_has_role_decision_cache(account_store_realm, monkeypatch):
+    asr = account_store_realm
+    monkeypatch.setattr(asr, 'decision_cache', DecisionCache())
+    mock_gar = mock.Mock(return_value={'role1'})
+    monkeypatch.setattr(asr, 'get_authzd_roles', mock_gar)
+    mock_identifiers = mock.create_autospec(SimpleIdentifierCollection)
+    mock_identifiers.primary_identifier = 'thedude'
+
+    list(asr.has_role(mock_identifiers, ['role1', 'role2']))
+    result = list(asr.has_role(mock_identifiers, ['role1', 'role2']))
+
+    assert result == [('role1', True), ('role2', False)]
+    mock_gar.assert_called_once_with('thedude')
+
+
+def test_asr_get_authz_permission_blobs_keys(account_store_realm, monkeypatch):
+    asr = account_store_realm
+    mock_cache = mock.Mock()
+    monkeypatch.setattr(asr, 'cache_handler', mock_cache)
+
+    asr.get_authzd_permission_blobs('thedude', ['domain2', 'domain1', '*', 'domain2'])
+
+    assert mock_cache.hmget_or_create.call_args[1]['keys'] == ['*', 'domain1', 'domain2']
+
+
 def test_asr_is_permitted_no_account_obtained(
         account_store_realm, monkeypatch, simple_identifier_collection):
     """
@@ -347,12 +592,123 @@ def test_asr_is_permitted_no_account_obtained(
     asr = account_store_realm
     sic = simple_identifier_collection
 
-    monkeypatch.setattr(asr, 'get_authzd_permissions', lambda x, y: [])
+    monkeypatch.setattr(asr, 'get_authzd_permission_blobs', lambda x, y: [])
 
     results = list(asr.is_permitted(sic, ['domain1:action1', 'domain2:action1']))
     assert results == [('domain1:action1', False), ('domain2:action1', False)]
 
 
+def test_asr_get_authzd_permission_index_compiles_once(
+        account_store_realm, monkeypatch, sample_parts):
+    """
+    unit tested:  get_authzd_permission_index
+
+    test case:
+    an index is re-used until the serialized permissions it was compiled
+    from change
+    """
+    asr = account_store_realm
+    blobs = [None, rapidjson.dumps([sample_parts])]
+    monkeypatch.setattr(asr, 'get_authzd_permission_blobs', lambda x, y: list(blobs))
+
+    index1 = asr.get_authzd_permission_index('thedude', ['domain1'])
+    index2 = asr.get_authzd_permission_index('thedude', ['domain1'])
+
+    blobs[0] = rapidjson.dumps([{'domain': '*', 'action': ['*'], 'target': ['*']}])
+    index3 = asr.get_authzd_permission_index('thedude', ['domain1'])
+
+    assert (index1 is index2 and index3 is not index1 and
+            index3.implies(DefaultPermission(wildcard_string='domain2:action9')))
+
+
+def test_asr_get_authzd_permission_index_shared_by_content(
+        account_store_realm, monkeypatch, sample_parts):
+    """
+    unit tested:  get_authzd_permission_index
+
+    test case:
+    identifiers with identical serialized permissions share one index and
+    a serialized list is decoded once
+    """
+    asr = account_store_realm
+    blobs = {'one': [None, rapidjson.dumps([sample_parts])],
+             'two': [None, rapidjson.dumps([sample_parts])],
+             'three': [rapidjson.dumps([{'domain': '*', 'action': ['*']}]),
+                       rapidjson.dumps([sample_parts])]}
+    monkeypatch.setattr(asr, 'get_authzd_permission_blobs',
+                        lambda identifier, y: blobs[identifier])
+
+    with mock.patch('yosai.core.realm.realm.rapidjson.loads',
+                    side_effect=rapidjson.loads) as mock_loads:
+        indexes = [asr.get_authzd_permission_index(identifier, ['domain1'])
+                   for identifier in ('one', 'two', 'three')]
+
+    assert (indexes[0] is indexes[1] and indexes[2] is not indexes[0] and
+            mock_loads.call_count == 2)
+
+
+def test_asr_get_authzd_permission_index_limit(account_store_realm, monkeypatch):
+    asr = account_store_realm
+    monkeypatch.setattr(asr, 'permission_index_limit', 2)
+    monkeypatch.setattr(asr, 'get_authzd_permission_blobs',
+                        lambda identifier, y: [identifier])
+
+    for identifier in ('one', 'two', 'three'):
+        asr.get_authzd_permission_index(identifier, ['domain1'])
+
+    assert (list(asr._permission_indexes) == [('two',), ('three',)] and
+            list(asr._permission_blobs) == ['two', 'three'])
+
+
+def test_asr_filter_permitted(
+        account_store_realm, monkeypatch, simple_identifier_collection):
+    """
+    unit tested:  filter_permitted
+
+    test case:
+    the permissions for the domain are obtained once and the targets filtered
+    """
+    asr = account_store_realm
+    sic = simple_identifier_collection
+    blobs = [None, rapidjson.dumps([{'domain': 'blogpost', 'action': ['edit'],
+                                     'target': ['1', '3']}])]
+    mock_blobs = mock.Mock(return_value=blobs)
+    monkeypatch.setattr(asr, 'get_authzd_permission_blobs', mock_blobs)
+
+    result = asr.filter_permitted(sic, 'BlogPost', 'edit', ['1', '2', 3])
+
+    assert (result == ['1', 3] and
+            mock_blobs.call_args == mock.call(sic.primary_identifier, ('blogpost',)))
+
+
+def test_asr_permitted_targets(
+        account_store_realm, monkeypatch, simple_identifier_collection):
+    asr = account_store_realm
+    sic = simple_identifier_collection
+    blobs = [None, rapidjson.dumps([{'domain': 'blogpost', 'action': ['edit'],
+                                     'target': ['1', '3']}])]
+    monkeypatch.setattr(asr, 'get_authzd_permission_blobs', lambda x, y: blobs)
+
+    assert asr.permitted_targets(sic, 'blogpost', 'edit') == {'1', '3'}
+
+
+def test_asr_permitted_mask(
+        account_store_realm, monkeypatch, simple_identifier_collection):
+    asr = account_store_realm
+    sic = simple_identifier_collection
+    blobs = [rapidjson.dumps([{'domain': '*', 'action': ['view'], 'target': ['*']}]),
+             rapidjson.dumps([{'domain': 'blogpost', 'action': ['edit'],
+                               'target': ['1']}])]
+    mock_blobs = mock.Mock(return_value=blobs)
+    monkeypatch.setattr(asr, 'get_authzd_permission_blobs', mock_blobs)
+
+    matrix = PermissionMatrix(['blogpost:edit:1', 'blogpost:edit:2', 'comment:view'])
+
+    assert (asr.permitted_mask(sic, matrix) == 0b101 and
+            mock_blobs.call_args == mock.call(sic.primary_identifier,
+                                              ('blogpost', 'comment')))
+
+
 def test_asr_has_role_yields(
         account_store_realm, monkeypatch, simple_identifier_collection,
         sample_acct_info):
@@ -389,3 +745,196 @@ def test_asr_has_role_no_account_obtained(
 
     results = list(asr.has_role(sic, ['role1', 'role2']))
     assert results == [('role1', False), ('role2', False)]
+
+
+def test_asr_has_role_role_hierarchy(
+        account_store_realm, monkeypatch, simple_identifier_collection):
+    asr = account_store_realm
+    sic = simple_identifier_collection
+    monkeypatch.setattr(asr, 'role_hierarchy', RoleHierarchy({'admin': ['editor'],
+                                                              'editor': ['viewer']}))
+    monkeypatch.setattr(asr, 'get_authzd_roles', lambda x: {'admin'})
+
+    results = list(asr.has_role(sic, ['viewer', 'owner']))
+
+    assert results == [('viewer', True), ('owner', False)]
+
+
+def test_asr_load_role_hierarchy(account_store_realm, monkeypatch):
+    asr = account_store_realm
+    configured = RoleHierarchy({'admin': ['editor']})
+    monkeypatch.setattr(asr, 'role_hierarchy', configured)
+    monkeypatch.setattr(asr, 'decision_cache', DecisionCache())
+    monkeypatch.setattr(asr.account_store, 'get_role_hierarchy',
+                        lambda: {'editor': ['viewer']}, raising=False)
+
+    asr.load_role_hierarchy()
+    asr.decision_cache.set_many(asr.name, 'thedude', 'role', {'viewer': False})
+    asr.role_hierarchy.add('viewer', 'guest')
+
+    assert (asr.role_hierarchy is not configured and
+            configured.implied_roles('admin') == {'admin', 'editor'} and
+            asr.role_hierarchy.implied_roles('admin') ==
+            {'admin', 'editor', 'viewer', 'guest'} and
+            len(asr.decision_cache) == 0)
+
+
+def test_asr_load_role_hierarchy_registers_listener_once(
+        account_store_realm, monkeypatch):
+    asr = account_store_realm
+    configured = RoleHierarchy({'admin': ['editor']})
+    monkeypatch.setattr(asr, 'role_hierarchy', configured)
+
+    asr.load_role_hierarchy()
+    asr.load_role_hierarchy()
+
+    assert configured.listeners == [asr.on_role_hierarchy_change]
+
+
+# -----------------------------------------------------------------------------
+# Asynchronous Authorization Tests
+# -----------------------------------------------------------------------------
+
+class AsyncCacheHandlerDouble:
+
+    def __init__(self):
+        self.cache = {}
+
+    async def get_or_create_async(self, domain, identifier, creator_func, creator):
+        key = (domain, identifier)
+        if key not in self.cache:
+            self.cache[key] = await creator_func(creator)
+        return self.cache[key]
+
+    async def hmget_or_create_async(self, domain, identifier, keys, creator_func,
+                                    creator):
+        key = (domain, identifier)
+        if key not in self.cache:
+            self.cache[key] = await creator_func(creator)
+        return [self.cache[key].get(field) for field in keys]
+
+
+class AsyncAccountStoreDouble:
+
+    def __init__(self, permissions=None, roles=None, authc_info=None):
+        self.permissions = permissions
+        self.roles = roles
+        self.authc_info = authc_info
+        self.queries = []
+
+    async def get_authc_info_async(self, identifier):
+        self.queries.append(('authc_info', identifier))
+        return self.authc_info
+
+    async def get_authz_permissions_async(self, identifier):
+        self.queries.append(('permissions', identifier))
+        return self.permissions
+
+    async def get_authz_roles_async(self, identifier):
+        self.queries.append(('roles', identifier))
+        return self.roles
+
+
+def test_asr_authenticate_account_async(
+        account_store_realm, monkeypatch, sample_acct_info, username_password_token):
+    """
+    unit tested:  authenticate_account_async
+
+    test case:
+    credentials are obtained through the async cache and account store
+    protocols and then verified
+    """
+    asr = account_store_realm
+    store = AsyncAccountStoreDouble(authc_info=sample_acct_info)
+    monkeypatch.setattr(asr, 'account_store', store)
+    monkeypatch.setattr(asr, 'cache_handler', AsyncCacheHandlerDouble())
+    monkeypatch.setattr(asr, 'token_resolver', {UsernamePasswordToken: 'verifier'})
+    mock_acm = mock.Mock()
+    monkeypatch.setattr(asr, 'assert_credentials_match', mock_acm)
+
+    loop = asyncio.get_event_loop()
+    account = loop.run_until_complete(asr.authenticate_account_async(username_password_token))
+
+    assert (account is sample_acct_info and
+            account['account_id'].primary_identifier == username_password_token.identifier)
+    assert store.queries == [('authc_info', username_password_token.identifier)]
+    mock_acm.assert_called_once_with('verifier', username_password_token, sample_acct_info)
+
+
+def test_asr_authenticate_account_async_no_account_raises(
+        account_store_realm, monkeypatch, username_password_token):
+    asr = account_store_realm
+    store = AsyncAccountStoreDouble()
+    monkeypatch.setattr(asr, 'account_store', store)
+    monkeypatch.setattr(asr, 'cache_handler', AsyncCacheHandlerDouble())
+    monkeypatch.setattr(asr, 'token_resolver', {UsernamePasswordToken: 'verifier'})
+
+    loop = asyncio.get_event_loop()
+    with pytest.raises(AccountException):
+        loop.run_until_complete(asr.authenticate_account_async(username_password_token))
+
+
+def test_asr_is_permitted_async(
+        account_store_realm, monkeypatch, simple_identifier_collection):
+    """
+    unit tested:  is_permitted_async
+
+    test case:
+    permissions are obtained through the async cache and account store
+    protocols, and queried once
+    """
+    asr = account_store_realm
+    sic = simple_identifier_collection
+    store = AsyncAccountStoreDouble(permissions={
+        'domain1': rapidjson.dumps([{'domain': 'domain1', 'action': ['action1']}])})
+    monkeypatch.setattr(asr, 'cache_handler', AsyncCacheHandlerDouble())
+    monkeypatch.setattr(asr, 'account_store', store)
+
+    async def check():
+        first = await asr.is_permitted_async(sic, ['domain1:action1', 'domain1:action2'])
+        second = await asr.is_permitted_async(sic, ['domain1:action1'])
+        return first, second
+
+    first, second = asyncio.get_event_loop().run_until_complete(check())
+
+    assert (first == [('domain1:action1', True), ('domain1:action2', False)] and
+            second == [('domain1:action1', True)] and len(store.queries) == 1)
+
+
+def test_asr_has_role_async_negative_cache(
+        account_store_realm, monkeypatch, simple_identifier_collection):
+    asr = account_store_realm
+    sic = simple_identifier_collection
+    store = AsyncAccountStoreDouble(roles=[])
+    monkeypatch.setattr(asr, 'cache_handler', AsyncCacheHandlerDouble())
+    monkeypatch.setattr(asr, 'account_store', store)
+    monkeypatch.setattr(asr, 'negative_cache_ttl', 30)
+
+    async def check():
+        return [await asr.has_role_async(sic, ['role1']) for _ in range(2)]
+
+    loop = asyncio.get_event_loop()
+    assert (loop.run_until_complete(check()) == [[('role1', False)]] * 2 and
+            store.queries == [('roles', sic.primary_identifier)])
+
+
+def test_asr_is_permitted_async_sync_cache_handler(
+        account_store_realm, monkeypatch, simple_identifier_collection, sample_parts):
+    """
+    unit tested:  is_permitted_async
+
+    test case:
+    a cache handler without the async protocol is consulted in an executor
+    """
+    asr = account_store_realm
+    sic = simple_identifier_collection
+    mock_cache = mock.Mock(spec=['hmget_or_create'])
+    mock_cache.hmget_or_create.return_value = [rapidjson.dumps([sample_parts])]
+    monkeypatch.setattr(asr, 'cache_handler', mock_cache)
+
+    loop = asyncio.get_event_loop()
+    results = loop.run_until_complete(
+        asr.is_permitted_async(sic, ['domain1:action1:target1']))
+
+    assert (results == [('domain1:action1:target1', True)] and
+            mock_cache.hmget_or_create.called)
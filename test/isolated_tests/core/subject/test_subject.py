@@ -1,9 +1,12 @@
+import asyncio
 import pytest
 import collections
 from unittest import mock
 
 from yosai.core import (
     AuthenticationException,
+    AuthorizationMemo,
+    CompiledPermissions,
     SessionStorageEvaluator,
     SubjectStore,
     DelegatingSession,
@@ -13,6 +16,8 @@ from yosai.core import (
     UsernamePasswordToken,
     Yosai,
     UnauthenticatedException,
+    UnauthorizedException,
+    global_authz_memo_context,
 )
 
 from ..doubles import (
@@ -293,6 +298,56 @@ def test_ds_is_permitted_notauthorized(delegating_subject, monkeypatch):
     pytest.raises(ValueError, "ds.is_permitted('anything')")
 
 
+def test_ds_filter_permitted(delegating_subject, monkeypatch):
+    ds = delegating_subject
+    monkeypatch.setattr(ds, 'authenticated', True)
+    monkeypatch.setattr(ds.security_manager, 'filter_permitted',
+                        mock.Mock(return_value=[1]), raising=False)
+
+    assert ds.filter_permitted('blogpost', 'edit', [1, 2]) == [1]
+    ds.security_manager.filter_permitted.assert_called_once_with(
+        ds.identifiers, 'blogpost', 'edit', [1, 2])
+
+
+def test_ds_filter_permitted_notauthorized(delegating_subject):
+    ds = delegating_subject
+    with pytest.raises(ValueError):
+        ds.filter_permitted('blogpost', 'edit', [1, 2])
+
+
+def test_ds_permitted_targets(delegating_subject, monkeypatch):
+    ds = delegating_subject
+    monkeypatch.setattr(ds, 'authenticated', True)
+    monkeypatch.setattr(ds.security_manager, 'permitted_targets',
+                        mock.Mock(return_value=frozenset(['1'])), raising=False)
+
+    assert ds.permitted_targets('blogpost', 'edit') == {'1'}
+    ds.security_manager.permitted_targets.assert_called_once_with(
+        ds.identifiers, 'blogpost', 'edit')
+
+
+def test_ds_is_permitted_async(delegating_subject, monkeypatch):
+    ds = delegating_subject
+    monkeypatch.setattr(ds, 'authenticated', True)
+
+    async def is_permitted_async(identifiers, permission_s):
+        return {(permission, True) for permission in permission_s}
+
+    monkeypatch.setattr(ds.security_manager, 'is_permitted_async',
+                        is_permitted_async, raising=False)
+
+    loop = asyncio.get_event_loop()
+    assert loop.run_until_complete(ds.is_permitted_async(['d:a1'])) == {('d:a1', True)}
+
+
+def test_ds_check_permission_async_notauthorized(delegating_subject, monkeypatch):
+    ds = delegating_subject
+    monkeypatch.setattr(ds, 'assert_authz_check_possible', mock.Mock())
+    loop = asyncio.get_event_loop()
+    with pytest.raises(ValueError):
+        loop.run_until_complete(ds.check_permission_async(['d:a1']))
+
+
 def test_ds_is_permitted_collective(delegating_subject, monkeypatch):
     """
     unit tested:  is_permitted_collective
@@ -319,6 +374,126 @@ def test_ds_is_permitted_collective_raises(delegating_subject, monkeypatch):
     pytest.raises(ValueError, "ds.is_permitted_collective('permission_s', all)")
 
 
+@pytest.fixture(scope='function')
+def authz_memo(monkeypatch):
+    memo = AuthorizationMemo()
+    monkeypatch.setattr(global_authz_memo_context, 'stack', [memo])
+    return memo
+
+
+def test_ds_is_permitted_memoized(delegating_subject, monkeypatch, authz_memo):
+    """
+    unit tested:  is_permitted, is_permitted_collective, check_permission
+
+    test case:
+    with a memo in context, only permissions not yet decided reach the
+    security manager
+    """
+    ds = delegating_subject
+    monkeypatch.setattr(ds, 'authenticated', True)
+    requested = []
+
+    def is_permitted(identifiers, permission_s, log_results=True):
+        requested.append(list(permission_s))
+        return {(perm, perm == 'domain1:action1') for perm in permission_s}
+
+    monkeypatch.setattr(ds.security_manager, 'is_permitted', is_permitted)
+    monkeypatch.setattr(ds.security_manager, 'notify_authz_event', mock.Mock(),
+                        raising=False)
+
+    assert ds.is_permitted(['domain1:action1']) == {('domain1:action1', True)}
+    assert ds.is_permitted_collective(['domain1:action1', 'domain1:action2'], any)
+    with pytest.raises(UnauthorizedException):
+        ds.check_permission(CompiledPermissions(['domain1:action1', 'domain1:action2']), all)
+
+    assert requested == [['domain1:action1'], ['domain1:action2']]
+    assert (authz_memo.hits, authz_memo.misses) == (3, 2)
+
+
+def test_ds_has_role_memoized(delegating_subject, monkeypatch, authz_memo):
+    ds = delegating_subject
+    monkeypatch.setattr(ds, 'authenticated', True)
+    mock_has_role = mock.Mock(return_value={('role1', True)})
+    monkeypatch.setattr(ds.security_manager, 'has_role', mock_has_role)
+    monkeypatch.setattr(ds.security_manager, 'notify_authz_event', mock.Mock(),
+                        raising=False)
+
+    assert ds.has_role(['role1']) == {('role1', True)}
+    assert ds.has_role_collective(['role1'], all)
+    ds.check_role(['role1'], all)
+
+    mock_has_role.assert_called_once_with(ds.identifiers, ['role1'], log_results=True)
+    assert (authz_memo.hits, authz_memo.misses) == (2, 1)
+
+
+class GrantingRealmDouble:
+
+    def is_permitted(self, identifiers, permission_s):
+        for permission in permission_s:
+            yield (permission, permission == 'domain1:action1')
+
+    def has_role(self, identifiers, role_s):
+        for role in role_s:
+            yield (role, role == 'role1')
+
+
+def test_ds_check_events_memoized(
+        delegating_subject, native_security_manager, monkeypatch):
+    """
+    unit tested:  check_permission, check_role
+
+    test case:
+    the same authorization events are published whether the checks are
+    decided by the authorizer or from a memo, on a miss or a hit
+    """
+    ds = delegating_subject
+    nsm = native_security_manager
+    monkeypatch.setattr(ds, 'authenticated', True)
+    monkeypatch.setattr(ds, 'security_manager', nsm)
+    monkeypatch.setattr(nsm.authorizer, 'realms', (GrantingRealmDouble(),))
+    mock_notify = mock.Mock()
+    monkeypatch.setattr(nsm.authorizer, 'notify_event', mock_notify)
+
+    def checks():
+        mock_notify.reset_mock()
+        ds.check_permission(['domain1:action1'], all)
+        with pytest.raises(UnauthorizedException):
+            ds.check_permission(['domain1:action1', 'domain1:action2'], all)
+        ds.check_role(['role1'], any)
+        with pytest.raises(UnauthorizedException):
+            ds.check_role(['role2'], all)
+        return mock_notify.call_args_list
+
+    expected = [mock.call(ds.identifiers, ['domain1:action1'],
+                          'AUTHORIZATION.GRANTED', all),
+                mock.call(ds.identifiers, ['domain1:action1', 'domain1:action2'],
+                          'AUTHORIZATION.DENIED', all),
+                mock.call(ds.identifiers, ['role1'], 'AUTHORIZATION.GRANTED', any),
+                mock.call(ds.identifiers, ['role2'], 'AUTHORIZATION.DENIED', all)]
+
+    assert checks() == expected
+
+    memo = AuthorizationMemo()
+    monkeypatch.setattr(global_authz_memo_context, 'stack', [memo])
+
+    assert checks() == expected  # misses
+    assert checks() == expected  # hits
+    assert (memo.hits, memo.misses) == (6, 4)
+
+
+def test_authz_memo_keys_by_identifiers():
+    memo = AuthorizationMemo()
+    evaluate = mock.Mock(side_effect=lambda role_s: [(role, True) for role in role_s])
+    one = mock.Mock(source_identifiers={'realm': 'one'})
+    two = mock.Mock(source_identifiers={'realm': 'two'})
+
+    memo.decide('role', one, ['role1'], evaluate)
+    memo.decide('role', two, ['role1'], evaluate)
+    memo.decide('permission', one, ['role1'], evaluate)
+
+    assert evaluate.call_count == 3 and len(memo) == 3
+
+
 def test_ds_assert_authz_check_possible(delegating_subject, monkeypatch):
     """
     unit tested:  assert_authz_check_possible
@@ -485,6 +660,29 @@ def test_ds_login_succeeds(
                     ds._identifiers == simple_identifiers_collection)
 
 
+def test_ds_login_async_succeeds(
+        delegating_subject, monkeypatch, mock_subject,
+        simple_identifiers_collection, mock_session):
+    ds = delegating_subject
+    mock_subject._identifiers = simple_identifiers_collection
+    mock_subject.host = 'host'
+    mock_subject.get_session.return_value = mock_session
+    monkeypatch.setattr(ds, 'clear_run_as_identities_internal', mock.Mock())
+
+    async def login_async(subject, authc_token):
+        return mock_subject
+
+    mock_login_async = mock.Mock(side_effect=login_async)
+    monkeypatch.setattr(ds.security_manager, 'login_async', mock_login_async,
+                        raising=False)
+
+    asyncio.get_event_loop().run_until_complete(ds.login_async('dumb_authc_token'))
+
+    mock_login_async.assert_called_once_with(subject=ds, authc_token='dumb_authc_token')
+    assert (ds.session == mock_session and ds.host == 'host' and
+            ds._identifiers == simple_identifiers_collection and ds.authenticated)
+
+
 def test_ds_login_raises(delegating_subject, monkeypatch):
     """
     unit tested:  login
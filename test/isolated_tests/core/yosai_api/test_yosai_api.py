@@ -4,6 +4,8 @@ from yosai.core.subject.subject import global_subject_context, global_yosai_cont
 
 from yosai.core import (
     AuthorizationException,
+    AuthorizationMemo,
+    CompiledPermissions,
     DelegatingSubject,
     NativeSecurityManager,
     Yosai,
@@ -55,6 +57,26 @@ def test_yosai_context(yosai):
             global_yosai_context.stack == [])
 
 
+def test_yosai_context_authz_memo(yosai, monkeypatch):
+    """
+    unit tested:  context
+
+    test case:
+    when enabled, a memo is available within the context and released on exit
+    """
+    monkeypatch.setattr(yosai, 'memoize_authz', True)
+
+    with Yosai.context(yosai):
+        memo = Yosai.get_current_authz_memo()
+        assert isinstance(memo, AuthorizationMemo)
+
+    assert Yosai.get_current_authz_memo() is None
+
+    monkeypatch.setattr(yosai, 'memoize_authz', False)
+    with Yosai.context(yosai):
+        assert Yosai.get_current_authz_memo() is None
+
+
 def test_requires_authentication_succeeds(monkeypatch):
     """
     This test verifies that the decorator works as expected.
@@ -196,7 +218,13 @@ def test_requires_permission_succeeds(monkeypatch):
     result = do_this()
 
     assert result == 'dothis'
-    mock_ds.check_permission.assert_called_once_with(['something:anything'], all)
+    mock_ds.check_permission.assert_called_once_with(
+        CompiledPermissions(['something:anything']), all)
+
+
+def test_requires_permission_malformed_raises_at_decoration():
+    with pytest.raises(ValueError):
+        Yosai.requires_permission(['domain1:,:action1'])
 
 
 def test_requires_permission_raises_one(monkeypatch):
@@ -254,7 +282,8 @@ def test_requires_dynamic_permission_succeeds(monkeypatch):
     result = do_that(one='one')
 
     assert result == 'dothis'
-    mock_ds.check_permission.assert_called_once_with(['something:anything:one'], all)
+    mock_ds.check_permission.assert_called_once_with(
+        CompiledPermissions(['something:anything:one']), all)
 
 
 def test_requires_dynamic_permission_raises_one(monkeypatch):
@@ -322,6 +351,12 @@ def test_requires_role_succeeds(monkeypatch):
     mock_ds.check_role.assert_called_once_with(['role1'], all)
 
 
+@pytest.mark.parametrize('role_s', [[], [''], ['role1', None]])
+def test_requires_role_invalid_raises_at_decoration(role_s):
+    with pytest.raises(ValueError):
+        Yosai.requires_role(role_s)
+
+
 def test_requires_role_raises_one(monkeypatch):
     """
     This test verifies that the decorator works as expected.
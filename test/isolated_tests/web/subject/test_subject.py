@@ -5,6 +5,7 @@ from yosai.web.subject.subject import global_webregistry_context
 
 from yosai.core import (
     AuthorizationException,
+    CompiledPermissions,
     SubjectContext,
 )
 
@@ -159,6 +160,15 @@ def test_web_context(web_yosai, mock_web_registry):
             global_webregistry_context.stack == [])
 
 
+def test_web_yosai_context_authz_memo(web_yosai, mock_web_registry, monkeypatch):
+    monkeypatch.setattr(web_yosai, 'memoize_authz', True)
+
+    with WebYosai.context(web_yosai, mock_web_registry):
+        assert WebYosai.get_current_authz_memo() is not None
+
+    assert WebYosai.get_current_authz_memo() is None
+
+
 def test_requires_authentication_succeeds(monkeypatch):
     """
     This test verifies that the decorator works as expected.
@@ -330,7 +340,13 @@ def test_requires_permission_succeeds(monkeypatch):
     result = do_this()
 
     assert result == 'dothis'
-    mock_wds.check_permission.assert_called_once_with(['something:anything'], all)
+    mock_wds.check_permission.assert_called_once_with(
+        CompiledPermissions(['something:anything']), all)
+
+
+def test_requires_permission_malformed_raises_at_decoration():
+    with pytest.raises(ValueError):
+        WebYosai.requires_permission(['domain1:,:action1'])
 
 
 def test_requires_permission_raises_one(monkeypatch):
@@ -411,7 +427,8 @@ def test_requires_dynamic_permission_succeeds(monkeypatch):
     result = do_this()
 
     assert result == 'dothis'
-    mock_wds.check_permission.assert_called_once_with(['something:anything:one'], all)
+    mock_wds.check_permission.assert_called_once_with(
+        CompiledPermissions(['something:anything:one']), all)
 
 
 def test_requires_dynamic_permission_raises_one(monkeypatch):
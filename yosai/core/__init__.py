@@ -31,6 +31,7 @@ from .exceptions import (
     AccountException,
     AdditionalAuthenticationRequired,
     AuthenticationException,
+    AuthenticationThrottledException,
     AuthorizationException,
     ConsumedTOTPToken,
     ExpiredSessionException,
@@ -44,6 +45,7 @@ from .exceptions import (
     StoppedSessionException,
     UnauthenticatedException,
     UnauthorizedException,
+    VerificationSaturatedException,
     YosaiException,
 )
 
@@ -97,6 +99,10 @@ from yosai.core.authc.authc_settings import (
     AuthenticationSettings,
 )
 
+from yosai.core.authz.authz_settings import (
+    AuthorizationSettings,
+)
+
 
 from yosai.core.logging.slogging import (
     load_logconfig,
@@ -109,6 +115,7 @@ from yosai.core.account.account import (
 
 
 from yosai.core.concurrency.concurrency import (
+    SingleFlight,
     StoppableScheduledExecutor,
 )
 
@@ -137,12 +144,32 @@ from yosai.core.serialize.serialize import (
 
 thread_local = threading.local()  # use only one global instance
 
+from yosai.core.authz.authz import (
+    ALL_TARGETS,
+    ActionBits,
+    AllTargets,
+    CompiledPermissions,
+    DecisionCache,
+    DefaultPermission,
+    ModularRealmAuthorizer,
+    PermissionIndex,
+    PermissionInterner,
+    PermissionMatrix,
+    PermissionTemplate,
+    RoleHierarchy,
+    WildcardPermission,
+    action_bits,
+    permission_interner,
+)
+
 from yosai.core.subject.subject import(
+    AuthorizationMemo,
     Yosai,
     SubjectContext,
     SubjectStore,
     DelegatingSubject,
     SecurityManagerCreator,
+    global_authz_memo_context,
     global_subject_context,
     global_yosai_context,
 )
@@ -155,23 +182,26 @@ from yosai.core.authc.strategy import (
 )
 
 from yosai.core.authc.authc import (
+    AuthenticationThrottle,
     DefaultAuthenticator,
+    FailedAttemptTracker,
+    PasswordVerificationExecutor,
     TOTPToken,
     UsernamePasswordToken,
     token_info,
 )
 
+from yosai.core.authc.calibration import (
+    Calibration,
+    calibrate,
+    calibrate_scheme,
+)
+
 from yosai.core.authc.credential import (
     PasslibVerifier,
     create_totp_factory,
 )
 
-from yosai.core.authz.authz import (
-    DefaultPermission,
-    ModularRealmAuthorizer,
-    WildcardPermission,
-)
-
 
 from yosai.core.realm.realm import (
     AccountStoreRealm,
@@ -56,6 +56,21 @@ class CredentialsAccountStore(AccountStore):
         pass
 
 
+# new to yosai:
+class AsyncCredentialsAccountStore(AccountStore):
+    """
+    The asynchronous counterpart of CredentialsAccountStore, awaited by
+    realms during asynchronous login.
+    """
+
+    @abstractmethod
+    async def get_authc_info_async(self, identifier):
+        """
+        :returns: Account
+        """
+        pass
+
+
 class AuthorizationAccountStore(AccountStore):
 
     @abstractmethod
@@ -65,3 +80,36 @@ class AuthorizationAccountStore(AccountStore):
     @abstractmethod
     def get_authz_roles(self, identifiers):
         pass
+
+
+# new to yosai:
+class RoleHierarchyAccountStore(AccountStore):
+    """
+    An account store that maintains which roles imply other roles.  Realms
+    load the hierarchy once, when the ModularRealmAuthorizer initializes
+    them, so that accounts need only be assigned their most senior roles.
+    """
+
+    @abstractmethod
+    def get_role_hierarchy(self):
+        """
+        :returns: a dict of senior role -> the junior role(s) it directly implies
+        """
+        pass
+
+
+# new to yosai:
+class AsyncAuthorizationAccountStore(AccountStore):
+    """
+    The asynchronous counterpart of AuthorizationAccountStore.  Realms await
+    these coroutines, when available, from their asynchronous authorization
+    methods rather than running the synchronous queries in an executor.
+    """
+
+    @abstractmethod
+    async def get_authz_permissions_async(self, identifier):
+        pass
+
+    @abstractmethod
+    async def get_authz_roles_async(self, identifier):
+        pass
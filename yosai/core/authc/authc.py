@@ -16,8 +16,13 @@ KIND, either express or implied.  See the License for the
 specific language governing permissions and limitations
 under the License.
 """
-from collections import defaultdict
+from collections import OrderedDict, defaultdict
+import asyncio
+import concurrent.futures
+import functools
 import logging
+import threading
+import time
 from passlib.context import CryptContext
 from passlib.totp import TokenError, TOTP
 
@@ -26,11 +31,13 @@ from yosai.core import (
     AccountException,
     AdditionalAuthenticationRequired,
     AuthenticationSettings,
+    AuthenticationThrottledException,
     AuthenticationAttempt,
     first_realm_successful_strategy,
     IncorrectCredentialsException,
     InvalidAuthenticationSequenceException,
     LockedAccountException,
+    VerificationSaturatedException,
     authc_abcs,
     realm_abcs,
 )
@@ -117,6 +124,346 @@ token_info = {UsernamePasswordToken: {'tier': 1, 'cred_type': 'password'},
               TOTPToken: {'tier': 2, 'cred_type': 'totp_key'}}
 
 
+@functools.lru_cache(maxsize=16)
+def _crypt_context(context_string):
+    return CryptContext.from_string(context_string)
+
+
+def _verify_password(context_string, submitted, stored):
+    # runs in a worker process, which builds each CryptContext once:
+    return _crypt_context(context_string).verify(submitted, stored)
+
+
+# new to yosai:
+class AuthenticationThrottle:
+    """
+    An ``AuthenticationThrottle`` limits the rate of authentication attempts
+    per identifier and per host with token buckets, so that an attacker
+    cannot make the application obtain an account and verify a password hash
+    for every request.
+
+    Each bucket holds up to ``capacity`` tokens and is refilled at
+    ``refill_per_second`` tokens per second.  An attempt takes a token from
+    both the bucket of its identifier and that of its host;  when either is
+    empty, the attempt is rejected and neither is charged.
+
+    Buckets are kept in process, for at most ``max_keys`` keys, or, in
+    shared mode, with the cache handler so that all processes share them.
+    Shared buckets are read and written without a lock, so concurrent
+    attempts in different processes may occasionally each take the same
+    token:  the limits are then approximate.
+    """
+    domain = 'authentication:throttle'
+
+    def __init__(self, identifier_rate=None, host_rate=None, max_keys=100000,
+                 shared=False, timer=time.time):
+        """
+        :param identifier_rate: a dict of capacity and refill_per_second for
+                                the buckets of identifiers, or None
+        :param host_rate: a dict of capacity and refill_per_second for the
+                          buckets of hosts, or None
+        """
+        self.rates = {'identifier': identifier_rate, 'host': host_rate}
+        self.max_keys = max_keys
+        self.shared = shared
+        self.timer = timer
+        self.cache_handler = None  # injected, for shared mode
+
+        self._buckets = OrderedDict()  # key -> (tokens, timestamp)
+        self._lock = threading.Lock()
+
+    def bucket_keys(self, authc_token):
+        keys = []
+        for kind in ('identifier', 'host'):
+            value = getattr(authc_token, kind, None)
+            if value and self.rates[kind]:
+                keys.append((kind, value))
+        return keys
+
+    def refill(self, kind, bucket, now):
+        rate = self.rates[kind]
+        if bucket is None:
+            return float(rate['capacity'])
+        tokens, timestamp = bucket
+        return min(float(rate['capacity']),
+                   tokens + max(now - timestamp, 0) * rate['refill_per_second'])
+
+    def take(self, buckets, now):
+        """
+        :param buckets: a dict of key -> the bucket, or None when new
+        :returns: a dict of key -> the bucket after taking a token
+        :raises AuthenticationThrottledException: when any bucket is empty
+        """
+        taken = {}
+        retry_after = 0
+        for (kind, value), bucket in buckets.items():
+            tokens = self.refill(kind, bucket, now)
+            if tokens < 1:
+                refill_per_second = self.rates[kind]['refill_per_second']
+                retry_after = max(retry_after, (1 - tokens) / refill_per_second
+                                  if refill_per_second else float('inf'))
+            taken[(kind, value)] = (tokens - 1, now)
+
+        if retry_after:
+            raise AuthenticationThrottledException(retry_after=retry_after)
+        return taken
+
+    def acquire(self, authc_token):
+        """
+        Takes a token for an authentication attempt.
+
+        :raises AuthenticationThrottledException: when the attempt exceeds a
+                                                  rate limit
+        """
+        keys = self.bucket_keys(authc_token)
+        if not keys:
+            return
+
+        if self.shared and self.cache_handler is not None:
+            buckets = {key: self.cache_handler.get(domain=self.domain,
+                                                   identifier=':'.join(key))
+                       for key in keys}
+            taken = self.take(buckets, self.timer())
+            for key, bucket in taken.items():
+                self.cache_handler.set(domain=self.domain,
+                                       identifier=':'.join(key),
+                                       value=list(bucket))
+            return
+
+        with self._lock:
+            buckets = {key: self._buckets.get(key) for key in keys}
+            taken = self.take(buckets, self.timer())
+            for key, bucket in taken.items():
+                self._buckets[key] = bucket
+                self._buckets.move_to_end(key)
+            while len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+
+    def __len__(self):
+        return len(self._buckets)
+
+    def __repr__(self):
+        return ("AuthenticationThrottle(rates={0}, max_keys={1}, shared={2})".
+                format(self.rates, self.max_keys, self.shared))
+
+
+# new to yosai:
+class FailedAttemptTracker:
+    """
+    A ``FailedAttemptTracker`` counts the failed authentication attempts of
+    each account over a sliding window, for account locking.  It is kept
+    apart from the cached credentials, so a failed attempt no longer
+    re-writes the cached account.
+
+    Each account's attempts, per credential type, are counted in a fixed
+    ring of ``buckets`` buckets that together span ``window`` seconds.  A
+    bucket is reused once it falls out of the window, so an account's
+    record stays the same small size however many attempts fail.
+
+    Counts are kept in process, for at most ``max_accounts`` accounts, or,
+    in shared mode, with the cache handler so that all processes share them.
+    In process, each worker counts only the attempts that it served, so N
+    workers allow about N times account_lock_threshold attempts, a restart
+    forgets the counts and unlock_account resets only its own process.
+    Shared rings are read and written without a lock, as are the shared
+    buckets of the AuthenticationThrottle, so concurrent failures in
+    different processes may occasionally be counted once.  Shared rings are
+    bucketed by wall clock time, and are expired by the cache handler's
+    absolute TTL, which should be no shorter than the window.
+    """
+    domain = 'authentication:failed_attempts'
+
+    def __init__(self, window=3600, buckets=12, max_accounts=100000,
+                 shared=False, timer=None):
+        """
+        :param window: seconds over which failed attempts are counted
+        :param buckets: the number of buckets that the window is divided into
+        :param timer: defaults to time.monotonic or, in shared mode, time.time
+        """
+        self.window = window
+        self.buckets = buckets
+        self.bucket_width = window / buckets
+        self.max_accounts = max_accounts
+        self.shared = shared
+        self.timer = timer or (time.time if shared else time.monotonic)
+        self.cache_handler = None  # injected, for shared mode
+
+        # identifier -> {cred_type: [bucket numbers, counts]}
+        self._rings = OrderedDict()
+        self._lock = threading.Lock()
+
+    @property
+    def is_shared(self):
+        return self.shared and self.cache_handler is not None
+
+    def _current_bucket(self):
+        return int(self.timer() // self.bucket_width)
+
+    def _count(self, ring, current):
+        stamps, counts = ring
+        return sum(count for stamp, count in zip(stamps, counts)
+                   if current - stamp < self.buckets)
+
+    def _increment(self, rings, cred_type, current):
+        """
+        :returns: the number of failed attempts within the window, including this one
+        """
+        ring = rings.get(cred_type)
+        if ring is None:
+            ring = rings[cred_type] = [[-self.buckets] * self.buckets,
+                                       [0] * self.buckets]
+        stamps, counts = ring
+        slot = current % self.buckets
+        if stamps[slot] != current:
+            stamps[slot] = current
+            counts[slot] = 0
+        counts[slot] += 1
+        return self._count(ring, current)
+
+    def record(self, identifier, cred_type):
+        """
+        Records a failed attempt.
+
+        :returns: the number of failed attempts within the window, including this one
+        """
+        current = self._current_bucket()
+
+        if self.is_shared:
+            rings = self.cache_handler.get(domain=self.domain,
+                                           identifier=identifier) or {}
+            failed_attempts = self._increment(rings, cred_type, current)
+            self.cache_handler.set(domain=self.domain, identifier=identifier,
+                                   value=rings)
+            return failed_attempts
+
+        with self._lock:
+            rings = self._rings.get(identifier)
+            if rings is None:
+                rings = self._rings[identifier] = {}
+                while len(self._rings) > self.max_accounts:
+                    self._rings.popitem(last=False)
+            else:
+                self._rings.move_to_end(identifier)
+
+            return self._increment(rings, cred_type, current)
+
+    def count(self, identifier, cred_type):
+        """
+        :returns: the number of failed attempts within the window
+        """
+        if self.is_shared:
+            rings = self.cache_handler.get(domain=self.domain,
+                                           identifier=identifier) or {}
+            ring = rings.get(cred_type)
+            return 0 if ring is None else self._count(ring, self._current_bucket())
+
+        with self._lock:
+            ring = self._rings.get(identifier, {}).get(cred_type)
+            if ring is None:
+                return 0
+            return self._count(ring, self._current_bucket())
+
+    def reset(self, identifier):
+        """
+        Forgets the failed attempts of an account, such as when it is unlocked.
+        """
+        if self.is_shared:
+            self.cache_handler.delete(domain=self.domain, identifier=identifier)
+
+        with self._lock:
+            self._rings.pop(identifier, None)
+
+    def __len__(self):
+        return len(self._rings)
+
+    def __repr__(self):
+        return ("FailedAttemptTracker(window={0}, buckets={1}, max_accounts={2}, "
+                "shared={3}, accounts={4})".format(self.window, self.buckets,
+                                                   self.max_accounts, self.shared,
+                                                   len(self._rings)))
+
+
+# new to yosai:
+class PasswordVerificationExecutor:
+    """
+    A ``PasswordVerificationExecutor`` verifies passwords in a pool of worker
+    processes so that slow hashes, such as bcrypt and argon2, neither occupy
+    the request threads' share of the GIL nor starve other requests during a
+    login storm.
+
+    At most ``max_pending`` verifications are queued or running at once.  A
+    verification submitted beyond that bound is not queued:  it fails fast
+    with a VerificationSaturatedException, which is retryable, so that
+    authentication backs off instead of accumulating an unbounded backlog.
+    The pool is started upon the first verification.
+    """
+    def __init__(self, max_workers=2, max_pending=32, timeout=5):
+        """
+        :param max_workers: the number of worker processes
+        :param max_pending: the maximum number of verifications queued or running
+        :param timeout: seconds to wait for a verification
+        """
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self.timeout = timeout
+
+        self._pool = None
+        self._pool_lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(max_pending)
+
+    @property
+    def pool(self):
+        if self._pool is None:
+            with self._pool_lock:
+                if self._pool is None:
+                    self._pool = concurrent.futures.ProcessPoolExecutor(
+                        max_workers=self.max_workers)
+        return self._pool
+
+    def verify(self, crypt_context, submitted, stored):
+        """
+        :type crypt_context: CryptContext
+        :returns: the result of crypt_context.verify(submitted, stored)
+        :raises VerificationSaturatedException: when max_pending verifications
+                                                are outstanding, or when the
+                                                verification times out
+        """
+        if not self._slots.acquire(blocking=False):
+            logger.warning('Password verification is saturated:  %s verifications '
+                           'are pending', self.max_pending)
+            raise VerificationSaturatedException(retry_after=self.timeout)
+
+        try:
+            future = self.pool.submit(_verify_password, crypt_context.to_string(),
+                                      submitted, stored)
+        except BaseException:
+            self._slots.release()
+            raise
+        # the slot is held until the worker is done, even if the caller stops
+        # waiting for it:
+        future.add_done_callback(lambda _: self._slots.release())
+
+        try:
+            return future.result(timeout=self.timeout)
+        except concurrent.futures.TimeoutError:
+            future.cancel()
+            msg = 'Password verification timed out after {0} seconds'.\
+                format(self.timeout)
+            logger.warning(msg)
+            raise VerificationSaturatedException(retry_after=self.timeout)
+
+    def shutdown(self, wait=True):
+        with self._pool_lock:
+            if self._pool is not None:
+                self._pool.shutdown(wait=wait)
+                self._pool = None
+
+    def __repr__(self):
+        return ("PasswordVerificationExecutor(max_workers={0}, max_pending={1}, "
+                "timeout={2})".format(self.max_workers, self.max_pending,
+                                      self.timeout))
+
+
 class DefaultAuthenticator(authc_abcs.Authenticator):
 
     # Unlike Shiro, Yosai injects the strategy and the eventbus
@@ -139,6 +486,18 @@ class DefaultAuthenticator(authc_abcs.Authenticator):
         self.locking_limit = None
         self.event_bus = None
 
+        self.failed_attempt_tracker = FailedAttemptTracker(
+            **self.authc_settings.failed_attempts)
+
+        self.throttle = None
+        if self.authc_settings.throttle_enabled:
+            self.throttle = AuthenticationThrottle(**self.authc_settings.throttle)
+
+        self.verification_executor = None
+        if self.authc_settings.verification_executor_enabled:
+            self.verification_executor = PasswordVerificationExecutor(
+                **self.authc_settings.verification_executor)
+
     def init_realms(self, realms):
         """
         :type realms: Tuple
@@ -148,6 +507,17 @@ class DefaultAuthenticator(authc_abcs.Authenticator):
         self.register_cache_clear_listener()
         self.token_realm_resolver = self.init_token_resolution()
         self.init_locking()
+        self.apply_failed_attempt_tracker()
+        self.apply_verification_executor()
+
+    # new to yosai:
+    def shutdown(self, wait=True):
+        """
+        Releases the worker processes of the verification executor, when one
+        is configured.
+        """
+        if self.verification_executor is not None:
+            self.verification_executor.shutdown(wait=wait)
 
     def init_locking(self):
         locking_limit = self.authc_settings.account_lock_threshold
@@ -163,6 +533,29 @@ class DefaultAuthenticator(authc_abcs.Authenticator):
                     token_resolver[token_class].append(realm)
         return token_resolver
 
+    # new to yosai:
+    def apply_cache_handler(self, cache_handler):
+        self.failed_attempt_tracker.cache_handler = cache_handler
+        if self.throttle is not None:
+            self.throttle.cache_handler = cache_handler
+
+    # new to yosai:
+    def apply_failed_attempt_tracker(self):
+        for realm in self.realms:
+            if hasattr(realm, 'failed_attempt_tracker'):  # implies tracking support
+                realm.failed_attempt_tracker = self.failed_attempt_tracker
+
+    # new to yosai:
+    def apply_verification_executor(self):
+        """
+        Passwords submitted with a UsernamePasswordToken are verified by the
+        verification executor, when one is configured, rather than inline.
+        """
+        for realm in self.token_realm_resolver.get(UsernamePasswordToken, ()):
+            verifier = getattr(realm, 'token_resolver', {}).get(UsernamePasswordToken)
+            if hasattr(verifier, 'verification_executor'):  # implies support
+                verifier.verification_executor = self.verification_executor
+
     def locate_locking_realm(self):
         """
         the first realm that is identified as a LockingRealm will be used to
@@ -187,57 +580,100 @@ class DefaultAuthenticator(authc_abcs.Authenticator):
         :returns: account_id (identifiers) if the account authenticates
         :rtype: SimpleIdentifierCollection
         """
-        msg = ("Authentication submission received for authentication "
-               "token [" + str(authc_token) + "]")
-        logger.debug(msg)
+        self.prepare_authc_token(identifiers, authc_token)
 
-        # the following conditions verify correct authentication sequence
-        if not getattr(authc_token, 'identifier', None):
-            if not identifiers:
-                msg = "Authentication must be performed in expected sequence."
-                raise InvalidAuthenticationSequenceException(msg)
-            authc_token.identifier = identifiers.primary_identifier
-
-        # add token metadata before sending it onward:
-        authc_token.token_info = token_info[authc_token.__class__]
+        # rejects the attempt before any account is obtained or hash verified:
+        self.throttle_attempt(authc_token)
 
         try:
-            account = self.do_authenticate_account(authc_token)
-            if (account is None):
-                msg2 = ("No account returned by any configured realms for "
-                        "submitted authentication token [{0}]".
-                        format(authc_token))
-
-                raise AccountException(msg2)
+            account = self.assert_account_returned(
+                authc_token, self.do_authenticate_account(authc_token))
 
         except AdditionalAuthenticationRequired as exc:
             if second_factor_token:
                 return self.authenticate_account(exc.account_id, second_factor_token, None)
 
-            self.notify_event(authc_token.identifier, 'AUTHENTICATION.PROGRESS')
+            self.on_authentication_failure(authc_token, exc)
             raise exc  # the security_manager saves subject identifiers
 
-        except AccountException:
-            self.notify_event(authc_token.identifier,
-                              'AUTHENTICATION.ACCOUNT_NOT_FOUND')
-            raise
-
-        except LockedAccountException:
-            self.notify_event(authc_token.identifier, 'AUTHENTICATION.FAILED')
-            self.notify_event(authc_token.identifier, 'AUTHENTICATION.ACCOUNT_LOCKED')
+        except (AccountException, LockedAccountException) as exc:
+            self.on_authentication_failure(authc_token, exc)
             raise
 
         except IncorrectCredentialsException as exc:
-            self.notify_event(authc_token.identifier, 'AUTHENTICATION.FAILED')
+            self.on_authentication_failure(authc_token, exc)
             self.validate_locked(authc_token, exc.failed_attempts)
             # this won't be called if the Account is locked:
             raise IncorrectCredentialsException
 
+        return self.on_authentication_success(account)
+
+    # new to yosai:
+    def prepare_authc_token(self, identifiers, authc_token):
+        """
+        Verifies the authentication sequence and adds token metadata before
+        the token is sent onward.
+        """
+        msg = ("Authentication submission received for authentication "
+               "token [" + str(authc_token) + "]")
+        logger.debug(msg)
+
+        # the following conditions verify correct authentication sequence
+        if not getattr(authc_token, 'identifier', None):
+            if not identifiers:
+                msg = "Authentication must be performed in expected sequence."
+                raise InvalidAuthenticationSequenceException(msg)
+            authc_token.identifier = identifiers.primary_identifier
+
+        authc_token.token_info = token_info[authc_token.__class__]
+
+    # new to yosai:
+    def assert_account_returned(self, authc_token, account):
+        if (account is None):
+            msg = ("No account returned by any configured realms for "
+                   "submitted authentication token [{0}]".format(authc_token))
+            raise AccountException(msg)
+        return account
+
+    # new to yosai:
+    def on_authentication_failure(self, authc_token, exc):
+        """
+        Publishes the events of an authentication attempt that raised exc.
+        """
+        identifier = authc_token.identifier
+        if isinstance(exc, AdditionalAuthenticationRequired):
+            self.notify_event(identifier, 'AUTHENTICATION.PROGRESS')
+        elif isinstance(exc, AccountException):
+            self.notify_event(identifier, 'AUTHENTICATION.ACCOUNT_NOT_FOUND')
+        elif isinstance(exc, LockedAccountException):
+            self.notify_event(identifier, 'AUTHENTICATION.FAILED')
+            self.notify_event(identifier, 'AUTHENTICATION.ACCOUNT_LOCKED')
+        elif isinstance(exc, IncorrectCredentialsException):
+            self.notify_event(identifier, 'AUTHENTICATION.FAILED')
+
+    # new to yosai:
+    def on_authentication_success(self, account):
         self.notify_event(account['account_id'].primary_identifier,
                           'AUTHENTICATION.SUCCEEDED')
-
         return account['account_id']
 
+    # new to yosai:
+    def throttle_attempt(self, authc_token):
+        """
+        :raises AuthenticationThrottledException: when the attempt exceeds the
+                                                  rate limit of its identifier
+                                                  or host
+        """
+        if self.throttle is None:
+            return
+        try:
+            self.throttle.acquire(authc_token)
+        except AuthenticationThrottledException:
+            msg = ("Authentication attempt throttled for [{0}] from [{1}]".
+                   format(authc_token.identifier, getattr(authc_token, 'host', None)))
+            logger.warning(msg)
+            raise
+
     def do_authenticate_account(self, authc_token):
         """
         Returns an account object only when the current token authenticates AND
@@ -257,6 +693,16 @@ class DefaultAuthenticator(authc_abcs.Authenticator):
         else:
             account = self.authenticate_multi_realm_account(self.realms, authc_token)
 
+        return self.assert_authentication_complete(authc_token, account)
+
+    # new to yosai:
+    def assert_authentication_complete(self, authc_token, account):
+        """
+        :returns: the account, when authentication is complete
+        :raises LockedAccountException: when the failed attempts breach the
+                                        locking threshold
+        :raises AdditionalAuthenticationRequired: when additional tokens are required
+        """
         cred_type = authc_token.token_info['cred_type']
         attempts = account['authc_info'][cred_type].get('failed_attempts', [])
         self.validate_locked(authc_token, attempts)
@@ -273,6 +719,82 @@ class DefaultAuthenticator(authc_abcs.Authenticator):
             raise AdditionalAuthenticationRequired(account['account_id'])
         return account
 
+    # --------------------------------------------------------------------------
+    # Asynchronous Authentication
+    # --------------------------------------------------------------------------
+
+    # new to yosai:
+    def run_in_executor(self, func, *args):
+        return asyncio.get_event_loop().run_in_executor(None, func, *args)
+
+    # new to yosai:
+    async def authenticate_account_async(self, identifiers, authc_token,
+                                         second_factor_token=None):
+        """
+        The asynchronous counterpart of authenticate_account:  only obtaining
+        and verifying the account differs, the events published are the same.
+
+        :returns: account_id (identifiers) if the account authenticates
+        :rtype: SimpleIdentifierCollection
+        """
+        self.prepare_authc_token(identifiers, authc_token)
+
+        if self.throttle is not None and self.throttle.shared:
+            await self.run_in_executor(self.throttle_attempt, authc_token)
+        else:
+            self.throttle_attempt(authc_token)
+
+        try:
+            account = self.assert_account_returned(
+                authc_token, await self.do_authenticate_account_async(authc_token))
+
+        except AdditionalAuthenticationRequired as exc:
+            if second_factor_token:
+                return await self.authenticate_account_async(
+                    exc.account_id, second_factor_token, None)
+
+            self.on_authentication_failure(authc_token, exc)
+            raise exc
+
+        except (AccountException, LockedAccountException) as exc:
+            self.on_authentication_failure(authc_token, exc)
+            raise
+
+        except IncorrectCredentialsException as exc:
+            self.on_authentication_failure(authc_token, exc)
+            await self.run_in_executor(self.validate_locked, authc_token,
+                                       exc.failed_attempts)
+            raise IncorrectCredentialsException
+
+        return self.on_authentication_success(account)
+
+    # new to yosai:
+    async def do_authenticate_account_async(self, authc_token):
+        """
+        The asynchronous counterpart of do_authenticate_account.  A realm is
+        awaited when it supports authenticate_account_async;  otherwise, as
+        with the multi-realm strategy, authentication runs in an executor.
+        """
+        try:
+            realms = self.token_realm_resolver[authc_token.__class__]
+        except KeyError:
+            raise KeyError('Unsupported Token Type Provided: ', authc_token.__class__.__name__)
+
+        if (len(self.realms) == 1):
+            realm = realms[0]
+            if hasattr(realm, 'authenticate_account_async'):
+                account = await realm.authenticate_account_async(authc_token)
+            else:
+                account = await self.run_in_executor(
+                    self.authenticate_single_realm_account, realm, authc_token)
+        else:
+            account = await self.run_in_executor(
+                self.authenticate_multi_realm_account, self.realms, authc_token)
+
+        # locking an account and dispatching an mfa token are blocking I/O:
+        return await self.run_in_executor(self.assert_authentication_complete,
+                                          authc_token, account)
+
     # --------------------------------------------------------------------------
     # Event Communication
     # --------------------------------------------------------------------------
@@ -313,9 +835,21 @@ class DefaultAuthenticator(authc_abcs.Authenticator):
 
     def validate_locked(self, authc_token, failed_attempts):
         """
-        :param failed_attempts:  the failed attempts for this type of credential
+        :param failed_attempts:  the number of recently failed attempts for
+                                 this type of credential, or a list of their
+                                 timestamps, as obtained from an account
         """
-        if self.locking_limit and len(failed_attempts) > self.locking_limit:
+        if not self.locking_limit:
+            return
+
+        if not isinstance(failed_attempts, int):
+            failed_attempts = len(failed_attempts or ())
+        if self.failed_attempt_tracker is not None:
+            cred_type = token_info[authc_token.__class__]['cred_type']
+            failed_attempts = max(failed_attempts, self.failed_attempt_tracker.
+                                  count(authc_token.identifier, cred_type))
+
+        if failed_attempts > self.locking_limit:
             msg = ('Authentication attempts breached threshold.  Account'
                    ' is now locked for: ' + str(authc_token.identifier))
             self.locking_realm.lock_account(authc_token.identifier)
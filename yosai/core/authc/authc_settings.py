@@ -14,6 +14,13 @@ class AuthenticationSettings:
 
         self.preferred_algorithm = self.authc_config.get('preferred_algorithm')
         self.preferred_algorithm_context = self.algorithms.get(self.preferred_algorithm, {})
+        self.preferred_algorithm_settings = dict(
+            (self.authc_config.get('hash_algorithms') or {}).
+            get(self.preferred_algorithm) or {})
+
+        # when set, the preferred algorithm's cost is calibrated at startup so
+        # that verifying a password takes about this many milliseconds:
+        self.target_verify_ms = self.authc_config.get('target_verify_ms')
 
         self.account_lock_threshold = self.authc_config.get('account_lock_threshold')
 
@@ -24,6 +31,31 @@ class AuthenticationSettings:
         self.mfa_dispatcher = maybe_resolve(totp_settings.get('mfa_dispatcher'))
         self.mfa_dispatcher_config = totp_settings.get('mfa_dispatcher_config')
 
+        # the sliding window over which failed attempts are counted, in
+        # process or through the cache handler:
+        failed_attempts = self.authc_config.get('failed_attempts') or {}
+        self.failed_attempts = {'window': failed_attempts.get('window', 3600),
+                                'buckets': failed_attempts.get('buckets', 12),
+                                'max_accounts': failed_attempts.get('max_accounts',
+                                                                    100000),
+                                'shared': failed_attempts.get('shared', False)}
+
+        # token-bucket rate limits on authentication attempts, applied before
+        # any account is obtained or credentials verified:
+        throttle = dict(self.authc_config.get('throttle') or {})
+        self.throttle_enabled = throttle.pop('enabled', False)
+        self.throttle = {'identifier_rate': throttle.get('identifier'),
+                         'host_rate': throttle.get('host'),
+                         'max_keys': throttle.get('max_keys', 100000),
+                         'shared': throttle.get('shared', False)}
+
+        # password verification in a bounded process pool:
+        verification = dict(self.authc_config.get('verification_executor') or {})
+        self.verification_executor_enabled = verification.pop('enabled', False)
+        self.verification_executor = {'max_workers': verification.get('max_workers', 2),
+                                      'max_pending': verification.get('max_pending', 32),
+                                      'timeout': verification.get('timeout', 5)}
+
     def init_algorithms(self):
         algorithms = self.authc_config.get('hash_algorithms')
         if algorithms:
@@ -0,0 +1,184 @@
+"""
+Licensed to the Apache Software Foundation (ASF) under one
+or more contributor license agreements.  See the NOTICE file
+distributed with this work for additional information
+regarding copyright ownership.  The ASF licenses this file
+to you under the Apache License, Version 2.0 (the
+"License"); you may not use this file except in compliance
+with the License.  You may obtain a copy of the License at
+
+    http://www.apache.org/licenses/LICENSE-2.0
+
+Unless required by applicable law or agreed to in writing,
+software distributed under the License is distributed on an
+"AS IS" BASIS, WITHOUT WARRANTIES OR CONDITIONS OF ANY
+KIND, either express or implied.  See the License for the
+specific language governing permissions and limitations
+under the License.
+
+Calibrates the cost of password hashing schemes to the current machine so
+that a verification takes about a target amount of time.
+
+Run from the command line to print the hash_algorithms settings recommended
+for a target verification time, in milliseconds:
+
+    yosai-calibrate-hash --target-ms 100 argon2 bcrypt_sha256
+"""
+import argparse
+import collections
+import logging
+import math
+import statistics
+import sys
+import time
+
+import yaml
+from passlib.registry import get_crypt_handler
+
+logger = logging.getLogger(__name__)
+
+Calibration = collections.namedtuple('Calibration', 'scheme settings seconds')
+
+SAMPLE_SECRET = 'calibrating a password hash'
+
+# settings that bound, rather than configure, the rounds of a scheme:
+ROUNDS_SETTINGS = ('default_rounds', 'min_rounds', 'max_rounds')
+
+
+def measure_verify(handler, samples=3):
+    """
+    :param handler: a configured passlib handler
+    :returns: the median number of seconds taken to verify a password
+    """
+    hashed = handler.hash(SAMPLE_SECRET)
+    timings = []
+    for _ in range(samples):
+        start = time.perf_counter()
+        handler.verify(SAMPLE_SECRET, hashed)
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings)
+
+
+def scale(cost, target_seconds, seconds, logarithmic=False):
+    if logarithmic:
+        return cost + round(math.log2(target_seconds / seconds))
+    return round(cost * target_seconds / seconds)
+
+
+def calibrate_scheme(scheme, target_seconds=0.1, samples=3, max_iterations=5,
+                     tolerance=0.1, **settings):
+    """
+    Finds the rounds of a scheme for which verifying a password takes about
+    target_seconds on this machine.  The rounds of schemes whose cost is
+    linear, such as argon2's time_cost or sha256_crypt's rounds, are scaled
+    in proportion to the time measured;  the rounds of schemes whose cost is
+    logarithmic, such as bcrypt's, are stepped by powers of two.
+
+    When even the minimum rounds of argon2 are too slow, its memory_cost is
+    scaled down too, unless memory_cost is configured.  Other configured
+    settings are held as they are.
+
+    :param scheme: the name of a passlib scheme, such as 'argon2'
+    :param settings: the scheme's configured settings, as in hash_algorithms;
+                     default_rounds is the starting point and min_rounds and
+                     max_rounds bound the result
+    :returns: a Calibration, whose settings are the calibrated default_rounds
+              and, when calibrated, memory_cost
+    :raises ValueError: when the scheme has no adjustable rounds
+    """
+    handler = get_crypt_handler(scheme)
+    if 'rounds' not in handler.setting_kwds:
+        msg = "{0} has no adjustable rounds to calibrate".format(scheme)
+        raise ValueError(msg)
+
+    min_rounds = max(handler.min_rounds, settings.get('min_rounds') or 0)
+    max_rounds = min(handler.max_rounds, settings.get('max_rounds') or handler.max_rounds)
+    fixed = {key: value for key, value in settings.items()
+             if key not in ROUNDS_SETTINGS}
+    logarithmic = (handler.rounds_cost == 'log2')
+
+    def converged(seconds):
+        return abs(seconds / target_seconds - 1) <= tolerance
+
+    rounds = settings.get('default_rounds') or handler.default_rounds
+    rounds = min(max(rounds, min_rounds), max_rounds)
+    seconds = measure_verify(handler.using(rounds=rounds, **fixed), samples)
+
+    for _ in range(max_iterations):
+        if converged(seconds):
+            break
+        candidate = min(max(scale(rounds, target_seconds, seconds, logarithmic),
+                            min_rounds), max_rounds)
+        if candidate == rounds:
+            break
+        rounds = candidate
+        seconds = measure_verify(handler.using(rounds=rounds, **fixed), samples)
+
+    calibrated = {'default_rounds': rounds}
+
+    if ('memory_cost' in handler.setting_kwds and 'memory_cost' not in fixed and
+            rounds == min_rounds and seconds > target_seconds * (1 + tolerance)):
+        # argon2 requires at least 8KiB per lane:
+        min_memory_cost = 8 * fixed.get('parallelism', handler.parallelism)
+        memory_cost = handler.memory_cost
+        for _ in range(max_iterations):
+            if converged(seconds):
+                break
+            candidate = max(scale(memory_cost, target_seconds, seconds),
+                            min_memory_cost)
+            if candidate == memory_cost:
+                break
+            memory_cost = candidate
+            seconds = measure_verify(handler.using(rounds=rounds,
+                                                   memory_cost=memory_cost,
+                                                   **fixed), samples)
+        calibrated['memory_cost'] = memory_cost
+
+    msg = "Calibrated {0} to {1}, verifying in {2:.1f}ms".\
+        format(scheme, calibrated, seconds * 1000)
+    logger.info(msg)
+    return Calibration(scheme, calibrated, seconds)
+
+
+def calibrate(hash_algorithms, target_seconds=0.1, samples=3):
+    """
+    :param hash_algorithms: a dict of scheme -> settings, as configured in
+                            AUTHC_CONFIG hash_algorithms
+    :returns: a copy of hash_algorithms with calibrated settings
+    """
+    calibrated = {}
+    for scheme, settings in hash_algorithms.items():
+        settings = dict(settings or {})
+        calibration = calibrate_scheme(scheme, target_seconds, samples, **settings)
+        settings.update(calibration.settings)
+        calibrated[scheme] = settings
+    return calibrated
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Recommends the hash_algorithms settings for which "
+                    "verifying a password takes about a target time on this "
+                    "machine.")
+    parser.add_argument('schemes', nargs='*', default=['argon2', 'bcrypt_sha256'],
+                        help="passlib schemes to calibrate (default: %(default)s)")
+    parser.add_argument('--target-ms', type=float, default=100,
+                        help="target verification time, in milliseconds "
+                             "(default: %(default)s)")
+    parser.add_argument('--samples', type=int, default=3,
+                        help="verifications timed per measurement "
+                             "(default: %(default)s)")
+    args = parser.parse_args(argv)
+
+    try:
+        calibrated = calibrate({scheme: {} for scheme in args.schemes},
+                               args.target_ms / 1000, args.samples)
+    except (KeyError, ValueError) as exc:
+        parser.error(str(exc))
+
+    yaml.safe_dump({'hash_algorithms': calibrated}, sys.stdout,
+                   default_flow_style=False)
+
+
+if __name__ == '__main__':
+    main()
@@ -29,6 +29,7 @@ from yosai.core import (
     UsernamePasswordToken,
     TOTPToken,
     authc_abcs,
+    calibrate_scheme,
 )
 
 logger = logging.getLogger(__name__)
@@ -41,6 +42,7 @@ class PasslibVerifier(authc_abcs.CredentialsVerifier):
         self.password_cc = self.create_password_crypt_context(authc_settings)
         self.totp_factory = create_totp_factory(authc_settings=authc_settings)
         self.supported_tokens = [UsernamePasswordToken, TOTPToken]
+        self.verification_executor = None  # injected by the DefaultAuthenticator
 
     def verify_credentials(self, authc_token, authc_info):
         submitted = authc_token.credentials
@@ -48,7 +50,11 @@ class PasslibVerifier(authc_abcs.CredentialsVerifier):
 
         if isinstance(authc_token, UsernamePasswordToken):
             try:
-                result = self.password_cc.verify(submitted, stored)
+                if self.verification_executor is not None:
+                    result = self.verification_executor.verify(
+                        self.password_cc, submitted, stored)
+                else:
+                    result = self.password_cc.verify(submitted, stored)
                 if not result:
                     raise IncorrectCredentialsException
             except ValueError:
@@ -81,8 +87,16 @@ class PasslibVerifier(authc_abcs.CredentialsVerifier):
             raise KeyError(msg)
 
     def create_password_crypt_context(self, authc_settings):
-        context = dict(schemes=[authc_settings.preferred_algorithm])
+        algorithm = authc_settings.preferred_algorithm
+        context = dict(schemes=[algorithm])
         context.update(authc_settings.preferred_algorithm_context)
+
+        if authc_settings.target_verify_ms:
+            calibration = calibrate_scheme(algorithm,
+                                           authc_settings.target_verify_ms / 1000,
+                                           **authc_settings.preferred_algorithm_settings)
+            context.update({"{0}__{1}".format(algorithm, key): value
+                            for key, value in calibration.settings.items()})
         return CryptContext(**context)
 
     def generate_totp_token(self, totp_key):
@@ -16,10 +16,18 @@ KIND, either express or implied.  See the License for the
 specific language governing permissions and limitations
 under the License.
 """
+import asyncio
+import concurrent.futures
 import itertools
 import logging
+import string
+import threading
+import time
+import types
+import weakref
 
 from yosai.core import (
+    AuthorizationSettings,
     EVENT_TOPIC,
     SerializationManager,
     UnauthorizedException,
@@ -33,6 +41,62 @@ import collections
 logger = logging.getLogger(__name__)
 
 
+# new to yosai:
+class ActionBits:
+    """
+    Assigns every action name a bit position so that the actions of a
+    permission are encoded as an int mask, and the action level of
+    ``WildcardPermission.implies`` is decided with a single bitwise comparison
+    rather than a set comparison.  A mask with every bit set, -1, encodes
+    the wildcard action:  a wildcard grant implies any actions and a
+    wildcard requirement is implied only by a wildcard grant.
+
+    Bit positions are shared by all domains, so that masks remain comparable
+    across wildcard and multi-valued domains, and are assigned on first use.
+    They are local to a process and are never serialized.
+
+    At most ``maxsize`` actions are assigned a bit, bounding both the table
+    and the width of the masks when action names are many or untrusted.
+    Actions beyond the bound are not encoded:  mask returns None for them and
+    ``implies`` falls back to comparing the actions as sets.
+    """
+    WILDCARD_TOKEN = '*'
+
+    def __init__(self, maxsize=512):
+        self.maxsize = maxsize
+        self._bits = {}
+        self._lock = threading.Lock()
+
+    def mask(self, actions):
+        """
+        :type actions:  an iterable of str
+        :returns: the int mask encoding the actions, or None when an action
+                  cannot be assigned a bit
+        """
+        bits = self._bits
+        mask = 0
+        for action in actions:
+            if action == self.WILDCARD_TOKEN:
+                return -1
+            bit = bits.get(action)
+            if bit is None:
+                with self._lock:
+                    bit = bits.get(action)
+                    if bit is None and len(bits) < self.maxsize:
+                        bit = bits[action] = 1 << len(bits)
+            if bit is None:
+                mask = None
+            elif mask is not None:
+                mask |= bit
+        return mask
+
+    def __len__(self):
+        return len(self._bits)
+
+
+action_bits = ActionBits()
+
+
 class WildcardPermission(serialize_abcs.Serializable):
     """
     A ``WildcardPermission`` is a very flexible permission construct supporting
@@ -123,25 +187,91 @@ class WildcardPermission(serialize_abcs.Serializable):
     However, common usages shown above can help you get started and provide
     consistency across the Yosai community.  Again, a typical permission wildcard
     syntax is:  ``'domain:action:target'``.
+
+    Permissions are immutable values:  each part is a ``frozenset`` exposed
+    through a read-only ``parts`` mapping and the hash is computed once, when
+    the parts are set, so permissions may be collected in sets or used as
+    dict keys.  The actions are additionally encoded as an int mask (see
+    ``ActionBits``) with which ``implies`` compares the action level.
+    Instances define ``__slots__`` and carry no ``__dict__``.
     """
+    __slots__ = ('case_sensitive', '_levels', '_hash', '_action_mask')
+
     WILDCARD_TOKEN = '*'
     PART_DIVIDER_TOKEN = ':'
     SUBPART_DIVIDER_TOKEN = ','
 
+    PART_NAMES = ('domain', 'action', 'target')
+
     def __init__(self, wildcard_string=None, case_sensitive=False):
         """
         :type wildcard_string:  String
         :case_sensitive:  Boolean
         """
         self.case_sensitive = case_sensitive
-        self.parts = {'domain': {'*'}, 'action': {'*'}, 'target': {'*'}}
         if wildcard_string:
-            self.setparts(wildcard_string, case_sensitive)
+            self._setparts(wildcard_string, case_sensitive)
         else:
             msg = 'WildcardPermission init requires a wildcard_string.'
             raise ValueError(msg)
 
-    def setparts(self, wildcard_string, case_sensitive=False):
+    @classmethod
+    def from_levels(cls, domain, action, target):
+        """
+        Creates a permission from parts that are already split into
+        subparts, bypassing the parsing of a wildcard string.
+
+        :type domain:  an iterable of str
+        :type action:  an iterable of str
+        :type target:  an iterable of str
+        """
+        permission = cls.__new__(cls)
+        permission.case_sensitive = False
+        permission._freeze(domain, action, target)
+        return permission
+
+    def _freeze(self, domain, action, target):
+        """
+        Sets the parts of this permission.  This is the only place where the
+        parts are assigned, keeping the parts and the precomputed hash in step.
+        Parts are set once, while the permission is constructed:  a permission
+        may be shared by the interner and already be a set member or dict key.
+
+        :type domain:  an iterable of str
+        :type action:  an iterable of str
+        :type target:  an iterable of str
+
+        :raises AttributeError: when the parts are already set
+        """
+        if hasattr(self, '_levels'):
+            msg = "{0} is immutable".format(self.__class__.__name__)
+            raise AttributeError(msg)
+
+        levels = (frozenset(domain), frozenset(action), frozenset(target))
+        self._levels = levels
+        self._hash = hash(levels)
+        self._action_mask = action_bits.mask(levels[1])
+
+    @property
+    def parts(self):
+        """
+        :returns: a read-only mapping of part name to frozenset of subparts
+        """
+        return types.MappingProxyType(dict(zip(self.PART_NAMES, self._levels)))
+
+    @property
+    def domain(self):
+        return self._levels[0]
+
+    @property
+    def action(self):
+        return self._levels[1]
+
+    @property
+    def target(self):
+        return self._levels[2]
+
+    def _setparts(self, wildcard_string, case_sensitive=False):
         """
         :type wildcard_string:  str
         :case_sensitive:  bool
@@ -163,7 +293,7 @@ class WildcardPermission(serialize_abcs.Serializable):
 
         parts = wildcard_string.split(self.PART_DIVIDER_TOKEN)
 
-        part_indices = {0: 'domain', 1: 'action', 2: 'target'}
+        levels = [(self.WILDCARD_TOKEN,)] * len(self.PART_NAMES)
 
         for index, part in enumerate(parts):
             if not any(x != self.SUBPART_DIVIDER_TOKEN for x in part):
@@ -172,19 +302,14 @@ class WildcardPermission(serialize_abcs.Serializable):
                        "permission strings are properly formatted.")
                 raise ValueError(msg)
 
-            myindex = part_indices.get(index)
-
             # NOTE:  Shiro uses LinkedHashSet objects to maintain order and
             #        Uniqueness. Unlike Shiro, Yosai disregards order as it
             #        presents seemingly unecessary additional overhead (TBD)
-            self.parts[myindex] = set()
-
-            subparts = part.split(self.SUBPART_DIVIDER_TOKEN)
-            for sp in subparts:
-                self.parts[myindex].add(sp)
+            if index < len(levels):
+                levels[index] = part.split(self.SUBPART_DIVIDER_TOKEN)
 
         # final step is to make it immutable:
-        self.parts.update((k, set(v)) for k, v in self.parts.items())
+        self._freeze(*levels)
 
     def implies(self, permission):
         """
@@ -195,51 +320,37 @@ class WildcardPermission(serialize_abcs.Serializable):
         if (not isinstance(permission, WildcardPermission)):
             return False
 
-        myparts = [token for token in
-                   [self.parts.get('domain'),
-                    self.parts.get('action'),
-                    self.parts.get('target')] if token]
-
-        otherparts = [token for token in
-                      [permission.parts.get('domain'),
-                       permission.parts.get('action'),
-                       permission.parts.get('target')] if token]
-
-        index = 0
-
-        for other_part in otherparts:
-            # If this permission has less parts than the other permission,
-            # everything after the number of parts contained in this
-            # permission is automatically implied, so return true
-            if (len(myparts) - 1 < index):
-                return True
-            else:
-                part = myparts[index]  # each subpart is a Set
-                if ((self.WILDCARD_TOKEN not in part) and
-                   not (other_part <= part)):  # not(part contains otherpart)
-                    return False
-                index += 1
-
-        # If this permission has more parts than the other parts,
-        # only imply it if all of the other parts are wildcards
-        for i in range(index, len(myparts)):
-            if (self.WILDCARD_TOKEN not in myparts[i]):
+        # every permission has exactly three non-empty parts, so a part is
+        # implied when this permission's part is a wildcard or a superset.
+        # Actions are compared as masks: implied when no other bit is unset
+        wildcard = self.WILDCARD_TOKEN
+        domain, action, target = self._levels
+        other_domain, other_action, other_target = permission._levels
+
+        action_mask, other_action_mask = self._action_mask, permission._action_mask
+        if action_mask is None or other_action_mask is None:
+            # an action beyond ActionBits.maxsize has no bit:
+            if not (wildcard in action or other_action <= action):
                 return False
+        elif (other_action_mask & ~action_mask):
+            return False
 
-        return True
+        return ((wildcard in domain or other_domain <= domain) and
+                (wildcard in target or other_target <= target))
 
     def __repr__(self):
         return ("{0}({1}:{2}:{3})".format(self.__class__.__name__,
-                                          self.parts.get('domain'),
-                                          self.parts.get('action'),
-                                          self.parts.get('target')))
+                                          *(set(level) for level in self._levels)))
 
     def __eq__(self, other):
         if (isinstance(other, WildcardPermission)):
-            return self.parts == other.parts
+            return self._levels == other._levels
 
         return False
 
+    def __hash__(self):
+        return self._hash
+
     def __getstate__(self):
         parts = {part: list(items) for part, items in self.parts.items()}
         return {
@@ -248,33 +359,33 @@ class WildcardPermission(serialize_abcs.Serializable):
         }
 
     def __setstate__(self, state):
-        parts = {part: set(items) for part, items in state['parts'].items()}
-        self.parts = parts
+        parts = state['parts']
+        self._freeze(*(parts.get(name, '*') for name in self.PART_NAMES))
         self.case_sensitive = state['case_sensitive']
 
 
 class DefaultPermission(WildcardPermission):
+    __slots__ = ()
+
     def __init__(self, wildcard_string=None, parts=None, case_sensitive=False):
         if wildcard_string:
             super().__init__(wildcard_string=wildcard_string)
         else:
-            self.parts = {'domain': set([parts.get('domain', '*')]),
-                          'action': set(parts.get('action', '*')),
-                          'target': set(parts.get('target', '*'))}
+            self.set_parts_from_dict(parts)
 
         self.case_sensitive = case_sensitive
 
-    @property
-    def domain(self):
-        return self.parts['domain']
+    def set_parts_from_dict(self, parts):
+        """
+        Sets the parts from the dict format that permissions are persisted
+        in, where the domain is a str and the action and target are lists.
 
-    @property
-    def action(self):
-        return self.parts['action']
+        :type parts:  dict
+        """
+        def subparts(value):
+            return (value,) if isinstance(value, str) else value
 
-    @property
-    def target(self):
-        return self.parts['target']
+        self._freeze(*(subparts(parts.get(name, '*')) for name in self.PART_NAMES))
 
     def encode_parts(self, domain, action, target):
         """
@@ -293,58 +404,901 @@ class DefaultPermission(WildcardPermission):
 
         return permission
 
-    # overrides WildcardPermission.set_parts:
-    def set_parts(self, domain=None, action=None, target=None):
+    def __getstate__(self):
+        return {
+            'parts': {part: sorted(items) for part, items in self.parts.items()},
+            'case_sensitive': self.case_sensitive
+        }
+
+    def __setstate__(self, state):
+        self.set_parts_from_dict(state['parts'])
+        self.case_sensitive = state.get('case_sensitive', False)
+
+
+# new to yosai:
+class PermissionInterner:
+    """
+    A ``PermissionInterner`` is a bounded, least-recently-used table of parsed
+    permissions.  Permission checks are made against the same few permission
+    strings over and over again (those declared by ``requires_permission``,
+    for instance), as are the permission parts decoded from cached
+    authorization info.  Interning returns a shared ``DefaultPermission`` for
+    each distinct input, so that parsing happens once per process rather than
+    once per check.
+
+    Interned permissions are shared among all callers and must therefore be
+    treated as read-only.
+
+    The ``hits`` and ``misses`` counters are exposed for tuning ``maxsize``.
+    """
+
+    def __init__(self, maxsize=4096):
+        """
+        :param maxsize: the maximum number of permissions retained
+        :type maxsize: int
         """
-        Shiro uses method overloading to determine as to whether to call
-        either this set_parts or that of the parent WildcardPermission.  The
-        closest that I will accomodate that design is with default parameter
-        values and the first condition below.
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._permissions = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    def _intern(self, key, factory):
+        with self._lock:
+            try:
+                permission = self._permissions[key]
+            except KeyError:
+                self.misses += 1
+            else:
+                self._permissions.move_to_end(key)
+                self.hits += 1
+                return permission
 
-        The control flow is as follow:
-            If wildcard_string is passed, call super's set_parts
-            Else process the orderedsets
+        # parsing happens outside of the lock; a concurrent miss for the same
+        # key merely parses the same input twice:
+        permission = factory()
 
-        :type action:  either a Set of strings or a subpart-delimeted string
-        :type target:  an Set of Strings or a subpart-delimeted string
+        with self._lock:
+            self._permissions[key] = permission
+            while len(self._permissions) > self.maxsize:
+                self._permissions.popitem(last=False)
+
+        return permission
+
+    def permission(self, wildcard_string, case_sensitive=False):
         """
+        :type wildcard_string:  str
+        :type case_sensitive:  bool
+        :returns: a shared DefaultPermission parsed from the wildcard_string
+        """
+        return self._intern((wildcard_string, case_sensitive),
+                            lambda: DefaultPermission(wildcard_string=wildcard_string,
+                                                      case_sensitive=case_sensitive))
 
-        # default values
-        domain_string = domain
-        action_string = action
-        target_string = target
+    def permission_from_parts(self, parts):
+        """
+        :param parts: permission parts, as decoded from cached authz info
+        :type parts: dict
+        :returns: a shared DefaultPermission created from the parts
+        """
+        key = (parts.get('domain', '*'),
+               tuple(parts.get('action', '*')),
+               tuple(parts.get('target', '*')))
+        return self._intern(key, lambda: DefaultPermission(parts=parts))
 
-        if (isinstance(domain, set) or isinstance(domain, set)):
-            domain_string = self.SUBPART_DIVIDER_TOKEN.\
-                join([token for token in domain])
+    @property
+    def currsize(self):
+        return len(self._permissions)
 
-        if (isinstance(action, set) or isinstance(action, set)):
-            action_string = self.SUBPART_DIVIDER_TOKEN.\
-                join([token for token in action])
+    def clear(self):
+        with self._lock:
+            self._permissions.clear()
+            self.hits = 0
+            self.misses = 0
 
-        if (isinstance(target, set) or isinstance(target, set)):
-            target_string = self.SUBPART_DIVIDER_TOKEN.\
-                join([token for token in target])
+    def __repr__(self):
+        return ("PermissionInterner(hits={0}, misses={1}, maxsize={2}, "
+                "currsize={3})".format(self.hits, self.misses, self.maxsize,
+                                       self.currsize))
 
-        permission = self.encode_parts(domain=domain_string,
-                                       action=action_string,
-                                       target=target_string)
 
-        super().setparts(wildcard_string=permission)
+# one process-wide instance is shared by all realms:
+permission_interner = PermissionInterner()
 
-    def __getstate__(self):
-        return {
-            'parts': self.parts,
-            'case_sensitive': self.case_sensitive
-        }
 
-    def __setstate__(self, state):
-        parts = state['parts']
-        self.parts = {'domain': set([parts.get('domain', '*')]),
-                      'action': set(parts.get('action', '*')),
-                      'target': set(parts.get('target', '*'))}
+# new to yosai:
+class CompiledPermissions:
+    """
+    ``CompiledPermissions`` is an immutable collection of required permissions
+    that were parsed and validated once, in advance of any authorization check.
+    The ``requires_permission`` decorators compile their permissions when a
+    function is decorated so that a malformed permission string raises a
+    ValueError at import rather than during a request.
+
+    Iterating over it yields the permissions as they were specified, so
+    authorization results and events continue to refer to the original
+    strings, while realms use the pre-built ``permissions`` and the
+    ``domains`` they relate to without parsing again.
+    """
+    __slots__ = ('permission_s', 'permissions', 'domains')
+
+    def __init__(self, permission_s, interner=permission_interner):
+        """
+        :param permission_s: the required permission(s)
+        :type permission_s: a permission string or an iterable of permission
+                            string(s) or Permission object(s)
+        :type interner: PermissionInterner
+
+        :raises ValueError: if a permission string is malformed
+        """
+        if isinstance(permission_s, str):
+            permission_s = [permission_s]
+
+        self.permission_s = tuple(permission_s)
+        self.permissions = tuple(
+            perm if isinstance(perm, WildcardPermission)
+            else interner.permission(perm) for perm in self.permission_s)
+
+        self.domains = self.domains_of(self.permissions)
+
+    @classmethod
+    def from_items(cls, items):
+        """
+        :param items: (specified permission, Permission) pairs, such as those
+                      of bound PermissionTemplates
+        :rtype: CompiledPermissions
+        """
+        items = tuple(items)
+        compiled = cls.__new__(cls)
+        compiled.permission_s = tuple(perm for perm, _ in items)
+        compiled.permissions = tuple(permission for _, permission in items)
+        compiled.domains = cls.domains_of(compiled.permissions)
+        return compiled
+
+    @staticmethod
+    def domains_of(permissions):
+        """
+        :returns: the domains of the cached permissions that a check of the
+                  permissions must consult, in order of appearance
+        """
+        return tuple(collections.OrderedDict.fromkeys(
+            next(iter(permission.domain)) for permission in permissions))
+
+    @classmethod
+    def compile(cls, permission_s):
+        """
+        :returns: permission_s, compiled unless it already is
+        :rtype: CompiledPermissions
+        """
+        if isinstance(permission_s, cls):
+            return permission_s
+        return cls(permission_s)
+
+    def items(self):
+        """
+        :returns: the (specified permission, Permission) pairs
+        """
+        return zip(self.permission_s, self.permissions)
+
+    def __iter__(self):
+        return iter(self.permission_s)
+
+    def __len__(self):
+        return len(self.permission_s)
+
+    def __eq__(self, other):
+        if isinstance(other, CompiledPermissions):
+            return self.permission_s == other.permission_s
+        return False
+
+    def __hash__(self):
+        return hash(self.permission_s)
+
+    def __repr__(self):
+        return "CompiledPermissions({0})".format(list(self.permission_s))
+
+
+# new to yosai:
+class PermissionTemplate:
+    """
+    A ``PermissionTemplate`` is a permission string with ``str.format`` fields,
+    such as ``'{kwarg1.domainid}:action1,action2'``, compiled once so that a
+    dynamic permission check does not format and parse the entire permission
+    for every call.  Parts of the template without fields are parsed in
+    advance and only those parts that are bound from the supplied arguments
+    are formatted and split into subparts when the template is bound.
+
+    Templates that can't be compiled part by part, such as those with more
+    than three parts or a bound value that contains the part divider, are
+    formatted and parsed in their entirety, just as before.
+    """
+    __slots__ = ('template', '_levels')
+
+    WILDCARD_TOKEN = WildcardPermission.WILDCARD_TOKEN
+    PART_DIVIDER_TOKEN = WildcardPermission.PART_DIVIDER_TOKEN
+    SUBPART_DIVIDER_TOKEN = WildcardPermission.SUBPART_DIVIDER_TOKEN
+
+    formatter = string.Formatter()
+
+    def __init__(self, template):
+        """
+        :type template:  str
+
+        :raises ValueError: if a static part of the template is malformed
+        """
+        self.template = template
+        self._levels = self.compile(template)
+
+    def compile(self, template):
+        """
+        :returns: a (subparts, part) pair for each part of the template, where
+                  subparts is a frozenset for a static part and None for a
+                  part bound from arguments, or None when the template must
+                  be bound in its entirety
+        """
+        parts = template.strip().split(self.PART_DIVIDER_TOKEN)
+        if len(parts) > 3:
+            return None
+
+        levels = []
+        for part in parts:
+            try:
+                is_static = all(field_name is None for _, field_name, _, _
+                                in self.formatter.parse(part))
+            except ValueError:  # the part divider belongs to a format spec
+                return None
+
+            if is_static:
+                part = part.replace('{{', '{').replace('}}', '}')
+                levels.append((self.subparts(part), part))
+            else:
+                levels.append((None, part))
+
+        return tuple(levels)
+
+    def subparts(self, part):
+        """
+        :type part:  str
+        :returns: the lower-cased subparts of a part, as a frozenset
+        :raises ValueError: if the part consists of nothing but dividers
+        """
+        if not any(x != self.SUBPART_DIVIDER_TOKEN for x in part):
+            msg = ("Wildcard string cannot contain parts consisting JUST "
+                   "of sub-part dividers or nothing at all. Ensure that "
+                   "permission strings are properly formatted.")
+            raise ValueError(msg)
+        return frozenset(part.lower().split(self.SUBPART_DIVIDER_TOKEN))
+
+    def bind(self, params):
+        """
+        :param params: the values of the template's format fields
+        :type params:  dict
+
+        :returns: a tuple of the permission string and its Permission
+        :raises ValueError: if a bound part is malformed
+        """
+        if self._levels is None:
+            permission = self.template.format(**params)
+            return (permission, permission_interner.permission(permission))
+
+        strings = []
+        levels = []
+        for subparts, part in self._levels:
+            if subparts is None:
+                part = part.format(**params)
+                if self.PART_DIVIDER_TOKEN in part:
+                    # a bound value spans parts, so parse it as a whole:
+                    permission = self.template.format(**params)
+                    return (permission, permission_interner.permission(permission))
+                subparts = self.subparts(part)
+            strings.append(part)
+            levels.append(subparts)
+
+        permission = self.PART_DIVIDER_TOKEN.join(strings)
+        if permission != permission.strip():
+            return (permission, permission_interner.permission(permission))
+
+        levels.extend([frozenset([self.WILDCARD_TOKEN])] * (3 - len(levels)))
+        return (permission, DefaultPermission.from_levels(*levels))
+
+    def __repr__(self):
+        return "PermissionTemplate({0!r})".format(self.template)
+
+
+# new to yosai:
+class AllTargets:
+    """
+    The marker returned by permitted_targets queries when a subject is
+    granted a wildcard target, such as 'blogpost:edit:*', and so may act upon
+    every target rather than an explicit set of them.  It contains every
+    target.  Test for it by identity:  ``targets is ALL_TARGETS``
+    """
+    __slots__ = ()
+
+    def __contains__(self, target):
+        return True
+
+    def __reduce__(self):
+        return 'ALL_TARGETS'
+
+    def __repr__(self):
+        return 'ALL_TARGETS'
+
+
+ALL_TARGETS = AllTargets()
+
+
+# new to yosai:
+class PermissionIndex:
+    """
+    A ``PermissionIndex`` is an immutable, compiled representation of a
+    collection of granted permissions.  Rather than asking every granted
+    permission whether it implies a required permission (a linear scan over
+    the grants), the index organizes the grants as a domain -> action -> target
+    trie, including wildcard branches, and answers ``implies`` with a bounded
+    number of dictionary lookups:  one per combination of {value, wildcard}
+    at the domain and action levels.
+
+    Each leaf of the trie holds the union of targets granted for a
+    (domain, action) pair along with the grants that contributed to it.
+    When a required permission consists of a single value per part, which
+    is by far the most common case, membership in the target union is an
+    exact answer.  A required permission with multi-valued parts must be
+    implied by one grant in its entirety, so the index narrows the search to
+    the grants of a single leaf and defers to ``WildcardPermission.implies``.
+    """
+    __slots__ = ('_tree', 'permissions')
+
+    WILDCARD_TOKEN = WildcardPermission.WILDCARD_TOKEN
+
+    def __init__(self, permission_s=()):
+        """
+        :param permission_s: the granted permissions to compile
+        :type permission_s: an iterable of WildcardPermission instances
+        """
+        self.permissions = tuple(permission_s)
+
+        tree = {}
+        for permission in self.permissions:
+            permission_domain, permission_action, permission_target = permission._levels
+            for domain in permission_domain:
+                actions = tree.setdefault(domain, {})
+                for action in permission_action:
+                    targets, grants = actions.setdefault(action, (set(), []))
+                    targets.update(permission_target)
+                    grants.append(permission)
+
+        # final step is to make it immutable:
+        self._tree = {domain: {action: (frozenset(targets), tuple(grants))
+                               for action, (targets, grants) in actions.items()}
+                      for domain, actions in tree.items()}
+
+    def _leaves(self, domain, action):
+        """
+        :yields: the (targets, grants) leaves that may imply a permission
+                 for the domain and action specified
+        """
+        wildcard = self.WILDCARD_TOKEN
+        domain_keys = (domain,) if domain == wildcard else (domain, wildcard)
+        action_keys = (action,) if action == wildcard else (action, wildcard)
+
+        for domain_key in domain_keys:
+            actions = self._tree.get(domain_key)
+            if actions:
+                for action_key in action_keys:
+                    leaf = actions.get(action_key)
+                    if leaf:
+                        yield leaf
+
+    def implies(self, permission):
+        """
+        :type permission:  WildcardPermission
+        :returns: True if any of the indexed permissions implies the permission
+        :rtype:  bool
+        """
+        if (not isinstance(permission, WildcardPermission)):
+            return False
+
+        domain, action, target = permission._levels
+
+        if len(domain) == 1 and len(action) == 1 and len(target) == 1:
+            (target,) = target
+            for targets, _ in self._leaves(next(iter(domain)), next(iter(action))):
+                if target in targets or self.WILDCARD_TOKEN in targets:
+                    return True
+            return False
+
+        # a grant that implies this permission is filed under every
+        # (domain, action) pair of the permission, so any one pair will do:
+        for _, grants in self._leaves(next(iter(domain)), next(iter(action))):
+            for grant in grants:
+                if grant.implies(permission):
+                    return True
+        return False
+
+    def filter_permitted(self, domain, action, targets):
+        """
+        Filters targets by the permission to perform an action on them, in one
+        pass:  the targets granted for the domain and action are unioned from
+        a bounded number of leaves and every target is then a set membership
+        test.  A wildcard target grant permits every target without
+        inspecting any of them.
+
+        :param domain: a single permission domain, such as 'blogpost'
+        :type domain:  str
+        :param action: a single permission action, such as 'edit'
+        :type action:  str
+        :param targets: the target identifiers to filter
+        :type targets:  an iterable of target identifiers (str or int)
+
+        :returns: a list of the permitted targets, in the order given
+        """
+        granted = self.permitted_targets(domain, action)
+
+        if granted is ALL_TARGETS:
+            return list(targets)
+
+        if not granted:
+            return []
+
+        return [target for target in targets if str(target).lower() in granted]
+
+    def permitted_targets(self, domain, action):
+        """
+        Lists the targets that the indexed permissions permit an action on,
+        suitable for pre-filtering a query, such as with an IN clause.
+
+        :param domain: a single permission domain, such as 'blogpost'
+        :type domain:  str
+        :param action: a single permission action, such as 'edit'
+        :type action:  str
+
+        :returns: ALL_TARGETS when a wildcard target is granted, otherwise a
+                  frozenset of the (lowercased) target identifiers granted
+        """
+        leaves = [leaf_targets for leaf_targets, _ in
+                  self._leaves(domain.lower(), action.lower())]
+
+        if any(self.WILDCARD_TOKEN in leaf_targets for leaf_targets in leaves):
+            return ALL_TARGETS
+
+        if len(leaves) == 1:
+            return leaves[0]
+
+        return frozenset().union(*leaves)
+
+    def __len__(self):
+        return len(self.permissions)
+
+    def __repr__(self):
+        return "PermissionIndex(permissions={0}, domains={1})".\
+            format(len(self.permissions), sorted(self._tree))
+
+
+# new to yosai:
+class PermissionMatrix:
+    """
+    A ``PermissionMatrix`` evaluates many subjects against the same collection
+    of required permissions, such as for an entitlement export, and holds the
+    results as one row per subject.
+
+    Each required permission is a column, assigned a bit position, and a row
+    is a Python int whose set bits are the columns granted.  The columns that
+    a granted permission implies are computed once per distinct grant and kept
+    as a bitmask, so a subject's row is the bitwise OR of the masks of its
+    grants.  Grants shared by many subjects, as is typical of grants assigned
+    through roles, are therefore evaluated only once for the whole matrix.
+
+    Single-valued columns are filed in a domain -> action -> target trie so
+    that the mask of a grant is gathered with dictionary lookups rather than
+    by asking the grant about every column;  columns with multi-valued parts
+    defer to ``WildcardPermission.implies``.
+    """
+    WILDCARD_TOKEN = WildcardPermission.WILDCARD_TOKEN
+
+    def __init__(self, permission_s):
+        """
+        :param permission_s: the required permissions, the columns
+        :type permission_s: List of permission string(s) or CompiledPermissions
+        """
+        permission_s = CompiledPermissions.compile(permission_s)
+
+        self.permissions = tuple(permission_s)
+        self.domains = permission_s.domains
+        self.rows = []
+
+        self._tree = {}
+        self._others = []
+        self._grant_masks = {}
+
+        for column, (_, permission) in enumerate(permission_s.items()):
+            bit = 1 << column
+            domain, action, target = permission._levels
+            if len(domain) == 1 and len(action) == 1 and len(target) == 1:
+                (domain,), (action,), (target,) = domain, action, target
+                targets = self._tree.setdefault(domain, {}).setdefault(action, {})
+                targets[target] = targets.get(target, 0) | bit
+            else:
+                self._others.append((bit, permission))
+
+    def _select(self, mapping, level):
+        if self.WILDCARD_TOKEN in level:
+            return mapping.values()
+        return [mapping[key] for key in level if key in mapping]
+
+    def _implied_mask(self, grant):
+        """
+        :type grant:  WildcardPermission
+        :returns: the bitmask of the columns that the grant implies
+        """
+        domain, action, target = grant._levels
+        mask = 0
+        for actions in self._select(self._tree, domain):
+            for targets in self._select(actions, action):
+                for bits in self._select(targets, target):
+                    mask |= bits
+
+        for bit, permission in self._others:
+            if grant.implies(permission):
+                mask |= bit
+
+        return mask
+
+    def encode(self, grants):
+        """
+        :param grants: the permissions granted to a subject
+        :type grants:  an iterable of WildcardPermission instances
+
+        :returns: the bitmask of the columns that the grants imply
+        """
+        mask = 0
+        grant_masks = self._grant_masks
+        for grant in grants:
+            try:
+                mask |= grant_masks[grant]
+            except KeyError:
+                grant_mask = grant_masks[grant] = self._implied_mask(grant)
+                mask |= grant_mask
+        return mask
+
+    def encode_results(self, results):
+        """
+        :param results: the results of an is_permitted check of the columns
+        :type results:  an iterable of tuple(permission, Boolean)
+
+        :returns: the bitmask of the columns granted
+        """
+        granted = {permission for permission, is_permitted in results
+                   if is_permitted}
+        return sum(1 << column for column, permission in
+                   enumerate(self.permissions) if permission in granted)
+
+    def results(self, row):
+        """
+        :param row: the position of a subject's row
+        :returns: a list of tuple(permission, Boolean), in column order
+        """
+        mask = self.rows[row]
+        return [(permission, bool(mask >> column & 1))
+                for column, permission in enumerate(self.permissions)]
+
+    def granted(self, row):
+        """
+        :param row: the position of a subject's row
+        :returns: a list of the permissions granted, in column order
+        """
+        mask = self.rows[row]
+        return [permission for column, permission in enumerate(self.permissions)
+                if mask >> column & 1]
+
+    def __repr__(self):
+        return "PermissionMatrix(rows={0}, columns={1})".\
+            format(len(self.rows), len(self.permissions))
 
-        self.case_sensitive = state.get('case_sensitive', False)
+
+# new to yosai:
+class RoleHierarchy:
+    """
+    A ``RoleHierarchy`` records that membership in a senior role implies
+    membership in junior roles, such as "admin implies editor implies
+    viewer", so that accounts need only be assigned their most senior roles.
+
+    The transitive closure of every role -- the role together with all of the
+    roles that it implies, directly or indirectly -- is computed once and
+    kept.  It is updated incrementally as implications are added or removed:
+    only the roles senior to the changed implication are recomputed.  The
+    expansion of an account's assigned roles is memoized by content, so
+    accounts that share roles share one expanded set, against which a role
+    check is a set lookup.  Cycles are tolerated:  the roles of a cycle imply
+    one another.
+    """
+    def __init__(self, implications=None, maxsize=1000):
+        """
+        :param implications: a mapping of a senior role to the junior role(s)
+                             it directly implies
+        :type implications: dict
+        :param maxsize: the maximum number of expanded role sets remembered
+        """
+        self.maxsize = maxsize
+        self._listeners = []  # a weakref.WeakMethod or a callable, see add_listener
+
+        self._juniors = collections.defaultdict(set)
+        self._closure = {}
+        self._expanded = collections.OrderedDict()
+        self._lock = threading.RLock()
+
+        if implications:
+            self.update(implications)
+
+    @property
+    def implications(self):
+        """
+        :returns: a dict of senior role -> frozenset of the juniors it directly implies
+        """
+        with self._lock:
+            return {senior: frozenset(juniors)
+                    for senior, juniors in self._juniors.items() if juniors}
+
+    def implied_roles(self, role):
+        """
+        :returns: a frozenset of the role and every role that it implies
+        """
+        return self._closure.get(role) or frozenset([role])
+
+    def _seniors_of(self, role):
+        # the roles whose closure includes role, including role itself
+        return [senior for senior, closure in self._closure.items()
+                if role in closure]
+
+    def _compute_closure(self, role):
+        closure = {role}
+        pending = [role]
+        while pending:
+            for junior in self._juniors.get(pending.pop(), ()):
+                if junior not in closure:
+                    closure.add(junior)
+                    pending.append(junior)
+        return frozenset(closure)
+
+    def add(self, senior, junior_s):
+        """
+        Records that a senior role implies one or more junior roles.
+
+        :type junior_s: a String or a collection of String(s)
+        """
+        if isinstance(junior_s, str):
+            junior_s = [junior_s]
+
+        with self._lock:
+            for junior in junior_s:
+                if junior == senior or junior in self._juniors[senior]:
+                    continue
+                self._juniors[senior].add(junior)
+
+                implied = self.implied_roles(junior)
+                self._closure.setdefault(senior, frozenset([senior]))
+                for role in self._seniors_of(senior):
+                    self._closure[role] = self._closure[role] | implied
+            self._changed()
+
+    def remove(self, senior, junior_s):
+        """
+        Removes the direct implication of one or more junior roles by a
+        senior role.
+
+        :type junior_s: a String or a collection of String(s)
+        """
+        if isinstance(junior_s, str):
+            junior_s = [junior_s]
+
+        with self._lock:
+            juniors = self._juniors.get(senior)
+            if not juniors or juniors.isdisjoint(junior_s):
+                return
+            juniors.difference_update(junior_s)
+
+            # a removed implication may have been the only path from a senior
+            # role to some of its juniors, so the seniors are recomputed:
+            for role in self._seniors_of(senior):
+                self._closure[role] = self._compute_closure(role)
+            self._changed()
+
+    def update(self, implications):
+        """
+        :param implications: a mapping of a senior role to the junior role(s)
+                             it directly implies
+        """
+        with self._lock:
+            for senior, junior_s in implications.items():
+                self.add(senior, junior_s)
+
+    def clear(self):
+        with self._lock:
+            self._juniors.clear()
+            self._closure.clear()
+            self._changed()
+
+    @property
+    def listeners(self):
+        """
+        :returns: the registered listeners that are still alive
+        """
+        live = []
+        for entry in self._listeners:
+            listener = entry() if isinstance(entry, weakref.WeakMethod) else entry
+            if listener is not None:
+                live.append(listener)
+        return live
+
+    def add_listener(self, listener):
+        """
+        Registers a callable to be called, without arguments, upon any change.
+        A listener is registered once however often it is added.  A bound
+        method is referenced weakly, so that the hierarchy doesn't keep a
+        discarded realm alive.
+        """
+        with self._lock:
+            if listener in self.listeners:
+                return
+            try:
+                entry = weakref.WeakMethod(listener)
+            except TypeError:
+                entry = listener
+            self._listeners = [entry for entry in self._listeners
+                               if not (isinstance(entry, weakref.WeakMethod) and
+                                       entry() is None)]
+            self._listeners.append(entry)
+
+    def _changed(self):
+        self._expanded.clear()
+        for listener in self.listeners:
+            listener()
+
+    def expand(self, role_s):
+        """
+        :param role_s: the roles assigned to an account
+        :type role_s: a collection of String(s)
+
+        :returns: a frozenset of the assigned roles and all that they imply
+        """
+        key = frozenset(role_s)
+        with self._lock:
+            try:
+                self._expanded.move_to_end(key)
+                return self._expanded[key]
+            except KeyError:
+                pass
+
+            expanded = key.union(*[self._closure[role] for role in key
+                                   if role in self._closure])
+            self._expanded[key] = expanded
+            while len(self._expanded) > self.maxsize:
+                self._expanded.popitem(last=False)
+            return expanded
+
+    def __repr__(self):
+        return "RoleHierarchy(roles={0}, expanded={1})".\
+            format(len(self._closure), len(self._expanded))
+
+
+# new to yosai:
+class DecisionCache:
+    """
+    A ``DecisionCache`` is a bounded, process-local cache of final
+    authorization decisions, keyed by (realm name, identifier, permission or
+    role).  It is consulted by realms ahead of the cache handler, so a hot
+    check is answered without a cache round trip or any ``implies``
+    evaluation.
+
+    Decisions expire ``ttl`` seconds after they are made.  When the cache is
+    full, the least recently used (``'lru'``) or the oldest (``'fifo'``)
+    decision is evicted.  All decisions for an identifier are invalidated
+    when a realm clears its cached authorization info, which the
+    ModularRealmAuthorizer does upon the SESSION.STOP, SESSION.EXPIRE and
+    AUTHENTICATION.SUCCEEDED events.  Since invalidation is process-local,
+    ``ttl`` bounds how long a decision may be stale in other processes.
+    """
+    EVICTION_POLICIES = ('lru', 'fifo')
+
+    def __init__(self, maxsize=10000, ttl=60, eviction_policy='lru',
+                 timer=time.monotonic):
+        """
+        :type maxsize: int
+        :param ttl: the seconds that a decision remains valid
+        :type eviction_policy: str
+        :param timer: a callable that returns the current time, in seconds
+        """
+        if eviction_policy not in self.EVICTION_POLICIES:
+            msg = ('Unsupported decision cache eviction policy: {0}.  Supported '
+                   'policies are: {1}'.format(eviction_policy, self.EVICTION_POLICIES))
+            raise ValueError(msg)
+
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.eviction_policy = eviction_policy
+        self.timer = timer
+        self.hits = 0
+        self.misses = 0
+        self._decisions = collections.OrderedDict()  # key -> (expiry, decision)
+        self._keys = collections.defaultdict(set)  # (realm, identifier) -> keys
+        self._lock = threading.Lock()
+
+    def get_many(self, realm_name, identifier, kind, items):
+        """
+        :param kind: the kind of item decided, 'permission' or 'role'
+        :param items: the permissions or roles to look up
+
+        :returns: a dict of item -> decision, for the items that are cached
+        """
+        now = self.timer()
+        found = {}
+        with self._lock:
+            for item in items:
+                key = (realm_name, identifier, kind, item)
+                try:
+                    expiry, decision = self._decisions[key]
+                except KeyError:
+                    self.misses += 1
+                    continue
+
+                if expiry <= now:
+                    self._discard(key)
+                    self.misses += 1
+                    continue
+
+                if self.eviction_policy == 'lru':
+                    self._decisions.move_to_end(key)
+                found[item] = decision
+                self.hits += 1
+        return found
+
+    def set_many(self, realm_name, identifier, kind, decisions):
+        """
+        :param decisions: a dict of item -> decision
+        """
+        expiry = self.timer() + self.ttl
+        with self._lock:
+            keys = self._keys[(realm_name, identifier)]
+            for item, decision in decisions.items():
+                key = (realm_name, identifier, kind, item)
+                self._decisions[key] = (expiry, decision)
+                self._decisions.move_to_end(key)
+                keys.add(key)
+
+            while len(self._decisions) > self.maxsize:
+                key, _ = self._decisions.popitem(last=False)
+                self._discard(key)
+
+    def _discard(self, key):
+        self._decisions.pop(key, None)
+        keys = self._keys.get(key[:2])
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._keys[key[:2]]
+
+    def invalidate(self, realm_name, identifier):
+        """
+        Invalidates every decision cached for an identifier by a realm.
+        """
+        with self._lock:
+            for key in self._keys.pop((realm_name, identifier), ()):
+                self._decisions.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._decisions.clear()
+            self._keys.clear()
+            self.hits = self.misses = 0
+
+    def __len__(self):
+        return len(self._decisions)
+
+    def __repr__(self):
+        return ("DecisionCache(maxsize={0}, ttl={1}, eviction_policy={2}, "
+                "decisions={3}, hits={4}, misses={5})".
+                format(self.maxsize, self.ttl, self.eviction_policy,
+                       len(self._decisions), self.hits, self.misses))
 
 
 class ModularRealmAuthorizer(authz_abcs.Authorizer):
@@ -355,9 +1309,45 @@ class ModularRealmAuthorizer(authz_abcs.Authorizer):
 
     :type realms:  Tuple
     """
-    def __init__(self):
+    def __init__(self, settings=None):
+        """
+        :param settings: Yosai's settings, from which the decision cache,
+                         negative caching and parallel realm consultation are
+                         configured;  without settings, none is used
+        """
         self.realms = None
+        self.realm_map = {}
         self.event_bus = None
+        self.decision_cache = None
+        self.negative_cache_ttl = None
+        self.negative_cache_shared = False
+        self.realm_executor = None
+        self.realm_timeout = None
+        self.role_hierarchy = None
+
+        if settings is not None:
+            authz_settings = AuthorizationSettings(settings)
+            if authz_settings.decision_cache_enabled:
+                self.decision_cache = DecisionCache(**authz_settings.decision_cache)
+            self.negative_cache_ttl = authz_settings.negative_cache_ttl
+            self.negative_cache_shared = authz_settings.negative_cache_shared
+            if authz_settings.role_hierarchy:
+                self.role_hierarchy = RoleHierarchy(authz_settings.role_hierarchy)
+            if authz_settings.parallel_realms_enabled:
+                parallel_realms = authz_settings.parallel_realms
+                self.realm_executor = concurrent.futures.ThreadPoolExecutor(
+                    max_workers=parallel_realms['max_workers'])
+                self.realm_timeout = parallel_realms['timeout']
+
+    # new to yosai:
+    def shutdown(self, wait=True):
+        """
+        Releases the threads of the parallel realm executor, when one is
+        configured.  Realms are consulted serially thereafter.
+        """
+        executor, self.realm_executor = self.realm_executor, None
+        if executor is not None:
+            executor.shutdown(wait=wait)
 
     def init_realms(self, realms):
         """
@@ -366,8 +1356,33 @@ class ModularRealmAuthorizer(authz_abcs.Authorizer):
         # this eliminates the need for an authorizing_realms attribute:
         self.realms = tuple(realm for realm in realms
                             if isinstance(realm, realm_abcs.AuthorizingRealm))
+        self.realm_map = {realm.name: realm for realm in self.realms
+                          if getattr(realm, 'name', None)}
+        self.apply_decision_cache()
+        self.apply_negative_cache()
+        self.apply_role_hierarchy()
         self.register_cache_clear_listener()
 
+    # new to yosai:
+    def apply_decision_cache(self):
+        for realm in self.realms:
+            if hasattr(realm, 'decision_cache'):  # implies decision caching support
+                realm.decision_cache = self.decision_cache
+
+    # new to yosai:
+    def apply_negative_cache(self):
+        for realm in self.realms:
+            if hasattr(realm, 'negative_cache_ttl'):  # implies negative caching support
+                realm.negative_cache_ttl = self.negative_cache_ttl
+                realm.negative_cache_shared = self.negative_cache_shared
+
+    # new to yosai:
+    def apply_role_hierarchy(self):
+        for realm in self.realms:
+            if hasattr(realm, 'role_hierarchy'):  # implies role hierarchy support
+                realm.role_hierarchy = self.role_hierarchy
+                realm.load_role_hierarchy()
+
     def assert_realms_configured(self):
         if (not self.realms):
             msg = ("Configuration error:  No realms have been configured! "
@@ -375,19 +1390,126 @@ class ModularRealmAuthorizer(authz_abcs.Authorizer):
                    "authorization operation.")
             raise ValueError(msg)
 
+    # new to yosai:
+    def realms_for(self, identifiers):
+        """
+        Routes a check to the realms that the identifiers originate from, as
+        recorded by identifiers.source_names, so that realms that can never
+        answer for the subject are not consulted.  When none of the sources
+        is a configured realm, every realm is consulted.
+
+        :type identifiers:  subject_abcs.IdentifierCollection
+        :returns: a tuple of realms
+        """
+        try:
+            source_names = identifiers.source_names
+        except AttributeError:
+            return self.realms
+
+        routed = tuple(self.realm_map[name] for name in source_names
+                       if name in self.realm_map)
+        return routed or self.realms
+
     # Yosai refactors isPermitted and hasRole extensively, making use of
     # generators and sub-generators so as to optimize processing w/ each realm
     # and improve code readability
 
+    # new to yosai:
+    def _consult_realms(self, realms, consult):
+        """
+        Yields the (item, Boolean) results of consulting each realm, one realm
+        after another or, when a realm executor is configured, concurrently,
+        in which case each realm's results are yielded as soon as the realm
+        completes.  Realms that have not completed within realm_timeout
+        seconds are abandoned and so grant nothing.
+
+        :param consult: a callable that, given a realm, returns the realm's
+                        generator of (item, Boolean) tuples
+        """
+        if self.realm_executor is None or len(realms) < 2:
+            for realm in realms:
+                yield from consult(realm)
+            return
+
+        futures = {self.realm_executor.submit(lambda realm: list(consult(realm)),
+                                              realm): realm for realm in realms}
+        try:
+            for future in concurrent.futures.as_completed(
+                    futures, timeout=self.realm_timeout):
+                yield from future.result()
+        except concurrent.futures.TimeoutError:
+            abandoned = [getattr(realm, 'name', realm) for future, realm in
+                         futures.items() if not future.done()]
+            msg = ("Realms did not respond within {0} seconds and were not "
+                   "consulted: {1}".format(self.realm_timeout, abandoned))
+            logger.warning(msg)
+        finally:
+            # realms are no longer needed once the outcome is decided:
+            for future in futures:
+                future.cancel()
+
     # new to Yosai:
     def _has_role(self, identifiers, role_s):
         """
         :type identifiers:  subject_abcs.IdentifierCollection
         :type role_s: Set of String(s)
         """
-        for realm in self.realms:
-            # the realm's has_role returns a generator
-            yield from realm.has_role(identifiers, role_s)
+        # each realm's has_role returns a generator
+        yield from self._consult_realms(
+            self.realms_for(identifiers),
+            lambda realm: realm.has_role(identifiers, role_s))
+
+    # new to Yosai:
+    def _decide_collective(self, identifiers, pending, logical_operator, check):
+        """
+        Evaluates the collective outcome of a check lazily, consuming the
+        realms' result generators one item at a time and stopping as soon as
+        the outcome is decided:  with ``any``, at the first grant, and with
+        ``all``, at the first item that no realm grants.  Items granted by a
+        realm are not requested from the realms that follow it.  When realms
+        are consulted concurrently, every realm is asked about every item and
+        evaluation stops at the first grant (``any``) or once every item is
+        granted (``all``), without waiting for the remaining realms.
+
+        :param pending: the items (permissions or roles) to check, as keys
+        :type pending: dict
+
+        :param check: a callable that, given a realm and the pending items,
+                      returns the realm's generator of (item, Boolean) tuples
+
+        :returns: a Boolean
+        """
+        realms = self.realms_for(identifiers)
+        last_realm = realms[-1]
+
+        if self.realm_executor is not None and len(realms) > 1:
+            # realms are consulted concurrently, about every item:
+            requested = dict(pending)
+            for item, is_granted in self._consult_realms(
+                    realms, lambda realm: check(realm, requested)):
+                if is_granted:
+                    if logical_operator is any:
+                        return True
+                    pending.pop(item, None)
+                    if not pending:
+                        return True
+
+            return not pending if logical_operator is all else False
+
+        for realm in realms:
+            if not pending:
+                break
+
+            for item, is_granted in check(realm, pending):
+                if is_granted:
+                    if logical_operator is any:
+                        return True
+                    pending.pop(item, None)
+                elif (logical_operator is all and realm is last_realm and
+                      item in pending):
+                    return False
+
+        return not pending if logical_operator is all else False
 
     # new to Yosai:
     def _is_permitted(self, identifiers, permission_s):
@@ -398,9 +1520,10 @@ class ModularRealmAuthorizer(authz_abcs.Authorizer):
         :type permission_s: List of permission string(s)
         """
 
-        for realm in self.realms:
-            # the realm's is_permitted returns a generator
-            yield from realm.is_permitted(identifiers, permission_s)
+        # each realm's is_permitted returns a generator
+        yield from self._consult_realms(
+            self.realms_for(identifiers),
+            lambda realm: realm.is_permitted(identifiers, permission_s))
 
     def is_permitted(self, identifiers, permission_s, log_results=True):
         """
@@ -414,7 +1537,7 @@ class ModularRealmAuthorizer(authz_abcs.Authorizer):
         :type identifiers:  subject_abcs.IdentifierCollection
 
         :param permission_s: a collection of 1..N permissions
-        :type permission_s: List of permission string(s)
+        :type permission_s: List of permission string(s) or CompiledPermissions
 
         :param log_results:  states whether to log results (True) or allow the
                              calling method to do so instead (False)
@@ -425,6 +1548,9 @@ class ModularRealmAuthorizer(authz_abcs.Authorizer):
         """
         self.assert_realms_configured()
 
+        # parsed once, here, rather than by each realm consulted:
+        permission_s = CompiledPermissions.compile(permission_s)
+
         results = collections.defaultdict(bool)  # defaults to False
 
         is_permitted_results = self._is_permitted(identifiers, permission_s)
@@ -443,6 +1569,135 @@ class ModularRealmAuthorizer(authz_abcs.Authorizer):
         results = set(results.items())
         return results
 
+    # new to yosai:
+    def is_permitted_matrix(self, identifiers_s, permission_s):
+        """
+        Evaluates many subjects against the same permissions in one batch,
+        for reporting and exports.  Each realm that supports it encodes a
+        subject's grants directly into the matrix;  other realms are asked
+        through is_permitted.  Results are not published as authorization
+        events.
+
+        :param identifiers_s: the identifiers of each subject, one per row
+        :type identifiers_s:  an iterable of subject_abcs.IdentifierCollection
+
+        :param permission_s: a collection of 1..N permissions, one per column
+        :type permission_s: List of permission string(s) or CompiledPermissions
+
+        :returns: a PermissionMatrix, with a row for each identifiers in the
+                  order given
+        """
+        self.assert_realms_configured()
+
+        matrix = PermissionMatrix(permission_s)
+        compiled = CompiledPermissions.compile(permission_s)
+
+        for identifiers in identifiers_s:
+            mask = 0
+            for realm in self.realms_for(identifiers):
+                if hasattr(realm, 'permitted_mask'):
+                    mask |= realm.permitted_mask(identifiers, matrix)
+                else:
+                    mask |= matrix.encode_results(
+                        realm.is_permitted(identifiers, compiled))
+            matrix.rows.append(mask)
+
+        return matrix
+
+    # new to yosai:
+    def filter_permitted(self, identifiers, domain, action, targets,
+                         log_results=True):
+        """
+        Bulk form of is_permitted for instance-level permissions:  answers
+        which of many targets the subject may perform an action on, such as
+        which of these blogposts a user may edit, as if
+        'domain:action:target' were checked for each target.  Each realm
+        consulted obtains the subject's permissions once and filters the
+        targets with set operations.  Realms that do not support filtering
+        are asked to check the remaining targets through is_permitted.
+
+        :param identifiers: a collection of identifiers
+        :type identifiers:  subject_abcs.IdentifierCollection
+
+        :param domain: a single permission domain, such as 'blogpost'
+        :type domain:  str
+
+        :param action: a single permission action, such as 'edit'
+        :type action:  str
+
+        :param targets: the target identifiers to filter
+        :type targets:  an iterable of hashable target identifiers (str or int)
+
+        :param log_results:  states whether to log results (True) or allow the
+                             calling method to do so instead (False)
+        :type log_results:  bool
+
+        :returns: a list of the permitted targets, in the order given
+        """
+        self.assert_realms_configured()
+
+        targets = list(targets)
+        permitted = set()
+
+        for realm in self.realms_for(identifiers):
+            pending = [target for target in targets if target not in permitted]
+            if not pending:
+                break
+
+            if hasattr(realm, 'filter_permitted'):
+                permitted.update(realm.filter_permitted(
+                    identifiers, domain, action, pending))
+            else:
+                perms = {"{0}:{1}:{2}".format(domain, action, target): target
+                         for target in pending}
+                permitted.update(perms[perm] for perm, is_permitted in
+                                 realm.is_permitted(identifiers, list(perms))
+                                 if is_permitted)
+
+        results = [target for target in targets if target in permitted]
+
+        if log_results:
+            self.notify_event(
+                identifiers,
+                [("{0}:{1}:{2}".format(domain, action, target), target in permitted)
+                 for target in targets],
+                'AUTHORIZATION.RESULTS')
+
+        return results
+
+    # new to yosai:
+    def permitted_targets(self, identifiers, domain, action):
+        """
+        Lists every target that the subject may perform an action on, such
+        as the ids of the blogposts that a user may edit, so that a query can
+        be pre-filtered rather than its results checked one by one.  Only
+        realms that support the query are consulted;  a realm that cannot
+        enumerate its grants contributes no targets.
+
+        :param identifiers: a collection of identifiers
+        :type identifiers:  subject_abcs.IdentifierCollection
+
+        :param domain: a single permission domain, such as 'blogpost'
+        :type domain:  str
+
+        :param action: a single permission action, such as 'edit'
+        :type action:  str
+
+        :returns: ALL_TARGETS when any realm grants a wildcard target,
+                  otherwise a frozenset of the target identifiers granted
+        """
+        self.assert_realms_configured()
+
+        targets = set()
+        for realm in self.realms_for(identifiers):
+            if hasattr(realm, 'permitted_targets'):
+                realm_targets = realm.permitted_targets(identifiers, domain, action)
+                if realm_targets is ALL_TARGETS:
+                    return ALL_TARGETS
+                targets.update(realm_targets)
+
+        return frozenset(targets)
+
     # yosai.core.refactored is_permitted_all to support ANY or ALL operations
     def is_permitted_collective(self, identifiers,
                                 permission_s, logical_operator):
@@ -461,21 +1716,28 @@ class ModularRealmAuthorizer(authz_abcs.Authorizer):
         """
         self.assert_realms_configured()
 
-        # interim_results is a set of tuples:
-        interim_results = self.is_permitted(identifiers, permission_s,
-                                            log_results=False)
+        if logical_operator in (any, all):
+            permission_s = CompiledPermissions.compile(permission_s)
+            results = self._decide_collective(
+                identifiers, dict(permission_s.items()), logical_operator,
+                lambda realm, pending: realm.is_permitted(
+                    identifiers, CompiledPermissions.from_items(pending.items())))
+        else:
+            # interim_results is a set of tuples:
+            interim_results = self.is_permitted(identifiers, permission_s,
+                                                log_results=False)
 
-        results = logical_operator(is_permitted for perm, is_permitted
-                                   in interim_results)
+            results = logical_operator(is_permitted for perm, is_permitted
+                                       in interim_results)
 
         if results:
             self.notify_event(identifiers,
-                              permission_s,
+                              list(permission_s),
                               'AUTHORIZATION.GRANTED',
                               logical_operator)
         else:
             self.notify_event(identifiers,
-                              permission_s,
+                              list(permission_s),
                               'AUTHORIZATION.DENIED',
                               logical_operator)
 
@@ -558,11 +1820,16 @@ class ModularRealmAuthorizer(authz_abcs.Authorizer):
         """
         self.assert_realms_configured()
 
-        # interim_results is a set of tuples:
-        interim_results = self.has_role(identifiers, role_s, log_results=False)
+        if logical_operator in (any, all):
+            results = self._decide_collective(
+                identifiers, dict.fromkeys(role_s), logical_operator,
+                lambda realm, pending: realm.has_role(identifiers, list(pending)))
+        else:
+            # interim_results is a set of tuples:
+            interim_results = self.has_role(identifiers, role_s, log_results=False)
 
-        results = logical_operator(has_role for role, has_role
-                                   in interim_results)
+            results = logical_operator(has_role for role, has_role
+                                       in interim_results)
 
         if results:
             self.notify_event(identifiers,
@@ -598,6 +1865,195 @@ class ModularRealmAuthorizer(authz_abcs.Authorizer):
             msg = "Subject does not have role(s) assigned."
             raise UnauthorizedException(msg)
 
+    # --------------------------------------------------------------------------
+    # Asynchronous Authorization
+    # --------------------------------------------------------------------------
+
+    # new to yosai:
+    def _consult_realm_async(self, realm, method_name, identifiers, item_s):
+        """
+        :returns: an awaitable of the realm's list of (item, Boolean) tuples,
+                  from realm.<method_name>_async when the realm implements it
+                  or otherwise from the synchronous method, run in an executor
+        """
+        consult = getattr(realm, method_name + '_async', None)
+        if consult is not None:
+            return consult(identifiers, item_s)
+
+        consult = getattr(realm, method_name)
+        return asyncio.get_event_loop().run_in_executor(
+            self.realm_executor, lambda: list(consult(identifiers, item_s)))
+
+    # new to yosai:
+    async def _consult_realms_async(self, identifiers, method_name, item_s,
+                                    decided=None):
+        """
+        Consults the realms concurrently, on the event loop, merging their
+        results as each realm completes.  Realms that have not completed
+        within realm_timeout seconds, when one is configured, grant nothing.
+
+        :param decided: an optional callable that, given the merged results,
+                        returns True once the outcome is decided, at which
+                        point realms that have yet to complete are cancelled
+
+        :returns: a dict of item -> Boolean
+        """
+        results = collections.defaultdict(bool)  # defaults to False
+
+        tasks = [asyncio.ensure_future(self._consult_realm_async(
+                     realm, method_name, identifiers, item_s))
+                 for realm in self.realms_for(identifiers)]
+        try:
+            for completed in asyncio.as_completed(tasks, timeout=self.realm_timeout):
+                for item, is_granted in await completed:
+                    results[item] = results[item] or is_granted
+                if decided is not None and decided(results):
+                    break
+        except asyncio.TimeoutError:
+            msg = ("Realms did not respond within {0} seconds and were not "
+                   "consulted".format(self.realm_timeout))
+            logger.warning(msg)
+        finally:
+            for task in tasks:
+                task.cancel()
+
+        return results
+
+    # new to yosai:
+    async def _decide_collective_async(self, identifiers, method_name, item_s,
+                                       logical_operator):
+        """
+        :returns: a Boolean, decided as soon as the realms that have completed
+                  determine the outcome of any or all
+        """
+        item_s = list(item_s)
+
+        def any_granted(results):
+            return any(results.values())
+
+        def all_granted(results):
+            return all(results[item] for item in item_s)
+
+        decided = None
+        if logical_operator is any:
+            decided = any_granted
+        elif logical_operator is all:
+            decided = all_granted
+
+        results = await self._consult_realms_async(identifiers, method_name,
+                                                   item_s, decided)
+        return logical_operator(results.get(item, False) for item in item_s)
+
+    # new to yosai:
+    async def is_permitted_async(self, identifiers, permission_s, log_results=True):
+        """
+        The asynchronous counterpart of is_permitted:  realms are consulted
+        concurrently, on the event loop.
+
+        :returns: a set of tuple(s), containing the Permission and a Boolean
+                  indicating whether the permission is granted
+        """
+        self.assert_realms_configured()
+
+        permission_s = CompiledPermissions.compile(permission_s)
+        consulted = await self._consult_realms_async(identifiers, 'is_permitted',
+                                                     permission_s)
+        results = {permission: consulted[permission] for permission in permission_s}
+
+        if log_results:
+            self.notify_event(identifiers,
+                              list(results.items()),
+                              'AUTHORIZATION.RESULTS')
+
+        return set(results.items())
+
+    # new to yosai:
+    async def is_permitted_collective_async(self, identifiers, permission_s,
+                                            logical_operator):
+        """
+        The asynchronous counterpart of is_permitted_collective.
+
+        :returns: a Boolean
+        """
+        self.assert_realms_configured()
+
+        permission_s = CompiledPermissions.compile(permission_s)
+        results = await self._decide_collective_async(
+            identifiers, 'is_permitted', permission_s, logical_operator)
+
+        self.notify_event(identifiers,
+                          list(permission_s),
+                          'AUTHORIZATION.GRANTED' if results else 'AUTHORIZATION.DENIED',
+                          logical_operator)
+        return results
+
+    # new to yosai:
+    async def check_permission_async(self, identifiers, permission_s,
+                                     logical_operator):
+        """
+        The asynchronous counterpart of check_permission.
+
+        :raises UnauthorizedException: if any permission is unauthorized
+        """
+        permitted = await self.is_permitted_collective_async(
+            identifiers, permission_s, logical_operator)
+        if not permitted:
+            msg = "Subject lacks permission(s) to satisfy logical operation"
+            raise UnauthorizedException(msg)
+
+    # new to yosai:
+    async def has_role_async(self, identifiers, role_s, log_results=True):
+        """
+        The asynchronous counterpart of has_role:  realms are consulted
+        concurrently, on the event loop.
+
+        :returns: a set of tuple(s), containing the role and a Boolean
+                  indicating whether the user is a member of the Role
+        """
+        self.assert_realms_configured()
+
+        role_s = list(role_s)
+        consulted = await self._consult_realms_async(identifiers, 'has_role', role_s)
+        results = {role: consulted[role] for role in role_s}
+
+        if log_results:
+            self.notify_event(identifiers,
+                              list(results.items()),
+                              'AUTHORIZATION.RESULTS')
+
+        return set(results.items())
+
+    # new to yosai:
+    async def has_role_collective_async(self, identifiers, role_s, logical_operator):
+        """
+        The asynchronous counterpart of has_role_collective.
+
+        :returns: a Boolean
+        """
+        self.assert_realms_configured()
+
+        results = await self._decide_collective_async(
+            identifiers, 'has_role', role_s, logical_operator)
+
+        self.notify_event(identifiers,
+                          list(role_s),
+                          'AUTHORIZATION.GRANTED' if results else 'AUTHORIZATION.DENIED',
+                          logical_operator)
+        return results
+
+    # new to yosai:
+    async def check_role_async(self, identifiers, role_s, logical_operator):
+        """
+        The asynchronous counterpart of check_role.
+
+        :raises UnauthorizedException: if Subject not assigned to all roles
+        """
+        has_role_s = await self.has_role_collective_async(identifiers, role_s,
+                                                          logical_operator)
+        if not has_role_s:
+            msg = "Subject does not have role(s) assigned."
+            raise UnauthorizedException(msg)
+
     # --------------------------------------------------------------------------
     # Event Communication
     # --------------------------------------------------------------------------
@@ -0,0 +1,45 @@
+class AuthorizationSettings:
+    """
+    AuthorizationSettings is a settings proxy.  It is new for Yosai.
+    It obtains the authz configuration from Yosai's global settings.  The
+    AUTHZ_CONFIG section is optional:  when absent, defaults apply.
+    """
+    def __init__(self, settings):
+        self.authz_config = settings.AUTHZ_CONFIG or {}
+
+        # memoize authorization decisions within each Yosai.context:
+        self.request_memo = self.authz_config.get('request_memo', False)
+
+        # the process-local decision cache:
+        decision_cache = dict(self.authz_config.get('decision_cache') or {})
+        self.decision_cache_enabled = decision_cache.pop('enabled', False)
+        self.decision_cache = {'maxsize': decision_cache.get('maxsize', 10000),
+                               'ttl': decision_cache.get('ttl', 60),
+                               'eviction_policy': decision_cache.get('eviction_policy',
+                                                                     'lru')}
+
+        # seconds for which realms remember that an account has no roles or
+        # permissions;  0 disables negative caching:
+        self.negative_cache_ttl = self.authz_config.get('negative_cache_ttl', 30)
+        # whether they remember it through the cache handler, so that all
+        # processes share it, rather than in process:
+        self.negative_cache_shared = self.authz_config.get('negative_cache_shared', False)
+
+        # concurrent consultation of realms, in a bounded thread pool:
+        parallel_realms = dict(self.authz_config.get('parallel_realms') or {})
+        self.parallel_realms_enabled = parallel_realms.pop('enabled', False)
+        self.parallel_realms = {'max_workers': parallel_realms.get('max_workers', 4),
+                                'timeout': parallel_realms.get('timeout', 5)}
+
+        # senior role -> the junior role(s) that it implies:
+        self.role_hierarchy = dict(self.authz_config.get('role_hierarchy') or {})
+
+    def __repr__(self):
+        return ("AuthorizationSettings(request_memo={0}, decision_cache_enabled={1}, "
+                "decision_cache={2}, negative_cache_ttl={3}, "
+                "negative_cache_shared={4}, parallel_realms_enabled={5}, "
+                "parallel_realms={6}, role_hierarchy={7})".
+                format(self.request_memo, self.decision_cache_enabled,
+                       self.decision_cache, self.negative_cache_ttl,
+                       self.negative_cache_shared, self.parallel_realms_enabled,
+                       self.parallel_realms, self.role_hierarchy))
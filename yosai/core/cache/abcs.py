@@ -37,3 +37,22 @@ class CacheHandler(metaclass=ABCMeta):
     @abstractmethod
     def delete(self, key, identifier):
         pass
+
+
+# new to yosai:
+class AsyncCacheHandler(metaclass=ABCMeta):
+    """
+    The asynchronous counterpart of the CacheHandler operations used for
+    authorization.  A creator_func passed to these coroutines is itself a
+    coroutine function, awaited with the creator as its argument when the
+    requested entry is not cached.
+    """
+
+    @abstractmethod
+    async def get_or_create_async(self, domain, identifier, creator_func, creator):
+        pass
+
+    @abstractmethod
+    async def hmget_or_create_async(self, domain, identifier, keys, creator_func,
+                                    creator):
+        pass
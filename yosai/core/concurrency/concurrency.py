@@ -40,3 +40,68 @@ class StoppableScheduledExecutor(threading.Thread):
 
 # yosai.core.omits ThreadContext because it is replaced by the standard library
 # threading.local() object
+
+
+# new to yosai:
+class SingleFlight:
+    """
+    A ``SingleFlight`` collapses concurrent calls for the same key into one:
+    the first caller runs the function while callers that arrive before it
+    completes wait for, and share, its result or its exception.  Once the
+    call completes, the next call for the key runs the function again, so
+    results are never retained.
+
+    Realms use it so that only one thread queries an account store when a
+    popular account's cache entry expires, regardless of whether the cache
+    handler applies its own lock.
+    """
+
+    class Call:
+        __slots__ = ('event', 'result', 'exception')
+
+        def __init__(self):
+            self.event = threading.Event()
+            self.result = None
+            self.exception = None
+
+    def __init__(self):
+        self._calls = {}
+        self._lock = threading.Lock()
+
+    def do(self, key, func, *args, **kwargs):
+        """
+        :param key: identifies calls that may share a result
+        :type key: a hashable object
+        :param func: the function to call, with args and kwargs
+
+        :returns: the result of func, shared by concurrent callers of the key
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = self.Call()
+
+        if not leader:
+            call.event.wait()
+            if call.exception is not None:
+                raise call.exception
+            return call.result
+
+        try:
+            call.result = func(*args, **kwargs)
+        except Exception as exc:
+            call.exception = exc
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.event.set()
+
+        return call.result
+
+    def __len__(self):
+        """
+        :returns: the number of calls in flight
+        """
+        return len(self._calls)
@@ -64,7 +64,8 @@ class AccountException(AuthenticationException):
 class IncorrectCredentialsException(AuthenticationException):
     def __init__(self, failed_attempts=None):
         """
-        a list of unix epoch timestampts of recently failed attempts for user
+        the number of recently failed attempts for user or, without a
+        FailedAttemptTracker, a list of their unix epoch timestamps
         """
         self.failed_attempts = failed_attempts
 
@@ -81,6 +82,27 @@ class LockedAccountException(YosaiException):
     pass
 
 
+class AuthenticationThrottledException(AuthenticationException):
+    """
+    Raises when an authentication attempt is rejected, before any account
+    is obtained or credentials verified, because attempts for the token's
+    identifier or host exceed their rate limit.  The attempt may be retried
+    after retry_after seconds.
+    """
+    def __init__(self, retry_after=None):
+        self.retry_after = retry_after
+
+
+class VerificationSaturatedException(AuthenticationException):
+    """
+    Raises when credentials cannot be verified because the password
+    verification executor is saturated.  The attempt was neither accepted
+    nor rejected and may be retried after retry_after seconds.
+    """
+    def __init__(self, retry_after=None):
+        self.retry_after = retry_after
+
+
 class MultiRealmAuthenticationException(AuthenticationException):
 
     def __init__(self, realm_errors):
@@ -16,6 +16,7 @@ KIND, either express or implied.  See the License for the
 specific language governing permissions and limitations
 under the License.
 """
+import asyncio
 import logging
 import copy
 
@@ -347,7 +348,7 @@ class NativeSecurityManager(mgt_abcs.SecurityManager):
                  realms=None,
                  cache_handler=None,
                  authenticator=None,
-                 authorizer=ModularRealmAuthorizer(),
+                 authorizer=None,
                  serialization_manager=None,
                  session_manager=None,
                  remember_me_manager=None,
@@ -362,6 +363,8 @@ class NativeSecurityManager(mgt_abcs.SecurityManager):
             session_manager = NativeSessionManager(settings)
         self.session_manager = session_manager
 
+        if not authorizer:
+            authorizer = ModularRealmAuthorizer(settings)
         self.authorizer = authorizer
 
         if not authenticator:
@@ -383,6 +386,8 @@ class NativeSecurityManager(mgt_abcs.SecurityManager):
                 realm.cache_handler = cache_handler
         if hasattr(self.session_manager, 'apply_cache_handler'):
             self.session_manager.apply_cache_handler(cache_handler)
+        if hasattr(self.authenticator, 'apply_cache_handler'):
+            self.authenticator.apply_cache_handler(cache_handler)
 
     def apply_event_bus(self, eventbus):
         self.authenticator.event_bus = eventbus
@@ -397,17 +402,33 @@ class NativeSecurityManager(mgt_abcs.SecurityManager):
         self.authenticator.init_realms(self.realms)
         self.authorizer.init_realms(self.realms)
 
-    def is_permitted(self, identifiers, permission_s):
+    # new to yosai:
+    def shutdown(self, wait=True):
+        """
+        Releases the executors of the authenticator and authorizer.  Call it
+        when the security manager is discarded, such as upon application exit.
+        """
+        if hasattr(self.authenticator, 'shutdown'):
+            self.authenticator.shutdown(wait=wait)
+        if hasattr(self.authorizer, 'shutdown'):
+            self.authorizer.shutdown(wait=wait)
+
+    def is_permitted(self, identifiers, permission_s, log_results=True):
         """
         :type identifiers: SimpleIdentifierCollection
 
         :param permission_s: a collection of 1..N permissions
         :type permission_s: List of Permission object(s) or String(s)
 
+        :param log_results:  states whether to publish the results (True) or
+                             allow the caller to do so instead (False)
+        :type log_results:  bool
+
         :returns: a List of tuple(s), containing the Permission and a Boolean
                   indicating whether the permission is granted
         """
-        return self.authorizer.is_permitted(identifiers, permission_s)
+        return self.authorizer.is_permitted(identifiers, permission_s,
+                                            log_results=log_results)
 
     def is_permitted_collective(self, identifiers, permission_s, logical_operator):
         """
@@ -426,6 +447,39 @@ class NativeSecurityManager(mgt_abcs.SecurityManager):
                                                        permission_s,
                                                        logical_operator)
 
+    def is_permitted_matrix(self, identifiers_s, permission_s):
+        """
+        :type identifiers_s: an iterable of SimpleIdentifierCollection
+
+        :param permission_s: a collection of 1..N permissions
+        :type permission_s: List of Permission object(s) or String(s)
+
+        :returns: a PermissionMatrix, with a row for each identifiers
+        """
+        return self.authorizer.is_permitted_matrix(identifiers_s, permission_s)
+
+    def filter_permitted(self, identifiers, domain, action, targets):
+        """
+        :type identifiers: SimpleIdentifierCollection
+        :type domain: str
+        :type action: str
+        :type targets: an iterable of target identifiers (str or int)
+
+        :returns: a list of the permitted targets, in the order given
+        """
+        return self.authorizer.filter_permitted(identifiers, domain, action,
+                                                targets)
+
+    def permitted_targets(self, identifiers, domain, action):
+        """
+        :type identifiers: SimpleIdentifierCollection
+        :type domain: str
+        :type action: str
+
+        :returns: ALL_TARGETS or a frozenset of the target identifiers granted
+        """
+        return self.authorizer.permitted_targets(identifiers, domain, action)
+
     def check_permission(self, identifiers, permission_s, logical_operator):
         """
         :type identifiers: SimpleIdentifierCollection
@@ -443,17 +497,22 @@ class NativeSecurityManager(mgt_abcs.SecurityManager):
                                                 permission_s,
                                                 logical_operator)
 
-    def has_role(self, identifiers, role_s):
+    def has_role(self, identifiers, role_s, log_results=True):
         """
         :type identifiers: SimpleIdentifierCollection
 
         :param role_s: 1..N role identifiers (strings)
         :type role_s:  Set of Strings
 
+        :param log_results:  states whether to publish the results (True) or
+                             allow the caller to do so instead (False)
+        :type log_results:  bool
+
         :returns: a set of tuple(s), containing the role and a Boolean
                   indicating whether the user is a member of the Role
         """
-        return self.authorizer.has_role(identifiers, role_s)
+        return self.authorizer.has_role(identifiers, role_s,
+                                        log_results=log_results)
 
     def has_role_collective(self, identifiers, role_s, logical_operator):
         """
@@ -487,6 +546,44 @@ class NativeSecurityManager(mgt_abcs.SecurityManager):
         return self.authorizer.check_role(identifiers,
                                           role_s, logical_operator)
 
+    # new to yosai:
+    def notify_authz_event(self, identifiers, items, topic, logical_operator=None):
+        """
+        Publishes an authorization event for a decision made outside of the
+        authorizer, such as from a request-scoped AuthorizationMemo.
+        """
+        self.authorizer.notify_event(identifiers, items, topic, logical_operator)
+
+    # new to yosai:
+    async def is_permitted_async(self, identifiers, permission_s):
+        return await self.authorizer.is_permitted_async(identifiers, permission_s)
+
+    # new to yosai:
+    async def is_permitted_collective_async(self, identifiers, permission_s,
+                                            logical_operator):
+        return await self.authorizer.is_permitted_collective_async(
+            identifiers, permission_s, logical_operator)
+
+    # new to yosai:
+    async def check_permission_async(self, identifiers, permission_s,
+                                     logical_operator):
+        return await self.authorizer.check_permission_async(
+            identifiers, permission_s, logical_operator)
+
+    # new to yosai:
+    async def has_role_async(self, identifiers, role_s):
+        return await self.authorizer.has_role_async(identifiers, role_s)
+
+    # new to yosai:
+    async def has_role_collective_async(self, identifiers, role_s, logical_operator):
+        return await self.authorizer.has_role_collective_async(
+            identifiers, role_s, logical_operator)
+
+    # new to yosai:
+    async def check_role_async(self, identifiers, role_s, logical_operator):
+        return await self.authorizer.check_role_async(
+            identifiers, role_s, logical_operator)
+
     """
     * ===================================================================== *
     * SessionManager Methods                                                *
@@ -683,6 +780,45 @@ class NativeSecurityManager(mgt_abcs.SecurityManager):
         self.on_successful_login(authc_token, account_id, logged_in)
         return logged_in
 
+    # new to yosai:
+    async def login_async(self, subject, authc_token):
+        """
+        The asynchronous counterpart of login.  Authentication awaits the
+        authenticator, while the creation of the logged-in subject and the
+        post-login session and remember-me handling, which are blocking I/O,
+        run in an executor, as does on_failed_login.
+
+        :returns: a Subject representing the authenticated user
+        """
+        loop = asyncio.get_event_loop()
+        try:
+            account_id = await self.authenticator.authenticate_account_async(
+                subject.identifiers, authc_token)
+        except AdditionalAuthenticationRequired as exc:
+            await loop.run_in_executor(None, self.update_subject_identity,
+                                       exc.account_id, subject)
+            raise AdditionalAuthenticationRequired
+
+        except AuthenticationException as authc_ex:
+            # forgetting a remembered identity is blocking I/O, too:
+            try:
+                await loop.run_in_executor(None, self.on_failed_login,
+                                           authc_token, authc_ex, subject)
+            except Exception:
+                msg = ("on_failed_login method raised an exception.  Logging "
+                       "and propagating original AuthenticationException.")
+                logger.info(msg, exc_info=True)
+            raise
+
+        def complete_login():
+            logged_in = self.create_subject(authc_token=authc_token,
+                                            account_id=account_id,
+                                            existing_subject=subject)
+            self.on_successful_login(authc_token, account_id, logged_in)
+            return logged_in
+
+        return await loop.run_in_executor(None, complete_login)
+
     def on_successful_login(self, authc_token, account_id, subject):
         self.remember_me_successful_login(authc_token, account_id, subject)
 
@@ -16,18 +16,25 @@ KIND, either express or implied.  See the License for the
 specific language governing permissions and limitations
 under the License.
 """
+import asyncio
+import collections
 import logging
+import threading
 from uuid import uuid4
 import time
 import rapidjson
 from yosai.core import (
     AccountException,
+    CompiledPermissions,
     ConsumedTOTPToken,
-    DefaultPermission,
     IncorrectCredentialsException,
     LockedAccountException,
+    PermissionIndex,
+    RoleHierarchy,
     SimpleIdentifierCollection,
+    SingleFlight,
     TOTPToken,
+    permission_interner,
     realm_abcs,
 )
 
@@ -47,6 +54,13 @@ class AccountStoreRealm(realm_abcs.TOTPAuthenticatingRealm,
             - as of shiro v2 alpha rev1693638, shiro doesn't (yet)
     """
 
+    # the maximum number of compiled PermissionIndex instances, and of decoded
+    # permission lists, kept in memory:
+    permission_index_limit = 1000
+
+    # the maximum number of accounts remembered as having no roles or permissions:
+    negative_cache_limit = 10000
+
     def __init__(self,
                  name='AccountStoreRealm_' + str(uuid4()),
                  account_store=None,
@@ -59,8 +73,26 @@ class AccountStoreRealm(realm_abcs.TOTPAuthenticatingRealm,
         self.authc_verifiers = authc_verifiers
 
         self.cache_handler = None
+        self.decision_cache = None  # injected by the ModularRealmAuthorizer
+        self.negative_cache_ttl = None  # injected by the ModularRealmAuthorizer
+        self.negative_cache_shared = False  # injected by the ModularRealmAuthorizer
+        self.role_hierarchy = None  # injected by the ModularRealmAuthorizer
+        self.failed_attempt_tracker = None  # injected by the DefaultAuthenticator
         self.token_resolver = self.init_token_resolution()
 
+        # concurrent account store queries for the same info are collapsed:
+        self._single_flight = SingleFlight()
+
+        # compiled indexes and decoded permissions, memoized by content:
+        self._permission_indexes = collections.OrderedDict()
+        self._permission_blobs = collections.OrderedDict()
+        self._permission_index_lock = threading.Lock()
+
+        # (kind, identifier) -> expiration, for accounts found to have no
+        # roles or permissions:
+        self._negative_results = collections.OrderedDict()
+        self._negative_lock = threading.Lock()
+
     @property
     def supported_authc_tokens(self):
         """
@@ -120,7 +152,47 @@ class AccountStoreRealm(realm_abcs.TOTPAuthenticatingRealm,
         """
         msg = "Clearing cached authz_info for [{0}]".format(identifier)
         logger.debug(msg)
-        self.cache_handler.delete('authorization:' + self.name, identifier)
+
+        if self.decision_cache is not None:
+            self.decision_cache.invalidate(self.name, identifier)
+
+        with self._negative_lock:
+            self._negative_results.pop(('permissions', identifier), None)
+            self._negative_results.pop(('roles', identifier), None)
+
+        if self.negative_cache_shared:
+            self.cache_handler.delete(self.negative_cache_domain('permissions'),
+                                      identifier)
+            self.cache_handler.delete(self.negative_cache_domain('roles'), identifier)
+
+        self.cache_handler.delete('authorization:permissions:' + self.name, identifier)
+        self.cache_handler.delete('authorization:roles:' + self.name, identifier)
+
+    # new to yosai:
+    def load_role_hierarchy(self):
+        """
+        Extends the configured role hierarchy with the role implications
+        maintained by the account store, when the account store supports
+        get_role_hierarchy.  A realm whose account store contributes
+        implications keeps a hierarchy of its own.
+        """
+        get_role_hierarchy = getattr(self.account_store, 'get_role_hierarchy', None)
+        if get_role_hierarchy is not None:
+            implications = get_role_hierarchy()
+            if implications:
+                configured = self.role_hierarchy
+                self.role_hierarchy = RoleHierarchy(
+                    configured.implications if configured else None)
+                self.role_hierarchy.update(implications)
+
+        if self.role_hierarchy is not None:
+            self.role_hierarchy.add_listener(self.on_role_hierarchy_change)
+
+    # new to yosai:
+    def on_role_hierarchy_change(self):
+        # role decisions made against the former hierarchy are stale:
+        if self.decision_cache is not None:
+            self.decision_cache.clear()
 
     def lock_account(self, identifier):
         """
@@ -134,6 +206,8 @@ class AccountStoreRealm(realm_abcs.TOTPAuthenticatingRealm,
         :type account: Account
         """
         self.account_store.unlock_account(identifier)
+        if self.failed_attempt_tracker is not None:
+            self.failed_attempt_tracker.reset(identifier)
 
     # --------------------------------------------------------------------------
     # Authentication
@@ -163,7 +237,9 @@ class AccountStoreRealm(realm_abcs.TOTPAuthenticatingRealm,
             logger.debug(msg)
 
             # account_info is a dict
-            account_info = self.account_store.get_authc_info(identifier)
+            account_info = self._single_flight.do(
+                ('authentication:' + self.name, identifier),
+                self.account_store.get_authc_info, identifier)
 
             if account_info is None:
                 msg = "Could not get stored credentials for {0}".format(identifier)
@@ -201,6 +277,20 @@ class AccountStoreRealm(realm_abcs.TOTPAuthenticatingRealm,
         :rtype: dict
         :raises IncorrectCredentialsException:  when authentication fails
         """
+        identifier, verifier = self.resolve_verifier(authc_token)
+
+        account = self.get_authentication_info(identifier)
+        self.assert_account_available(identifier, account)
+
+        self.assert_credentials_match(verifier, authc_token, account)
+
+        return account
+
+    # new to yosai:
+    def resolve_verifier(self, authc_token):
+        """
+        :returns: a tuple of the token's identifier and the Verifier of its type
+        """
         try:
             identifier = authc_token.identifier
         except AttributeError:
@@ -213,8 +303,14 @@ class AccountStoreRealm(realm_abcs.TOTPAuthenticatingRealm,
         except KeyError:
             raise TypeError('realm does not support token type: ', tc.__name__)
 
-        account = self.get_authentication_info(identifier)
+        return identifier, verifier
 
+    # new to yosai:
+    def assert_account_available(self, identifier, account):
+        """
+        :raises AccountException: when no account was obtained
+        :raises LockedAccountException: when the account is locked
+        """
         try:
             if account.get('account_locked'):
                 msg = "Account Locked:  {0} locked at: {1}".\
@@ -225,10 +321,6 @@ class AccountStoreRealm(realm_abcs.TOTPAuthenticatingRealm,
                 msg = "Could not obtain account credentials for: " + str(identifier)
                 raise AccountException(msg)
 
-        self.assert_credentials_match(verifier, authc_token, account)
-
-        return account
-
     def update_failed_attempt(self, authc_token, account):
         cred_type = authc_token.token_info['cred_type']
 
@@ -248,14 +340,22 @@ class AccountStoreRealm(realm_abcs.TOTPAuthenticatingRealm,
         :type account:  account_abcs.Account
         :returns: account_abcs.Account
         :raises IncorrectCredentialsException:  when authentication fails,
-                                                including unix epoch timestamps
-                                                of recently failed attempts
+                                                including the number of
+                                                recently failed attempts or,
+                                                without a FailedAttemptTracker,
+                                                their unix epoch timestamps
         """
         cred_type = authc_token.token_info['cred_type']
 
         try:
             verifier.verify_credentials(authc_token, account['authc_info'])
         except IncorrectCredentialsException:
+            if self.failed_attempt_tracker is not None:
+                # tracked apart from the cached account, which is not re-written:
+                failed_attempts = self.failed_attempt_tracker.record(
+                    authc_token.identifier, cred_type)
+                raise IncorrectCredentialsException(failed_attempts)
+
             updated_account = self.update_failed_attempt(authc_token, account)
 
             failed_attempts = updated_account['authc_info'][cred_type].\
@@ -283,16 +383,92 @@ class AccountStoreRealm(realm_abcs.TOTPAuthenticatingRealm,
     # Authorization
     # --------------------------------------------------------------------------
 
-    def get_authzd_permissions(self, identifier, perm_domain):
+    # new to yosai:
+    def negative_cache_domain(self, kind):
+        return 'authorization:no_' + kind + ':' + self.name
+
+    # new to yosai:
+    def is_negatively_cached(self, kind, identifier):
+        """
+        :param kind: 'permissions' or 'roles'
+        :returns: True when the account store recently returned no results of
+                  the kind for the identifier
+        """
+        if not self.negative_cache_ttl:
+            return False
+
+        if self.negative_cache_shared and self.cache_handler is not None:
+            expires_at = self.cache_handler.get(domain=self.negative_cache_domain(kind),
+                                                identifier=identifier)
+            return expires_at is not None and expires_at > time.time()
+
+        key = (kind, identifier)
+        with self._negative_lock:
+            expires_at = self._negative_results.get(key)
+            if expires_at is None:
+                return False
+            if expires_at > time.monotonic():
+                return True
+            del self._negative_results[key]
+            return False
+
+    # new to yosai:
+    def cache_negative(self, kind, identifier):
+        """
+        Remembers, for negative_cache_ttl seconds, that the account store
+        returned no results of the kind for the identifier.  Empty results
+        are never added to the cache handler, so without this every check
+        for such an account, such as a guest, would query the account store.
+
+        The result is remembered in process or, when negative_cache_shared,
+        with the cache handler so that all processes share it.  The cache
+        handler expires entries by domain rather than by entry, so a shared
+        entry records its own expiration.
+
+        :param kind: 'permissions' or 'roles'
+        """
+        if not self.negative_cache_ttl:
+            return
+
+        if self.negative_cache_shared and self.cache_handler is not None:
+            self.cache_handler.set(domain=self.negative_cache_domain(kind),
+                                   identifier=identifier,
+                                   value=time.time() + self.negative_cache_ttl)
+            return
+
+        key = (kind, identifier)
+        with self._negative_lock:
+            self._negative_results.pop(key, None)
+            self._negative_results[key] = time.monotonic() + self.negative_cache_ttl
+            while len(self._negative_results) > self.negative_cache_limit:
+                self._negative_results.popitem(last=False)
+
+    def permission_keys(self, perm_domains):
+        """
+        :param perm_domains: the domains of the permissions to be checked
+        :returns: the hash keys of the cached permissions that are relevant to
+                  the domains: '*' followed by each distinct domain, in order
         """
+        return ['*'] + sorted(set(perm_domains) - {'*'})
+
+    def get_authzd_permission_blobs(self, identifier, perm_domains):
+        """
+        Obtains the serialized (json) permissions relevant to one or more
+        domains, requesting them from cache using '*' and the domains as hash
+        keys in a single round trip.
+
         :type identifier:  str
-        :type domain:  str
+        :type perm_domains:  an iterable of str
 
-        :returns: a list of relevant DefaultPermission instances (permission_s)
+        :returns: a list of json-encoded lists of permission parts, ordered as
+                  the keys returned by permission_keys, which may include None
+                  values for keys that have no permissions
         """
-        permission_s = []
         related_perms = []
-        keys = ['*', perm_domain]
+        keys = self.permission_keys(perm_domains)
+
+        if self.is_negatively_cached('permissions', identifier):
+            return [None] * len(keys)
 
         def query_permissions(self):
             msg = ("Could not obtain cached permissions for [{0}].  "
@@ -300,7 +476,9 @@ class AccountStoreRealm(realm_abcs.TOTPAuthenticatingRealm,
                    .format(identifier))
             logger.debug(msg)
 
-            permissions = self.account_store.get_authz_permissions(identifier)
+            permissions = self._single_flight.do(
+                ('authorization:permissions:' + self.name, identifier),
+                self.account_store.get_authz_permissions, identifier)
             if not permissions:
                 msg = "Could not get permissions from account_store for {0}".\
                     format(identifier)
@@ -324,26 +502,112 @@ class AccountStoreRealm(realm_abcs.TOTPAuthenticatingRealm,
             msg3 = ("No permissions found for identifiers [{0}].  "
                     "Returning None.".format(identifier))
             logger.warning(msg3)
+            self.cache_negative('permissions', identifier)
 
         except AttributeError:
             # this means the cache_handler isn't configured
             queried_permissions = query_permissions(self)
 
-            related_perms = [queried_permissions.get('*'),
-                             queried_permissions.get(perm_domain)]
+            related_perms = [queried_permissions.get(key) for key in keys]
+
+        return related_perms
+
+    def load_permissions(self, related_perms):
+        """
+        Each json-encoded list is decoded once per process:  the permissions
+        decoded from it are memoized by its content.
 
+        :param related_perms: json-encoded lists of permission parts
+        :returns: a list of DefaultPermission instances
+        """
+        permission_s = []
         for perms in related_perms:
             # must account for None values:
+            if perms is None:
+                continue
+
+            with self._permission_index_lock:
+                try:
+                    decoded = self._permission_blobs[perms]
+                    self._permission_blobs.move_to_end(perms)
+                except KeyError:
+                    decoded = None
+
+            if decoded is None:
+                try:
+                    decoded = tuple(permission_interner.permission_from_parts(parts)
+                                    for parts in rapidjson.loads(perms))
+                except (TypeError, ValueError):
+                    decoded = ()
+
+                with self._permission_index_lock:
+                    self._permission_blobs[perms] = decoded
+                    while len(self._permission_blobs) > self.permission_index_limit:
+                        self._permission_blobs.popitem(last=False)
+
+            permission_s.extend(decoded)
+
+        return permission_s
+
+    def get_authzd_permissions(self, identifier, perm_domain):
+        """
+        :type identifier:  str
+        :type domain:  str
+
+        :returns: a list of relevant DefaultPermission instances (permission_s)
+        """
+        related_perms = self.get_authzd_permission_blobs(identifier, [perm_domain])
+        return self.load_permissions(related_perms)
+
+    def get_authzd_permission_index(self, identifier, perm_domains):
+        """
+        Compiles the permissions relevant to one or more domains into a
+        PermissionIndex.  Compiled indexes are memoized by the content of the
+        serialized permissions they were compiled from, so that identical
+        permissions, such as those of accounts that share roles, are parsed
+        and compiled once per process and an index is only re-built when
+        authorization info is updated.
+
+        :type identifier:  str
+        :type perm_domains:  an iterable of str
+
+        :returns: a PermissionIndex
+        """
+        perm_domains = tuple(perm_domains)
+        related_perms = self.get_authzd_permission_blobs(identifier, perm_domains)
+        return self.compile_permission_index(related_perms)
+
+    # new to yosai:
+    def compile_permission_index(self, related_perms):
+        """
+        :param related_perms: json-encoded lists of permission parts
+        :returns: the PermissionIndex compiled from, and memoized by, the
+                  serialized permissions
+        """
+        related_perms = tuple(related_perms)
+
+        with self._permission_index_lock:
             try:
-                for parts in rapidjson.loads(perms):
-                    permission_s.append(DefaultPermission(parts=parts))
-            except (TypeError, ValueError):
+                index = self._permission_indexes[related_perms]
+                self._permission_indexes.move_to_end(related_perms)
+                return index
+            except KeyError:
                 pass
 
-        return permission_s
+        index = PermissionIndex(self.load_permissions(related_perms))
+
+        with self._permission_index_lock:
+            self._permission_indexes[related_perms] = index
+            while len(self._permission_indexes) > self.permission_index_limit:
+                self._permission_indexes.popitem(last=False)
+
+        return index
 
     def get_authzd_roles(self, identifier):
-        roles = [] 
+        roles = []
+
+        if self.is_negatively_cached('roles', identifier):
+            return set(roles)
 
         def query_roles(self):
             msg = ("Could not obtain cached roles for [{0}].  "
@@ -351,7 +615,9 @@ class AccountStoreRealm(realm_abcs.TOTPAuthenticatingRealm,
                    .format(identifier))
             logger.debug(msg)
 
-            roles = self.account_store.get_authz_roles(identifier)
+            roles = self._single_flight.do(
+                ('authorization:roles:' + self.name, identifier),
+                self.account_store.get_authz_roles, identifier)
             if not roles:
                 msg = "Could not get roles from account_store for {0}".\
                     format(identifier)
@@ -374,41 +640,115 @@ class AccountStoreRealm(realm_abcs.TOTPAuthenticatingRealm,
             msg3 = ("No roles found for identifiers [{0}].  "
                     "Returning None.".format(identifier))
             logger.warning(msg3)
+            self.cache_negative('roles', identifier)
 
         return set(roles)
 
     def is_permitted(self, identifiers, permission_s):
         """
         If the authorization info cannot be obtained from the accountstore,
-        permission check tuple yields False.
+        permission check tuple yields False.  Decisions found in the decision
+        cache, when one is applied, are yielded without evaluation.
 
         :type identifiers:  subject_abcs.IdentifierCollection
 
         :param permission_s: a collection of one or more permissions, represented
                              as string-based permissions or Permission objects
                              and NEVER comingled types
-        :type permission_s: list of string(s)
+        :type permission_s: list of string(s) or CompiledPermissions
 
         :yields: tuple(Permission, Boolean)
         """
         identifier = identifiers.primary_identifier
 
-        for required_perm in permission_s:
+        # permissions are compiled in advance by the requires_permission
+        # decorators and the authorizer, and otherwise compiled here:
+        required_permission_s = CompiledPermissions.compile(permission_s)
+
+        if self.decision_cache is None:
+            yield from self.evaluate_permissions(identifier, required_permission_s)
+            return
 
-            required_permission = DefaultPermission(wildcard_string=required_perm)
+        cached = self.decision_cache.get_many(self.name, identifier, 'permission',
+                                              required_permission_s)
+        uncached = CompiledPermissions.from_items(
+            item for item in required_permission_s.items() if item[0] not in cached)
 
-            # get_authzd_permissions returns a list of DefaultPermission instances,
-            # requesting from cache using '*' and permission.domain as hash keys:
-            domain = next(iter(required_permission.domain))
-            assigned_permission_s = self.get_authzd_permissions(identifier, domain)
+        decided = {}
+        if uncached:
+            decided = dict(self.evaluate_permissions(identifier, uncached))
+            self.decision_cache.set_many(self.name, identifier, 'permission', decided)
 
-            is_permitted = False
-            for authorized_permission in assigned_permission_s:
-                if authorized_permission.implies(required_permission):
-                    is_permitted = True
-                    break
+        for required_perm in required_permission_s:
+            if required_perm in cached:
+                yield (required_perm, cached[required_perm])
+            else:
+                yield (required_perm, decided[required_perm])
+
+    # new to yosai:
+    def evaluate_permissions(self, identifier, required_permission_s):
+        """
+        :type identifier:  str
+        :type required_permission_s: CompiledPermissions
+
+        :yields: tuple(Permission, Boolean)
+        """
+        # the index is compiled from the permissions requested from cache,
+        # in a single round trip, using '*' and every permission.domain as
+        # hash keys:
+        permission_index = self.get_authzd_permission_index(
+            identifier, required_permission_s.domains)
+
+        for required_perm, required_permission in required_permission_s.items():
+            is_permitted = permission_index.implies(required_permission)
             yield (required_perm, is_permitted)
 
+    # new to yosai:
+    def permitted_mask(self, identifiers, matrix):
+        """
+        :type identifiers:  subject_abcs.IdentifierCollection
+        :type matrix:  PermissionMatrix
+
+        :returns: the bitmask of the matrix columns granted to the subject
+        """
+        identifier = identifiers.primary_identifier
+        permission_index = self.get_authzd_permission_index(identifier,
+                                                            matrix.domains)
+        return matrix.encode(permission_index.permissions)
+
+    # new to yosai:
+    def filter_permitted(self, identifiers, domain, action, targets):
+        """
+        Filters targets by whether the subject may perform an action on them,
+        obtaining the subject's permissions once rather than once per target.
+
+        :type identifiers:  subject_abcs.IdentifierCollection
+        :type domain:  str
+        :type action:  str
+        :type targets:  an iterable of target identifiers (str or int)
+
+        :returns: a list of the permitted targets, in the order given
+        """
+        identifier = identifiers.primary_identifier
+        permission_index = self.get_authzd_permission_index(identifier,
+                                                            [domain.lower()])
+        return permission_index.filter_permitted(domain, action, targets)
+
+    # new to yosai:
+    def permitted_targets(self, identifiers, domain, action):
+        """
+        :type identifiers:  subject_abcs.IdentifierCollection
+        :type domain:  str
+        :type action:  str
+
+        :returns: ALL_TARGETS when a wildcard target is granted, otherwise a
+                  frozenset of the target identifiers granted
+        """
+        identifier = identifiers.primary_identifier
+        permission_index = self.get_authzd_permission_index(identifier,
+                                                            [domain.lower()])
+        return permission_index.permitted_targets(domain, action)
+
     def has_role(self, identifiers, required_role_s):
         """
         Confirms whether a subject is a member of one or more roles.
@@ -425,9 +765,43 @@ class AccountStoreRealm(realm_abcs.TOTPAuthenticatingRealm,
         """
         identifier = identifiers.primary_identifier
 
+        if self.decision_cache is None:
+            yield from self.evaluate_roles(identifier, required_role_s)
+            return
+
+        required_role_s = list(required_role_s)
+        cached = self.decision_cache.get_many(self.name, identifier, 'role',
+                                              required_role_s)
+        uncached = [role for role in required_role_s if role not in cached]
+
+        decided = {}
+        if uncached:
+            decided = dict(self.evaluate_roles(identifier, uncached))
+            self.decision_cache.set_many(self.name, identifier, 'role', decided)
+
+        for role in required_role_s:
+            yield (role, cached[role] if role in cached else decided[role])
+
+    # new to yosai:
+    def evaluate_roles(self, identifier, required_role_s):
+        """
+        :type identifier:  str
+        :type required_role_s: Set of String(s)
+
+        :yields: tuple(role, Boolean)
+        """
         # assigned_role_s is a set
         assigned_role_s = self.get_authzd_roles(identifier)
+        return self.decide_roles(identifier, assigned_role_s, required_role_s)
 
+    # new to yosai:
+    def decide_roles(self, identifier, assigned_role_s, required_role_s):
+        """
+        :type assigned_role_s: Set of String(s)
+        :type required_role_s: Set of String(s)
+
+        :yields: tuple(role, Boolean)
+        """
         if not assigned_role_s:
             msg = 'has_role:  no roles obtained from account_store for [{0}]'.\
                 format(identifier)
@@ -435,6 +809,227 @@ class AccountStoreRealm(realm_abcs.TOTPAuthenticatingRealm,
             for role in required_role_s:
                 yield (role, False)
         else:
+            if self.role_hierarchy is not None:
+                assigned_role_s = self.role_hierarchy.expand(assigned_role_s)
             for role in required_role_s:
-                hasrole = ({role} <= assigned_role_s)
+                hasrole = (role in assigned_role_s)
                 yield (role, hasrole)
+
+    # --------------------------------------------------------------------------
+    # Asynchronous Authentication and Authorization
+    # --------------------------------------------------------------------------
+
+    # new to yosai:
+    def run_in_executor(self, func, *args):
+        """
+        Runs a synchronous call in the event loop's default executor, for
+        cache handlers and account stores that do not implement the async
+        protocol, so that the event loop is not blocked.
+        """
+        return asyncio.get_event_loop().run_in_executor(None, func, *args)
+
+    # new to yosai:
+    async def query_account_store_async(self, method_name, identifier):
+        """
+        Awaits account_store.<method_name>_async when the account store
+        implements AsyncCredentialsAccountStore or
+        AsyncAuthorizationAccountStore and otherwise runs the synchronous
+        query in an executor.
+
+        :raises ValueError: when the account store returns no results
+        """
+        query = getattr(self.account_store, method_name + '_async', None)
+        if query is not None:
+            results = await query(identifier)
+        else:
+            results = await self.run_in_executor(
+                getattr(self.account_store, method_name), identifier)
+
+        if not results:
+            msg = "Could not get {0} from account_store for {1}".\
+                format(method_name, identifier)
+            raise ValueError(msg)
+        return results
+
+    # new to yosai:
+    async def get_authentication_info_async(self, identifier):
+        """
+        The asynchronous counterpart of get_authentication_info.
+        """
+        get_or_create_async = getattr(self.cache_handler, 'get_or_create_async', None)
+        if get_or_create_async is None:
+            return await self.run_in_executor(self.get_authentication_info,
+                                              identifier)
+
+        async def query_authc_info(self):
+            return await self.query_account_store_async('get_authc_info',
+                                                        identifier)
+        try:
+            account_info = await get_or_create_async(
+                domain='authentication:' + self.name,
+                identifier=identifier,
+                creator_func=query_authc_info,
+                creator=self)
+        except ValueError:
+            msg = ("No account credentials found for identifiers [{0}].  "
+                   "Returning None.".format(identifier))
+            logger.warning(msg)
+            return None
+
+        account_info['account_id'] = SimpleIdentifierCollection(source_name=self.name,
+                                                                identifier=identifier)
+        return account_info
+
+    # new to yosai:
+    async def authenticate_account_async(self, authc_token):
+        """
+        The asynchronous counterpart of authenticate_account.  Credentials
+        are verified in an executor, as hashing is CPU-bound.
+        """
+        identifier, verifier = self.resolve_verifier(authc_token)
+
+        account = await self.get_authentication_info_async(identifier)
+        self.assert_account_available(identifier, account)
+
+        await self.run_in_executor(self.assert_credentials_match,
+                                   verifier, authc_token, account)
+        return account
+
+    # new to yosai:
+    async def get_authzd_permission_blobs_async(self, identifier, perm_domains):
+        """
+        The asynchronous counterpart of get_authzd_permission_blobs.
+        """
+        keys = self.permission_keys(perm_domains)
+
+        if self.is_negatively_cached('permissions', identifier):
+            return [None] * len(keys)
+
+        hmget_or_create_async = getattr(self.cache_handler,
+                                        'hmget_or_create_async', None)
+        if hmget_or_create_async is None:
+            return await self.run_in_executor(self.get_authzd_permission_blobs,
+                                              identifier, perm_domains)
+
+        async def query_permissions(self):
+            return await self.query_account_store_async('get_authz_permissions',
+                                                        identifier)
+        try:
+            return await hmget_or_create_async(
+                domain='authorization:permissions:' + self.name,
+                identifier=identifier,
+                keys=keys,
+                creator_func=query_permissions,
+                creator=self)
+        except ValueError:
+            msg = ("No permissions found for identifiers [{0}].  "
+                   "Returning None.".format(identifier))
+            logger.warning(msg)
+            self.cache_negative('permissions', identifier)
+            return [None] * len(keys)
+
+    # new to yosai:
+    async def get_authzd_roles_async(self, identifier):
+        """
+        The asynchronous counterpart of get_authzd_roles.
+        """
+        if self.is_negatively_cached('roles', identifier):
+            return set()
+
+        get_or_create_async = getattr(self.cache_handler, 'get_or_create_async', None)
+        if get_or_create_async is None:
+            return await self.run_in_executor(self.get_authzd_roles, identifier)
+
+        async def query_roles(self):
+            return await self.query_account_store_async('get_authz_roles',
+                                                        identifier)
+        try:
+            roles = await get_or_create_async(
+                domain='authorization:roles:' + self.name,
+                identifier=identifier,
+                creator_func=query_roles,
+                creator=self)
+        except ValueError:
+            msg = ("No roles found for identifiers [{0}].  "
+                   "Returning None.".format(identifier))
+            logger.warning(msg)
+            self.cache_negative('roles', identifier)
+            return set()
+
+        return set(roles)
+
+    # new to yosai:
+    async def is_permitted_async(self, identifiers, permission_s):
+        """
+        The asynchronous counterpart of is_permitted.
+
+        :returns: a list of tuple(Permission, Boolean)
+        """
+        identifier = identifiers.primary_identifier
+        required_permission_s = CompiledPermissions.compile(permission_s)
+
+        if self.decision_cache is None:
+            return await self.evaluate_permissions_async(identifier,
+                                                         required_permission_s)
+
+        cached = self.decision_cache.get_many(self.name, identifier, 'permission',
+                                              required_permission_s)
+        uncached = CompiledPermissions.from_items(
+            item for item in required_permission_s.items() if item[0] not in cached)
+
+        decided = {}
+        if uncached:
+            decided = dict(await self.evaluate_permissions_async(identifier, uncached))
+            self.decision_cache.set_many(self.name, identifier, 'permission', decided)
+
+        return [(required_perm, cached[required_perm] if required_perm in cached
+                 else decided[required_perm])
+                for required_perm in required_permission_s]
+
+    # new to yosai:
+    async def evaluate_permissions_async(self, identifier, required_permission_s):
+        """
+        :type identifier:  str
+        :type required_permission_s: CompiledPermissions
+
+        :returns: a list of tuple(Permission, Boolean)
+        """
+        related_perms = await self.get_authzd_permission_blobs_async(
+            identifier, required_permission_s.domains)
+        permission_index = self.compile_permission_index(related_perms)
+
+        return [(required_perm, permission_index.implies(required_permission))
+                for required_perm, required_permission in required_permission_s.items()]
+
+    # new to yosai:
+    async def has_role_async(self, identifiers, required_role_s):
+        """
+        The asynchronous counterpart of has_role.
+
+        :returns: a list of tuple(role, Boolean)
+        """
+        identifier = identifiers.primary_identifier
+        required_role_s = list(required_role_s)
+
+        if self.decision_cache is None:
+            return await self.evaluate_roles_async(identifier, required_role_s)
+
+        cached = self.decision_cache.get_many(self.name, identifier, 'role',
+                                              required_role_s)
+        uncached = [role for role in required_role_s if role not in cached]
+
+        decided = {}
+        if uncached:
+            decided = dict(await self.evaluate_roles_async(identifier, uncached))
+            self.decision_cache.set_many(self.name, identifier, 'role', decided)
+
+        return [(role, cached[role] if role in cached else decided[role])
+                for role in required_role_s]
+
+    # new to yosai:
+    async def evaluate_roles_async(self, identifier, required_role_s):
+        """
+        :returns: a list of tuple(role, Boolean)
+        """
+        assigned_role_s = await self.get_authzd_roles_async(identifier)
+        return list(self.decide_roles(identifier, assigned_role_s, required_role_s))
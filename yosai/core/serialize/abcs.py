@@ -21,6 +21,7 @@ from abc import ABCMeta, abstractmethod
 
 
 class Serializable(metaclass=ABCMeta):
+    __slots__ = ()
 
     def __eq__(self, other):
         if self is other:
@@ -16,11 +16,15 @@ KIND, either express or implied.  See the License for the
 specific language governing permissions and limitations
 under the License.
 """
+import asyncio
 import functools
 import logging
 from contextlib import contextmanager
 
 from yosai.core import (
+    AuthorizationSettings,
+    CompiledPermissions,
+    PermissionTemplate,
     SessionStorageEvaluator,
     LazySettings,
     SecurityManagerSettings,
@@ -28,6 +32,7 @@ from yosai.core import (
     SessionException,
     ThreadStateManager,
     UnauthenticatedException,
+    UnauthorizedException,
     subject_abcs,
 )
 
@@ -267,6 +272,10 @@ class DelegatingSubject(subject_abcs.Subject):
         """
         if self.authorized:
             self.check_security_manager()
+            memo = Yosai.get_current_authz_memo()
+            if memo is not None:
+                return set(memo.decide('permission', self.identifiers, permission_s,
+                                       self._evaluate_permissions))
             return (self.security_manager.is_permitted(
                     self.identifiers, permission_s))
 
@@ -286,6 +295,11 @@ class DelegatingSubject(subject_abcs.Subject):
         """
         sm = self.security_manager
         if self.authorized:
+            memo = Yosai.get_current_authz_memo()
+            if memo is not None:
+                return self._decide_collective(
+                    memo, 'permission', permission_s, logical_operator,
+                    functools.partial(self._evaluate_permissions, log_results=False))
             return sm.is_permitted_collective(self.identifiers,
                                               permission_s,
                                               logical_operator)
@@ -293,6 +307,77 @@ class DelegatingSubject(subject_abcs.Subject):
         msg = 'Cannot check permission when user isn\'t authenticated nor remembered'
         raise ValueError(msg)
 
+    # new to yosai:
+    def filter_permitted(self, domain, action, targets):
+        """
+        Filters targets by whether the subject may perform an action on them,
+        such as which of these blogposts the subject may edit.
+
+        :param domain: a single permission domain, such as 'blogpost'
+        :type domain:  str
+        :param action: a single permission action, such as 'edit'
+        :type action:  str
+        :param targets: the target identifiers to filter
+        :type targets:  an iterable of target identifiers (str or int)
+
+        :returns: a list of the permitted targets, in the order given
+        """
+        if self.authorized:
+            self.check_security_manager()
+            return self.security_manager.filter_permitted(
+                self.identifiers, domain, action, targets)
+
+        msg = 'Cannot check permission when user isn\'t authenticated nor remembered'
+        raise ValueError(msg)
+
+    # new to yosai:
+    def permitted_targets(self, domain, action):
+        """
+        Lists every target that the subject may perform an action on, such as
+        the ids of the blogposts that the subject may edit.
+
+        :param domain: a single permission domain, such as 'blogpost'
+        :type domain:  str
+        :param action: a single permission action, such as 'edit'
+        :type action:  str
+
+        :returns: ALL_TARGETS when a wildcard target is granted, otherwise a
+                  frozenset of the target identifiers granted
+        """
+        if self.authorized:
+            self.check_security_manager()
+            return self.security_manager.permitted_targets(
+                self.identifiers, domain, action)
+
+        msg = 'Cannot check permission when user isn\'t authenticated nor remembered'
+        raise ValueError(msg)
+
+    # new to yosai:
+    def _evaluate_permissions(self, permission_s, log_results=True):
+        return self.security_manager.is_permitted(self.identifiers, permission_s,
+                                                  log_results=log_results)
+
+    # new to yosai:
+    def _evaluate_roles(self, role_s, log_results=True):
+        return self.security_manager.has_role(self.identifiers, role_s,
+                                              log_results=log_results)
+
+    # new to yosai:
+    def _decide_collective(self, memo, kind, item_s, logical_operator, evaluate):
+        """
+        Decides a collective check from the memo, publishing the same
+        AUTHORIZATION.GRANTED or AUTHORIZATION.DENIED event as the authorizer
+        does so that audit output doesn't depend upon whether a memo is open.
+
+        :returns: a Boolean
+        """
+        results = memo.decide(kind, self.identifiers, item_s, evaluate)
+        granted = logical_operator(is_granted for _, is_granted in results)
+        topic = 'AUTHORIZATION.GRANTED' if granted else 'AUTHORIZATION.DENIED'
+        self.security_manager.notify_authz_event(
+            self.identifiers, [item for item, _ in results], topic, logical_operator)
+        return granted
+
     def assert_authz_check_possible(self):
         if not self.identifiers:
             msg = (
@@ -324,6 +409,11 @@ class DelegatingSubject(subject_abcs.Subject):
         """
         self.assert_authz_check_possible()
         if self.authorized:
+            if Yosai.get_current_authz_memo() is not None:
+                if not self.is_permitted_collective(permission_s, logical_operator):
+                    msg = "Subject lacks permission(s) to satisfy logical operation"
+                    raise UnauthorizedException(msg)
+                return
             self.security_manager.check_permission(self.identifiers,
                                                    permission_s,
                                                    logical_operator)
@@ -340,6 +430,10 @@ class DelegatingSubject(subject_abcs.Subject):
                   indicating whether the user is a member of the Role
         """
         if self.authorized:
+            memo = Yosai.get_current_authz_memo()
+            if memo is not None:
+                return set(memo.decide('role', self.identifiers, role_s,
+                                       self._evaluate_roles))
             return self.security_manager.has_role(self.identifiers, role_s)
         msg = 'Cannot check permission when identifiers aren\'t set!'
         raise ValueError(msg)
@@ -357,6 +451,11 @@ class DelegatingSubject(subject_abcs.Subject):
         :returns: a Boolean
         """
         if self.authorized:
+            memo = Yosai.get_current_authz_memo()
+            if memo is not None:
+                return self._decide_collective(
+                    memo, 'role', role_s, logical_operator,
+                    functools.partial(self._evaluate_roles, log_results=False))
             return self.security_manager.has_role_collective(self.identifiers,
                                                               role_s,
                                                               logical_operator)
@@ -376,6 +475,11 @@ class DelegatingSubject(subject_abcs.Subject):
         :raises UnauthorizedException: if Subject not assigned to all roles
         """
         if self.authorized:
+            if Yosai.get_current_authz_memo() is not None:
+                if not self.has_role_collective(role_ids, logical_operator):
+                    msg = "Subject does not have role(s) assigned."
+                    raise UnauthorizedException(msg)
+                return
             self.security_manager.check_role(self.identifiers,
                                              role_ids,
                                              logical_operator)
@@ -383,6 +487,93 @@ class DelegatingSubject(subject_abcs.Subject):
             msg = 'Cannot check permission when identifiers aren\'t set!'
             raise ValueError(msg)
 
+    # new to yosai:
+    async def is_permitted_async(self, permission_s):
+        """
+        The asynchronous counterpart of is_permitted, for use within an event
+        loop:  realms, and their cache and account store lookups, are awaited
+        concurrently rather than blocking the loop.  Decisions are not
+        memoized by Yosai.context, which is thread-local.
+
+        :param permission_s: a collection of 1..N permissions
+        :type permission_s: List of authz_abcs.Permission object(s) or String(s)
+
+        :returns: a set of tuple(s), containing the permission and a Boolean
+                  indicating whether the permission is granted
+        """
+        if self.authorized:
+            self.check_security_manager()
+            return await self.security_manager.is_permitted_async(
+                self.identifiers, permission_s)
+
+        msg = 'Cannot check permission when user isn\'t authenticated nor remembered'
+        raise ValueError(msg)
+
+    # new to yosai:
+    async def is_permitted_collective_async(self, permission_s, logical_operator=all):
+        """
+        :returns: a Boolean
+        """
+        if self.authorized:
+            self.check_security_manager()
+            return await self.security_manager.is_permitted_collective_async(
+                self.identifiers, permission_s, logical_operator)
+
+        msg = 'Cannot check permission when user isn\'t authenticated nor remembered'
+        raise ValueError(msg)
+
+    # new to yosai:
+    async def check_permission_async(self, permission_s, logical_operator=all):
+        """
+        :raises UnauthorizedException: if any permission is unauthorized
+        """
+        self.assert_authz_check_possible()
+        if self.authorized:
+            await self.security_manager.check_permission_async(
+                self.identifiers, permission_s, logical_operator)
+        else:
+            msg = 'Cannot check permission when user isn\'t authenticated nor remembered'
+            raise ValueError(msg)
+
+    # new to yosai:
+    async def has_role_async(self, role_s):
+        """
+        :returns: a set of tuple(s), containing the role and a Boolean
+                  indicating whether the user is a member of the Role
+        """
+        if self.authorized:
+            self.check_security_manager()
+            return await self.security_manager.has_role_async(self.identifiers, role_s)
+
+        msg = 'Cannot check permission when identifiers aren\'t set!'
+        raise ValueError(msg)
+
+    # new to yosai:
+    async def has_role_collective_async(self, role_s, logical_operator=all):
+        """
+        :returns: a Boolean
+        """
+        if self.authorized:
+            self.check_security_manager()
+            return await self.security_manager.has_role_collective_async(
+                self.identifiers, role_s, logical_operator)
+
+        msg = 'Cannot check permission when identifiers aren\'t set!'
+        raise ValueError(msg)
+
+    # new to yosai:
+    async def check_role_async(self, role_ids, logical_operator=all):
+        """
+        :raises UnauthorizedException: if Subject not assigned to all roles
+        """
+        if self.authorized:
+            self.check_security_manager()
+            await self.security_manager.check_role_async(
+                self.identifiers, role_ids, logical_operator)
+        else:
+            msg = 'Cannot check permission when identifiers aren\'t set!'
+            raise ValueError(msg)
+
     def login(self, authc_token):
         """
         :type authc_token: authc_abcs.AuthenticationToken
@@ -395,6 +586,28 @@ class DelegatingSubject(subject_abcs.Subject):
         # login raises an AuthenticationException if it fails to authenticate:
         subject = self.security_manager.login(subject=self,
                                               authc_token=authc_token)
+        self.assume_login(subject, authc_token)
+
+    # new to yosai:
+    async def login_async(self, authc_token):
+        """
+        The asynchronous counterpart of login, for use from within an event
+        loop.  Session access runs in an executor.
+
+        :type authc_token: authc_abcs.AuthenticationToken
+        """
+        loop = asyncio.get_event_loop()
+        await loop.run_in_executor(None, self.clear_run_as_identities_internal)
+        subject = await self.security_manager.login_async(subject=self,
+                                                          authc_token=authc_token)
+        await loop.run_in_executor(None, self.assume_login, subject, authc_token)
+
+    # new to yosai:
+    def assume_login(self, subject, authc_token):
+        """
+        Assumes the identity, host and session of the subject returned by a
+        successful login.
+        """
         identifiers = None
         host = None
         if isinstance(subject, DelegatingSubject):
@@ -768,6 +981,80 @@ class SubjectStore:
 
 
 # moved from its own yosai module so as to avoid circular importing:
+# new to yosai:
+class AuthorizationMemo:
+    """
+    An AuthorizationMemo records the authorization decisions made within one
+    ``Yosai.context`` (typically, one web request) so that repeated
+    permission and role checks with identical arguments are answered from a
+    dict rather than through the SecurityManager, realms and cache.
+
+    The memo is opt-in, enabled by the ``request_memo`` setting of AUTHZ_CONFIG,
+    and is discarded when the context exits.  Decisions are memoized per
+    (identifiers, permission) and (identifiers, role).  Only the checks that
+    miss the memo reach the SecurityManager, and so only those publish
+    AUTHORIZATION.RESULTS events, whereas collective and check_* calls
+    publish AUTHORIZATION.GRANTED or DENIED whether or not they hit the memo.
+    ``hits`` and ``misses`` count individual permissions and roles, for tuning.
+    """
+    def __init__(self):
+        self._decisions = {}
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def identifiers_key(identifiers):
+        try:
+            return tuple(identifiers.source_identifiers.items())
+        except AttributeError:
+            return identifiers
+
+    def decide(self, kind, identifiers, item_s, evaluate):
+        """
+        :param kind: the kind of item decided, 'permission' or 'role'
+        :param item_s: the permissions or roles to decide
+        :param evaluate: a callable that decides the items missing from the
+                         memo, returning (item, Boolean) tuples
+
+        :returns: a list of (item, Boolean) tuples, one per item
+        """
+        prefix = (kind, self.identifiers_key(identifiers))
+
+        if isinstance(item_s, CompiledPermissions):
+            pairs = list(item_s.items())
+        else:
+            item_s = [item_s] if isinstance(item_s, str) else list(item_s)
+            pairs = [(item, item) for item in item_s]
+
+        missing = [(item, value) for item, value in pairs
+                   if prefix + (item,) not in self._decisions]
+        self.misses += len(missing)
+        self.hits += len(pairs) - len(missing)
+
+        if missing:
+            if isinstance(item_s, CompiledPermissions):
+                decided = evaluate(CompiledPermissions.from_items(missing))
+            else:
+                decided = evaluate([item for item, _ in missing])
+
+            for item, _ in missing:
+                self._decisions[prefix + (item,)] = False
+            for item, is_granted in decided:
+                self._decisions[prefix + (item,)] = is_granted
+
+        return [(item, self._decisions[prefix + (item,)]) for item, _ in pairs]
+
+    def clear(self):
+        self._decisions.clear()
+
+    def __len__(self):
+        return len(self._decisions)
+
+    def __repr__(self):
+        return ("AuthorizationMemo(decisions={0}, hits={1}, misses={2})".
+                format(len(self._decisions), self.hits, self.misses))
+
+
 class Yosai:
 
     def __init__(self, env_var=None, file_path=None, session_attributes=None):
@@ -779,6 +1066,9 @@ class Yosai:
         self.security_manager = \
             self.generate_security_manager(self.settings, session_attributes)
 
+        # when True, each context memoizes its authorization decisions:
+        self.memoize_authz = AuthorizationSettings(self.settings).request_memo
+
     def generate_security_manager(self, settings, session_attributes):
         # don't forget to pass default_cipher_key into the WebSecurityManager
         mgr_builder = SecurityManagerCreator()
@@ -801,6 +1091,7 @@ class Yosai:
     @contextmanager
     def context(yosai):
         global_yosai_context.stack.append(yosai)
+        Yosai.init_authz_memo(yosai)
 
         try:
             yield
@@ -809,6 +1100,30 @@ class Yosai:
         finally:
             global_yosai_context.stack = []
             global_subject_context.stack = []
+            Yosai.release_authz_memo()
+
+    @staticmethod
+    def init_authz_memo(yosai):
+        if yosai.memoize_authz:
+            global_authz_memo_context.stack.append(AuthorizationMemo())
+
+    @staticmethod
+    def release_authz_memo():
+        for memo in global_authz_memo_context.stack:
+            msg = 'Releasing request-scoped authorization memo: ' + repr(memo)
+            logger.debug(msg)
+        global_authz_memo_context.stack = []
+
+    @staticmethod
+    def get_current_authz_memo():
+        """
+        :returns: the AuthorizationMemo of the current context, or None when
+                  decisions aren't memoized
+        """
+        try:
+            return global_authz_memo_context.stack[-1]
+        except IndexError:
+            return None
 
     @staticmethod
     def get_current_subject():
@@ -941,6 +1256,9 @@ class Yosai:
         Basic Example:
             requires_permission(['domain1:action1,action2'])
         """
+        # parsed and validated once, at decoration time:
+        permission_s = CompiledPermissions(permission_s)
+
         def outer_wrap(fn):
             @functools.wraps(fn)
             def inner_wrap(*args, **kwargs):
@@ -983,10 +1301,14 @@ class Yosai:
         Basic Example:
             requires_permission(['{kwarg.domainid}:action1,action2'])
         """
+        # compiled once, at decoration time:
+        templates = [PermissionTemplate(perm) for perm in permission_s]
+
         def outer_wrap(fn):
             @functools.wraps(fn)
             def inner_wrap(*args, **kwargs):
-                newperms = [perm.format(**kwargs) for perm in permission_s]
+                newperms = CompiledPermissions.from_items(
+                    template.bind(kwargs) for template in templates)
 
                 subject = Yosai.get_current_subject()
 
@@ -996,6 +1318,24 @@ class Yosai:
             return inner_wrap
         return outer_wrap
 
+    @staticmethod
+    def validate_role_s(role_s):
+        """
+        Validates the roles of a ``requires_role`` decorator at decoration
+        time, so that a misconfigured decorator fails at import.
+
+        :type role_s:  a role identifier string or a collection of them
+
+        :returns: a list of the role identifiers
+        :raises ValueError: if role_s does not consist of non-empty strings
+        """
+        role_s = [role_s] if isinstance(role_s, str) else list(role_s)
+        if not role_s or not all(role and isinstance(role, str) for role in role_s):
+            msg = 'Roles must be specified as non-empty strings: ' + repr(role_s)
+            raise ValueError(msg)
+
+        return role_s
+
     @staticmethod
     def requires_role(role_s, logical_operator=all):
         """
@@ -1020,6 +1360,8 @@ class Yosai:
         Basic Example:
             requires_role('physician')
         """
+        role_s = Yosai.validate_role_s(role_s)
+
         def outer_wrap(fn):
             @functools.wraps(fn)
             def inner_wrap(*args, **kwargs):
@@ -1101,3 +1443,4 @@ class SecurityManagerCreator:
 # Set Global State Managers
 global_yosai_context = ThreadStateManager()
 global_subject_context = ThreadStateManager()
+global_authz_memo_context = ThreadStateManager()
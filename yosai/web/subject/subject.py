@@ -22,6 +22,8 @@ from contextlib import contextmanager
 
 from yosai.core import (
     AuthorizationException,
+    CompiledPermissions,
+    PermissionTemplate,
     SubjectContext,
     DelegatingSubject,
     ExpiredSessionException,
@@ -179,6 +181,7 @@ class WebYosai(Yosai):
         global_yosai_context.stack.append(yosai)  # how to weakref? TBD
         webregistry.secret = yosai.signed_cookie_secret  # configuration
         global_webregistry_context.stack.append(webregistry)  # how to weakref? TBD
+        WebYosai.init_authz_memo(yosai)
         try:
             yield
         except:
@@ -187,6 +190,7 @@ class WebYosai(Yosai):
             global_yosai_context.stack = []
             global_webregistry_context.stack = []
             global_subject_context.stack = []
+            WebYosai.release_authz_memo()
 
     @staticmethod
     def get_current_webregistry():
@@ -313,6 +317,9 @@ class WebYosai(Yosai):
         Basic Example:
             requires_permission(['domain1:action1,action2'])
         """
+        # parsed and validated once, at decoration time:
+        permission_s = CompiledPermissions(permission_s)
+
         def outer_wrap(fn):
             @functools.wraps(fn)
             def inner_wrap(*args, **kwargs):
@@ -364,12 +371,16 @@ class WebYosai(Yosai):
         Basic Example:
             requires_permission(['{kwarg.domainid}:action1,action2'])
         """
+        # compiled once, at decoration time:
+        templates = [PermissionTemplate(perm) for perm in permission_s]
+
         def outer_wrap(fn):
             @functools.wraps(fn)
             def inner_wrap(*args, **kwargs):
 
                 params = WebYosai.get_current_webregistry().resource_params
-                newperms = [perm.format(**params) for perm in permission_s]
+                newperms = CompiledPermissions.from_items(
+                    template.bind(params) for template in templates)
 
                 subject = WebYosai.get_current_subject()
 
@@ -412,6 +423,8 @@ class WebYosai(Yosai):
         Basic Example:
             requires_role('physician')
         """
+        role_s = WebYosai.validate_role_s(role_s)
+
         def outer_wrap(fn):
             @functools.wraps(fn)
             def inner_wrap(*args, **kwargs):